@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+"""
+Бенчмарки горячих путей рисования SharkDraw
+Запускаются на платформе Qt offscreen (без экрана), результат - JSON
+
+Запуск из корня проекта:
+    python -m benchmarks.run_benchmarks --strokes 1000 --points 50 --output bench.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource  # Нет в Windows: пиковый RSS тогда не замеряется
+except ImportError:
+    resource = None
+
+# Без экрана: платформу нужно выбрать до создания QApplication
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QEvent, QPoint, QPointF, QRect, Qt, QT_VERSION_STR, PYQT_VERSION_STR
+from PyQt5.QtGui import QColor, QImage, QMouseEvent
+from PyQt5.QtWidgets import QApplication
+from src.config import ToolType, MAX_DRAWINGS, COLORS
+from src.tools import PenTool, LineTool, RectangleTool, CircleTool, ArrowTool
+
+# Формат результатов (увеличивается при несовместимых изменениях)
+RESULTS_VERSION = 1
+
+# Размер холста по умолчанию (Full HD)
+CANVAS_WIDTH = 1920
+CANVAS_HEIGHT = 1080
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    """Сводка замеров в миллисекундах"""
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'min_ms': ordered[0],
+        'median_ms': statistics.median(ordered),
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max_ms': ordered[-1],
+        'mean_ms': statistics.fmean(ordered) if hasattr(statistics, 'fmean') else statistics.mean(ordered),
+    }
+
+
+def _measure(action: Callable[[], None], repeat: int,
+             setup: Optional[Callable[[], None]] = None,
+             teardown: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    """Замерить action repeat раз (setup и teardown в замер не входят)"""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        action()
+        samples.append((time.perf_counter() - started) * 1000)
+        if teardown is not None:
+            teardown()
+    return _stats(samples)
+
+
+def make_drawing(rng: random.Random, points: int, width: int, height: int):
+    """Случайный рисунок: в основном штрихи карандаша, остальное - фигуры"""
+    color = QColor(rng.choice(list(COLORS.values())))
+    line_width = rng.randint(1, 10)
+    x, y = rng.randint(0, width), rng.randint(0, height)
+    kind = rng.random()
+    
+    if kind < 0.7:
+        drawing = PenTool(color, line_width)
+        for _ in range(points):
+            x = min(max(x + rng.randint(-15, 15), 0), width)
+            y = min(max(y + rng.randint(-15, 15), 0), height)
+            drawing.add_point(QPoint(x, y))
+        return drawing
+    
+    tool_class = rng.choice([LineTool, RectangleTool, CircleTool, ArrowTool])
+    drawing = tool_class(color, line_width)
+    drawing.set_start_point(QPoint(x, y))
+    drawing.set_end_point(QPoint(min(x + rng.randint(10, 300), width),
+                                 min(y + rng.randint(10, 300), height)))
+    return drawing
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Пиковый резидентный объём процесса (включая растры Qt, которых не видит tracemalloc)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux сообщает килобайты, macOS - байты
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _mouse_event(kind: QEvent.Type, x: int, y: int) -> QMouseEvent:
+    """Событие мыши левой кнопкой"""
+    buttons = Qt.NoButton if kind == QEvent.MouseButtonRelease else Qt.LeftButton
+    return QMouseEvent(kind, QPointF(x, y), Qt.LeftButton, buttons, Qt.NoModifier)
+
+
+def run(strokes: int, points: int, repeat: int, seed: int) -> dict:
+    """
+    Выполнить все бенчмарки на синтетической сцене
+    
+    Args:
+        strokes: Число рисунков в сцене
+        points: Точек в каждом штрихе карандаша
+        repeat: Повторов каждого замера
+        seed: Зерно генератора случайных чисел
+    
+    Returns:
+        dict: Результаты (сериализуемые в JSON)
+    """
+    app = QApplication.instance() or QApplication(sys.argv)
+    from src.canvas import TransparentCanvas
+    
+    rng = random.Random(seed)
+    results = {}
+    
+    canvas = TransparentCanvas()
+    canvas.setGeometry(0, 0, CANVAS_WIDTH, CANVAS_HEIGHT)
+    canvas.show()
+    canvas.enable_drawing()
+    
+    # Построение сцены и пиковая память (объекты рисунков тоже учитываются)
+    tracemalloc.start()
+    drawings = [make_drawing(rng, points, CANVAS_WIDTH, CANVAS_HEIGHT) for _ in range(strokes)]
+    started = time.perf_counter()
+    for drawing in drawings:
+        canvas.scene.add(drawing)
+    canvas._check_memory_limit()
+    results['build_scene'] = {'total_ms': (time.perf_counter() - started) * 1000}
+    
+    # Кадр рисуется через paintEvent холста в заранее созданное изображение
+    frame = QImage(CANVAS_WIDTH, CANVAS_HEIGHT, QImage.Format_ARGB32_Premultiplied)
+    paint_frame = lambda: canvas.render(frame)
+    paint_frame()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Буферы QImage выделяются в Qt, мимо tracemalloc - их размер считается отдельно
+    baked_layer = canvas.scene.baked_layer
+    results['memory'] = {
+        'peak_traced_bytes': peak,
+        'raster_bytes': canvas.renderer.memory_size() +
+                        (baked_layer.sizeInBytes() if baked_layer is not None else 0),
+        'peak_rss_bytes': _peak_rss_bytes(),
+        'drawings_bytes': canvas.scene.drawings_bytes,
+        'vector_drawings': len(canvas.scene.drawings),
+        'baked_layer': canvas.scene.baked_layer is not None,
+    }
+    
+    # Кадр целиком: из готового кэша и с перестройкой кэша
+    results['paint_frame_cached'] = _measure(paint_frame, repeat)
+    results['paint_frame_rebuild'] = _measure(paint_frame, repeat, setup=canvas.renderer.invalidate)
+    results['render_offscreen'] = _measure(canvas.renderer.render_image, repeat)
+    
+    # Завершение штриха карандаша (отпускание кнопки), затем отмена вне замера
+    canvas.set_tool(ToolType.PEN)
+    
+    def draw_stroke():
+        x, y = rng.randint(100, CANVAS_WIDTH - 100), rng.randint(100, CANVAS_HEIGHT - 100)
+        canvas.mousePressEvent(_mouse_event(QEvent.MouseButtonPress, x, y))
+        for i in range(1, points):
+            canvas.mouseMoveEvent(_mouse_event(QEvent.MouseMove, x + i % 50, y + i // 50))
+    
+    def undo_stroke():
+        # Отмена сбрасывает кэш рисунков; без перестройки следующий замер
+        # пропустил бы перенос штриха в кэш и занизил бы время завершения
+        canvas.undo()
+        paint_frame()
+    
+    results['commit_pen_stroke'] = _measure(
+        lambda: canvas.mouseReleaseEvent(_mouse_event(QEvent.MouseButtonRelease, 0, 0)),
+        repeat, setup=draw_stroke, teardown=undo_stroke)
+    
+    # Ластик в случайной точке; стёртое возвращается отменой вне замера
+    canvas.set_tool(ToolType.ERASER)
+    erased_before = []
+    results['erase_at_point'] = _measure(
+        lambda: canvas.erase_at_point(QPoint(rng.randint(0, CANVAS_WIDTH),
+                                             rng.randint(0, CANVAS_HEIGHT))),
+        repeat,
+        setup=lambda: erased_before.append(len(canvas.scene.drawings)),
+        teardown=lambda: canvas.undo() if len(canvas.scene.drawings) < erased_before[-1] else None)
+    
+    # Очистка холста (и её отмена вне замера)
+    results['clear_canvas'] = _measure(canvas.clear_canvas, repeat, teardown=canvas.undo)
+    
+    # Перетаскивание панели инструментов: обновление маски на каждый шаг
+    positions = iter(range(10 ** 9))
+    results['toolbar_drag_mask'] = _measure(
+        lambda: canvas.set_toolbar_rect(QRect(20 + next(positions) % 400, 20, 220, 680)),
+        repeat)
+    
+    # Запуск: создание панели инструментов (стили, иконки) и её первый кадр
+    from src.toolbar import Toolbar
+    toolbars = []
+    
+    def close_toolbar():
+        # Панели не должны копиться между повторами и влиять на следующие замеры
+        toolbar = toolbars.pop()
+        toolbar.close()
+        toolbar.deleteLater()
+        QApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+    
+    def show_toolbar():
+        toolbars.append(Toolbar())
+        toolbars[-1].grab()
+    
+    results['toolbar_first_frame'] = _measure(show_toolbar, repeat, teardown=close_toolbar)
+    
+    canvas.close()
+    return {
+        'version': RESULTS_VERSION,
+        'environment': {
+            'python': platform.python_version(),
+            'qt': QT_VERSION_STR,
+            'pyqt': PYQT_VERSION_STR,
+            'platform': platform.platform(),
+            'qpa': app.platformName(),
+        },
+        'parameters': {
+            'strokes': strokes,
+            'points': points,
+            'repeat': repeat,
+            'seed': seed,
+            'canvas': [CANVAS_WIDTH, CANVAS_HEIGHT],
+        },
+        'results': results,
+    }
+
+
+def compare(baseline: dict, report: dict) -> None:
+    """Вывести отношение медиан текущего запуска к прошлому (больше 1 - медленнее)"""
+    print('Сравнение медиан с прошлым запуском:')
+    for name, current in report['results'].items():
+        previous = baseline.get('results', {}).get(name, {})
+        if 'median_ms' not in current or not previous.get('median_ms'):
+            continue
+        ratio = current['median_ms'] / previous['median_ms']
+        mark = '⚠' if ratio > 1.2 else '✓'
+        print(f'  {mark} {name}: {previous["median_ms"]:.3f} -> {current["median_ms"]:.3f} мс '
+              f'(x{ratio:.2f})')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарки рисования SharkDraw (JSON)')
+    parser.add_argument('--strokes', type=int, default=MAX_DRAWINGS, help='Рисунков в сцене')
+    parser.add_argument('--points', type=int, default=50, help='Точек в штрихе карандаша')
+    parser.add_argument('--repeat', type=int, default=30, help='Повторов каждого замера')
+    parser.add_argument('--seed', type=int, default=1, help='Зерно генератора сцены')
+    parser.add_argument('--output', help='Файл для JSON (по умолчанию - вывод в консоль)')
+    parser.add_argument('--baseline', help='JSON прошлого запуска для сравнения медиан')
+    args = parser.parse_args()
+    
+    # Сообщения холста не должны попадать в JSON
+    with contextlib.redirect_stdout(open(os.devnull, 'w', encoding='utf-8')):
+        report = run(args.strokes, args.points, args.repeat, args.seed)
+    
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+        print(f'✓ Результаты записаны: {args.output}')
+    else:
+        print(text)
+    
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            compare(json.load(file), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,57 +4,123 @@ PaintPro - Приложение для рисования поверх экра
 Главный файл приложения
 """
 
+import argparse
+import os
 import sys
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import Qt
+import time
+from functools import partial
+
+# Начало отсчёта шкалы запуска - до импорта PyQt и модулей приложения
+STARTUP_STARTED = time.perf_counter()
+
+from PyQt5.QtWidgets import QApplication, QFileDialog
+from PyQt5.QtCore import Qt, QTimer
 from src.canvas import TransparentCanvas
 from src.toolbar import Toolbar
 from src.hotkeys import HotkeyManager
-from src.config import ToolType
+from src.config import (ToolType, SCENE_FILE_FILTER, AUTOSAVE_ENABLED, AUTOSAVE_DIR, EXPORT_DIR,
+                        SCREENSHOT_FORMAT, RECORDINGS_DIR, PROFILES_DIR)
+from src.scene_file import SceneFileError
 from src.sound_manager import SoundManager
+from src.journal import SceneJournal
+from src.input_recorder import InputRecorder, InputReplayer, HOTKEY_ACTIONS, RecordingError
+from src.profiler import Profiler
+from src.startup import StartupTimeline
+from src.logger import get_logger, setup_logging, shutdown_logging, install_crash_handler
+
+logger = get_logger('app')
 
 
 class PaintProApp:
     """Главное приложение PaintPro"""
     
-    def __init__(self):
-        """Инициализация приложения"""
+    def __init__(self, started: float = STARTUP_STARTED, autosave: bool = AUTOSAVE_ENABLED):
+        """
+        Инициализация приложения
+        
+        До первого кадра выполняется только то, что нужно для показа окон;
+        звуки и глобальные горячие клавиши подключаются после него.
+        
+        Args:
+            started: Начало отсчёта шкалы запуска (perf_counter)
+            autosave: Восстановить доску из автосохранения и вести журнал
+                      (при воспроизведении записи ввода выключается, чтобы
+                      воспроизведение не затёрло автосохранение)
+        """
+        # Иконки панели растрируются с учётом плотности пикселей экрана
+        QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
         self.app = QApplication(sys.argv)
         self.app.setApplicationName('PaintPro')
         
+        self.timeline = StartupTimeline(started)
+        self.timeline.mark('Импорт и QApplication', started)
+        
         # Создаём компоненты
         self.sound_manager = SoundManager()
-        self.canvas = TransparentCanvas()
-        self.toolbar = Toolbar(self.sound_manager)
+        with self.timeline.phase('Холст'):
+            self.canvas = TransparentCanvas()
+        with self.timeline.phase('Панель инструментов'):
+            self.toolbar = Toolbar(self.sound_manager)
         self.hotkey_manager = HotkeyManager()
+        self.input_recorder = InputRecorder(self.canvas)
+        self.profiler = Profiler()
         
         # Состояние приложения
         self.drawing_enabled = False
         
+        # Восстанавливаем доску из автосохранения и продолжаем журнал
+        self.journal = None
+        if autosave:
+            with self.timeline.phase('Автосохранение'):
+                self.journal = SceneJournal(AUTOSAVE_DIR)
+                snapshot, operations = self.journal.recover()
+                self.canvas.restore_from_journal(snapshot, operations)
+                self.canvas.attach_journal(self.journal)
+        
         # Подключаем сигналы
         self.connect_signals()
         
-        # Регистрируем горячие клавиши
-        self.hotkey_manager.register_hotkeys()
-        
-        # Показываем компоненты
-        self.canvas.show()
-        self.toolbar.show()
-        
-        # Передаём холсту область панели инструментов
-        self.canvas.set_toolbar_rect(self.toolbar.geometry())
+        # Показываем компоненты; остальное - после первого кадра панели
+        with self.timeline.phase('Показ окон'):
+            self.timeline.first_frame.connect(self.finish_startup)
+            self.timeline.watch_first_frame(self.toolbar)
+            self.canvas.show()
+            self.toolbar.show()
+            
+            # Передаём холсту область панели инструментов
+            self.canvas.set_toolbar_rect(self.toolbar.geometry())
+            
+            # Изначально режим рисования выключен
+            self.canvas.disable_drawing()
+    
+    def finish_startup(self):
+        """Отложенная часть запуска (после первого кадра)"""
+        with self.timeline.phase('Звуки'):
+            self.sound_manager.load()
         
-        # Изначально режим рисования выключен
-        self.canvas.disable_drawing()
+        # Регистрируем горячие клавиши
+        with self.timeline.phase('Горячие клавиши'):
+            self.hotkey_manager.register_hotkeys()
         
         # Воспроизводим звук запуска
         self.sound_manager.play_startup()
+        self.timeline.report()
         
-        print('✓ PaintPro запущен!')
-        print('  Нажмите Ctrl+D для включения режима рисования')
+        logger.info('✓ PaintPro запущен!')
+        logger.info('  Нажмите Ctrl+D для включения режима рисования')
     
     def connect_signals(self):
         """Подключить сигналы между компонентами"""
+        # Запись ввода подключается первой, чтобы событие записывалось до его обработки
+        self.toolbar.tool_changed.connect(self.input_recorder.record_tool)
+        self.toolbar.color_changed.connect(self.input_recorder.record_color)
+        self.toolbar.width_changed.connect(self.input_recorder.record_width)
+        self.toolbar.clear_requested.connect(partial(self.input_recorder.record_hotkey, 'clear_requested'))
+        self.toolbar.toggle_drawing_requested.connect(
+            partial(self.input_recorder.record_hotkey, 'toggle_requested'))
+        for action in HOTKEY_ACTIONS:
+            getattr(self.hotkey_manager, action).connect(partial(self.input_recorder.record_hotkey, action))
+        
         # Сигналы от панели инструментов
         self.toolbar.tool_changed.connect(self.on_tool_changed)
         self.toolbar.color_changed.connect(self.on_color_changed)
@@ -63,42 +129,157 @@ class PaintProApp:
         self.toolbar.close_requested.connect(self.on_exit_requested)
         self.toolbar.toggle_drawing_requested.connect(self.on_toggle_drawing)  # Новое подключение
         self.toolbar.geometry_changed.connect(self.on_toolbar_moved)  # Отслеживаем перемещение панели
+        self.toolbar.save_requested.connect(self.on_save_requested)
+        self.toolbar.open_requested.connect(self.on_open_requested)
         
         # Сигналы от менеджера горячих клавиш
         self.hotkey_manager.toggle_requested.connect(self.on_toggle_drawing)
         self.hotkey_manager.clear_requested.connect(self.on_clear_requested)
         self.hotkey_manager.exit_requested.connect(self.on_exit_requested)
+        self.hotkey_manager.export_png_requested.connect(self.on_export_png_requested)
+        self.hotkey_manager.screenshot_requested.connect(self.on_screenshot_requested)
+        self.hotkey_manager.export_svg_requested.connect(self.on_export_svg_requested)
+        self.hotkey_manager.record_input_requested.connect(self.on_record_input_requested)
+        self.hotkey_manager.perf_hud_requested.connect(self.canvas.toggle_perf_hud)
+        self.hotkey_manager.profile_requested.connect(self.on_profile_requested)
     
     def on_tool_changed(self, tool_type: ToolType):
         """Обработка смены инструмента"""
         self.canvas.set_tool(tool_type)
-        print(f'✓ Инструмент изменён: {tool_type.value}')
+        logger.info('✓ Инструмент изменён: %s', tool_type.value)
     
     def on_color_changed(self, color):
         """Обработка смены цвета"""
         self.canvas.set_color(color)
-        print(f'✓ Цвет изменён: {color.name()}')
+        logger.info('✓ Цвет изменён: %s', color.name())
     
     def on_width_changed(self, width: int):
         """Обработка смены толщины линии"""
         self.canvas.set_width(width)
-        print(f'✓ Толщина изменена: {width} px')
+        logger.info('✓ Толщина изменена: %d px', width)
     
     def on_clear_requested(self):
         """Обработка запроса на очистку экрана"""
         self.canvas.clear_canvas()
-        print('✓ Экран очищен')
+        logger.info('✓ Экран очищен')
+    
+    def on_save_requested(self):
+        """Обработка запроса на сохранение доски"""
+        path, _ = QFileDialog.getSaveFileName(self.toolbar, 'Сохранить доску', '', SCENE_FILE_FILTER)
+        if not path:
+            return
+        if not path.lower().endswith('.skd'):
+            path += '.skd'
+        try:
+            self.canvas.save_scene(path)
+            logger.info('✓ Доска сохранена: %s', path)
+        except OSError as e:
+            logger.warning('⚠ Не удалось сохранить доску: %s', e)
+    
+    def on_open_requested(self):
+        """Обработка запроса на открытие доски"""
+        path, _ = QFileDialog.getOpenFileName(self.toolbar, 'Открыть доску', '', SCENE_FILE_FILTER)
+        if not path:
+            return
+        try:
+            self.canvas.load_scene(path)
+            self.input_recorder.record_scene_loaded()
+            logger.info('✓ Доска открыта: %s', path)
+        except (OSError, SceneFileError) as e:
+            logger.warning('⚠ Не удалось открыть доску: %s', e)
+    
+    def _export_path(self, prefix: str, extension: str) -> str:
+        """Путь для нового файла экспорта с отметкой времени"""
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        timestamp = time.strftime('%Y%m%d_%H%M%S')
+        return os.path.join(EXPORT_DIR, f'{prefix}_{timestamp}.{extension}')
+    
+    def on_export_png_requested(self):
+        """Обработка запроса на экспорт аннотаций в PNG (выполняется в фоне)"""
+        try:
+            path = self._export_path('SharkDraw', 'png')
+        except OSError as e:
+            logger.warning('⚠ Не удалось создать папку экспорта: %s', e)
+            return
+        self.canvas.export_png(path, on_finished=partial(logger.info, '✓ Аннотации экспортированы: %s'),
+                               on_failed=partial(logger.warning, '⚠ Ошибка экспорта: %s'))
+    
+    def on_export_svg_requested(self):
+        """Обработка запроса на экспорт сцены в SVG (выполняется в фоне)"""
+        try:
+            path = self._export_path('SharkDraw', 'svg')
+        except OSError as e:
+            logger.warning('⚠ Не удалось создать папку экспорта: %s', e)
+            return
+        self.canvas.export_svg(path, on_finished=partial(logger.info, '✓ Сцена экспортирована в SVG: %s'),
+                               on_failed=partial(logger.warning, '⚠ Ошибка экспорта: %s'))
+    
+    def on_screenshot_requested(self):
+        """Обработка запроса на снимок экрана с рисунками"""
+        try:
+            path = self._export_path('Screenshot', SCREENSHOT_FORMAT)
+        except OSError as e:
+            logger.warning('⚠ Не удалось создать папку экспорта: %s', e)
+            return
+        # Панель инструментов не должна попасть на снимок - возвращаем её после захвата экрана
+        toolbar_visible = self.toolbar.isVisible()
+        self.toolbar.hide()
+        self.canvas.capture_screenshot(path,
+                                       on_finished=partial(logger.info, '📸 Снимок экрана сохранён: %s'),
+                                       on_failed=partial(logger.warning, '⚠ Ошибка снимка экрана: %s'),
+                                       on_grabbed=self.toolbar.show if toolbar_visible else None)
+    
+    def on_record_input_requested(self):
+        """Начать или остановить запись ввода"""
+        if self.input_recorder.recording:
+            self.input_recorder.stop()
+            return
+        try:
+            os.makedirs(RECORDINGS_DIR, exist_ok=True)
+            timestamp = time.strftime('%Y%m%d_%H%M%S')
+            self.input_recorder.start(os.path.join(RECORDINGS_DIR, f'input_{timestamp}.skdi'))
+        except OSError as e:
+            logger.warning('⚠ Не удалось начать запись ввода: %s', e)
+    
+    def on_profile_requested(self):
+        """Начать или остановить профилирование (в имени файлов - размер сцены)"""
+        if not self.profiler.running:
+            try:
+                self.profiler.start()
+            except ValueError as e:
+                logger.warning('⚠ Не удалось начать профилирование: %s', e)
+            return
+        try:
+            self.profiler.stop(PROFILES_DIR, f'{len(self.canvas.drawings)}drawings')
+        except OSError as e:
+            logger.warning('⚠ Не удалось сохранить профиль: %s', e)
+    
+    def replay_input(self, path: str, realtime: bool = True):
+        """Воспроизвести запись ввода (после запуска цикла событий)"""
+        self.replayer = InputReplayer(self.canvas, self.hotkey_manager, self.set_drawing_mode)
+        
+        def start():
+            try:
+                self.replayer.play(path, realtime)
+            except (OSError, RecordingError) as e:
+                logger.warning('⚠ Не удалось воспроизвести запись ввода: %s', e)
+        
+        QTimer.singleShot(0, start)
     
     def on_toggle_drawing(self):
         """Переключение режима рисования"""
-        self.drawing_enabled = not self.drawing_enabled
+        self.set_drawing_mode(not self.drawing_enabled)
+    
+    def set_drawing_mode(self, enabled: bool):
+        """Включить или выключить режим рисования"""
+        self.drawing_enabled = enabled
         
         if self.drawing_enabled:
             self.canvas.enable_drawing()
-            print('✓ Режим рисования ВКЛЮЧЕН')
+            logger.info('✓ Режим рисования ВКЛЮЧЕН')
         else:
             self.canvas.disable_drawing()
-            print('✓ Режим рисования ВЫКЛЮЧЕН')
+            logger.info('✓ Режим рисования ВЫКЛЮЧЕН')
         
         # Синхронизируем состояние кнопки на панели
         self.toolbar.update_drawing_mode(self.drawing_enabled)
@@ -109,7 +290,7 @@ class PaintProApp:
     
     def on_exit_requested(self):
         """Обработка запроса на выход"""
-        print('✓ Выход из приложения...')
+        logger.info('✓ Выход из приложения...')
         
         # Воспроизводим звук закрытия
         self.sound_manager.play_close()
@@ -120,28 +301,46 @@ class PaintProApp:
     def cleanup(self):
         """Очистка ресурсов перед выходом"""
         self.hotkey_manager.unregister_hotkeys()
+        self.input_recorder.stop()
+        if self.profiler.running:
+            self.on_profile_requested()
         self.sound_manager.cleanup()
-        print('✓ Ресурсы освобождены')
+        if self.journal is not None:
+            self.journal.close()
+        toggle = self.canvas.toggle_latency_stats()
+        if toggle['count']:
+            logger.info('⏱️  Переключение режима рисования: медиана %.2f мс, max %.2f мс (замеров: %d)',
+                        toggle['median'], toggle['max'], toggle['count'])
+        logger.info('✓ Ресурсы освобождены')
+        shutdown_logging()
     
     def run(self):
         """Запуск приложения"""
         try:
             return self.app.exec_()
         except KeyboardInterrupt:
-            print('\n✓ Прервано пользователем')
+            logger.info('✓ Прервано пользователем')
             self.cleanup()
             return 0
 
 
 def main():
     """Точка входа в приложение"""
-    print('=' * 50)
-    print('🎨 PaintPro - Рисование поверх экрана')
-    print('=' * 50)
-    print()
+    setup_logging()
+    install_crash_handler()
+    logger.info('=' * 50)
+    logger.info('🎨 PaintPro - Рисование поверх экрана')
+    logger.info('=' * 50)
+    
+    parser = argparse.ArgumentParser(description='SharkDraw - рисование поверх экрана')
+    parser.add_argument('--replay', metavar='FILE', help='Воспроизвести запись ввода (.skdi)')
+    parser.add_argument('--fast', action='store_true', help='Воспроизводить без исходных пауз')
+    args, _ = parser.parse_known_args()
     
-    # Создаём и запускаем приложение
-    app = PaintProApp()
+    # Создаём и запускаем приложение (запись ввода воспроизводится на отдельной доске)
+    app = PaintProApp(autosave=not args.replay)
+    if args.replay:
+        app.replay_input(args.replay, realtime=not args.fast)
     sys.exit(app.run())
 
 
@@ -4,24 +4,50 @@
 Полноэкранное прозрачное окно поверх всех приложений
 """
 
-from typing import Optional, List
+import logging
+import time
+from collections import deque
+from typing import Callable, Optional, List, Tuple
 from PyQt5.QtWidgets import QWidget, QApplication
-from PyQt5.QtCore import Qt, QPoint, QRect
-from PyQt5.QtGui import QPainter, QColor, QPen, QCursor, QRegion, QPaintEvent, QMouseEvent
-from src.config import (ToolType, MAX_DRAWINGS, DEBUG_MODE, 
-                        ERASER_RADIUS_MULTIPLIER, OVERLAY_OPACITY, MOUSE_LOG_INTERVAL)
+from PyQt5.QtCore import Qt, QPoint, QRect, QThreadPool, QTimer
+from PyQt5.QtGui import (QPainter, QColor, QPen, QCursor, QRegion, QPaintEvent, QMouseEvent,
+                         QImage, QResizeEvent, QKeyEvent, QKeySequence)
+from src.config import (ToolType, MAX_DRAWINGS, DRAWINGS_MEMORY_BUDGET, MEMORY_BAKE_TARGET,
+                        ERASER_RADIUS_MULTIPLIER, OVERLAY_OPACITY, MOUSE_LOG_INTERVAL,
+                        DAMAGE_MARGIN, CANVAS_TOGGLE_MODE, TOGGLE_LATENCY_SAMPLES,
+                        SCREENSHOT_FORMAT, SCREENSHOT_QUALITY, SCREENSHOT_LATENCY_SAMPLES,
+                        SCREENSHOT_HIDE_DELAY_MS, PERF_HUD_REFRESH_MS)
 from src.tools import PenTool, LineTool, RectangleTool, CircleTool, ArrowTool, EraserTool, Tool
+from src.scene import Scene
+from src.scene_renderer import SceneRenderer
+from src.render_scheduler import RenderScheduler
+from src.perf_hud import PerfHud
+from src.history import History, HistoryEntry
+from src import scene_file
+from src.export import ExportSignals, PngExportTask, ScreenshotTask, SvgExportTask
+from src.logger import get_logger
+
+logger = get_logger('canvas')
 
 
 class TransparentCanvas(QWidget):
-    """Прозрачный холст для рисования поверх экрана"""
+    """
+    Прозрачный холст для рисования поверх экрана
+    
+    Тонкое представление: рисунки хранит Scene, отрисовкой и растровыми
+    кэшами занимается SceneRenderer; холст обрабатывает ввод и окно.
+    """
     
     def __init__(self):
         super().__init__()
         self.init_ui()
         
-        # Список завершённых рисунков
-        self.drawings = []
+        # Сцена с завершёнными рисунками и её отрисовщик
+        self.scene = Scene(self.size(), self.devicePixelRatioF())
+        self.renderer = SceneRenderer(self.scene)
+        
+        # История для отмены/повтора (Ctrl+Z / Ctrl+Y)
+        self.history = History()
         
         # Текущий инструмент в процессе рисования
         self.current_tool = None
@@ -34,8 +60,47 @@ class TransparentCanvas(QWidget):
         # Флаг активности рисования
         self.is_drawing = False
         
+        # Режим рисования: в режиме 'passthrough' окно всегда отображено,
+        # а при выключении лишь пропускает ввод и ничего не рисует
+        self.toggle_mode = CANVAS_TOGGLE_MODE
+        self.drawing_enabled = False
+        
+        # Задержка переключения: от вызова enable/disable до отрисованного кадра
+        self.toggle_latencies = deque(maxlen=TOGGLE_LATENCY_SAMPLES)
+        self._toggle_started = None
+        
+        # Задержка снимков экрана от нажатия до записи файла (в мс)
+        self.capture_latencies = deque(maxlen=SCREENSHOT_LATENCY_SAMPLES)
+        # Снимки, ждущие захвата экрана, и прозрачность холста до их начала
+        self._pending_captures = 0
+        self._capture_opacity = 1.0
+        
         # Область панели инструментов (чтобы не перехватывать клики на ней)
         self.toolbar_rect = None
+        
+        # Регион всего холста для маски - пересоздаётся только при изменении размера
+        self._screen_region = None
+        
+        # Все запросы перерисовки проходят через планировщик кадров
+        self.render_scheduler = RenderScheduler(self)
+        
+        # Движения ластика копятся между кадрами и обрабатываются раз в кадр
+        # как цепочка капсул от предыдущего обработанного положения
+        self._eraser_last_pos = None
+        self._eraser_pending = []
+        self._eraser_gesture_recorded = False
+        self.render_scheduler.add_frame_callback(self._flush_eraser)
+        
+        # Индикатор производительности: None, пока скрыт - тогда счётчики не ведутся
+        self.perf_hud = None
+        self._perf_hud_timer = QTimer(self)
+        self._perf_hud_timer.setInterval(PERF_HUD_REFRESH_MS)
+        self._perf_hud_timer.timeout.connect(self._refresh_perf_hud)
+    
+    @property
+    def drawings(self) -> List[Tool]:
+        """Завершённые рисунки сцены"""
+        return self.scene.drawings
     
     def init_ui(self) -> None:
         """Инициализация интерфейса окна"""
@@ -83,8 +148,10 @@ class TransparentCanvas(QWidget):
     
     def set_toolbar_rect(self, rect: QRect) -> None:
         """Установить область панели инструментов и обновить маску холста"""
+        if rect == self.toolbar_rect:
+            return
         self.toolbar_rect = rect
-        print(f'📍 Область панели инструментов установлена: {rect}')
+        logger.debug('📍 Область панели инструментов установлена: %s', rect)
         self.update_mask()
     
     def update_mask(self) -> None:
@@ -92,8 +159,9 @@ class TransparentCanvas(QWidget):
         if not self.toolbar_rect:
             return
         
-        # Создаём регион на весь экран
-        screen_region = QRegion(self.rect())
+        # Регион на весь экран кэшируется, пересчитывается только вырез панели
+        if self._screen_region is None:
+            self._screen_region = QRegion(self.rect())
         
         # Создаём регион панели инструментов в глобальных координатах
         # Преобразуем в локальные координаты холста
@@ -103,45 +171,355 @@ class TransparentCanvas(QWidget):
             self.toolbar_rect.width(),
             self.toolbar_rect.height()
         )
-        toolbar_region = QRegion(toolbar_local)
         
-        # Вычитаем область панели из области холста
-        canvas_region = screen_region.subtracted(toolbar_region)
-        
-        # Применяем маску
-        self.setMask(canvas_region)
-        print(f'✂️  Маска холста обновлена, панель исключена из области холста')
+        # Вычитаем область панели из области холста и применяем маску
+        self.setMask(self._screen_region.subtracted(QRegion(toolbar_local)))
+        logger.debug('✂️  Маска холста обновлена, панель исключена из области холста')
     
     def enable_drawing(self) -> None:
         """Включить режим рисования (показать холст)"""
-        print('👁️  Показываю холст...')
-        self.show()
+        self._toggle_started = time.perf_counter()
+        self.drawing_enabled = True
+        
+        if self.toggle_mode == 'hide':
+            logger.info('👁️  Показываю холст...')
+            self.show()
+        else:
+            if not self.isVisible():
+                self.show()
+            self._set_input_passthrough(False)
+            self.render_scheduler.request_update()
+        
         self.activateWindow()
         self.raise_()
-        print('✅ Холст активен и поверх всех окон')
+        logger.info('✅ Холст активен и поверх всех окон')
     
     def disable_drawing(self) -> None:
         """Выключить режим рисования (скрыть холст)"""
-        print('🙈 Скрываю холст...')
-        self.hide()
-        print('✅ Холст скрыт')
+        self._toggle_started = time.perf_counter()
+        self.drawing_enabled = False
+        
+        if self.toggle_mode == 'hide':
+            logger.info('🙈 Скрываю холст...')
+            self.hide()
+            # Скрытое окно не перерисовывается - задержка равна времени hide()
+            self._record_toggle_latency()
+        else:
+            self._set_input_passthrough(True)
+            self.render_scheduler.request_update()
+        
+        # Незавершённый штрих не получит отпускания кнопки - отбрасываем его
+        self._abandon_stroke()
+        logger.info('✅ Холст скрыт')
+    
+    def _abandon_stroke(self) -> None:
+        """Бросить рисунок в процессе рисования вместе с его слоем штриха"""
+        if isinstance(self.current_tool, PenTool):
+            self.renderer.discard_active_stroke()
+            self.invalidate_rect(self.current_tool.bounding_rect())
+        self.is_drawing = False
+        self.current_tool = None
+    
+    def _set_input_passthrough(self, enabled: bool) -> None:
+        """
+        Пропускать ли ввод сквозь окно холста
+        
+        Флаг меняется у уже созданного нативного окна, без повторного
+        отображения полноэкранной поверхности.
+        """
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, enabled)
+        window = self.windowHandle()
+        if window is not None:
+            window.setFlag(Qt.WindowTransparentForInput, enabled)
+    
+    def _record_toggle_latency(self) -> None:
+        """Зафиксировать задержку последнего переключения режима рисования"""
+        if self._toggle_started is None:
+            return
+        latency_ms = (time.perf_counter() - self._toggle_started) * 1000
+        self._toggle_started = None
+        self.toggle_latencies.append(latency_ms)
+        logger.debug('⏱️  Переключение режима рисования: %.2f мс', latency_ms)
+    
+    def toggle_latency_stats(self) -> dict:
+        """Статистика задержки переключения режима рисования (в мс)"""
+        samples = sorted(self.toggle_latencies)
+        if not samples:
+            return {'count': 0, 'last': None, 'median': None, 'max': None}
+        return {
+            'count': len(samples),
+            'last': self.toggle_latencies[-1],
+            'median': samples[len(samples) // 2],
+            'max': samples[-1],
+        }
+    
+    def toggle_perf_hud(self) -> None:
+        """Показать или скрыть индикатор производительности"""
+        if self.perf_hud is None:
+            self.perf_hud = PerfHud()
+            self._perf_hud_timer.start()
+            self._refresh_perf_hud()
+        else:
+            self._perf_hud_timer.stop()
+            self.render_scheduler.request_update(self.perf_hud.rect)
+            self.perf_hud = None
+    
+    def _refresh_perf_hud(self) -> None:
+        """Пересчитать показатели индикатора и перерисовать только его область"""
+        self.perf_hud.refresh(self)
+        self.render_scheduler.request_update(self.perf_hud.rect)
     
     def clear_canvas(self) -> None:
         """Очистить весь холст"""
-        print(f'🗑️  Очистка холста... (было рисунков: {len(self.drawings)})')
-        self.drawings.clear()
-        self.current_tool = None
-        self.update()
-        print('✅ Холст очищен')
+        logger.info('🗑️  Очистка холста... (было рисунков: %d)', len(self.drawings))
+        self._abandon_stroke()
+        if not self.scene.is_empty():
+            # Прежнее состояние целиком сохраняется как контрольная точка - отмена очистки O(1)
+            checkpoint = self._swap_scene_state(Scene.empty_state())
+            self.history.record(HistoryEntry(HistoryEntry.CLEAR, checkpoint=checkpoint,
+                                             size=Scene.state_size(checkpoint)))
+        logger.info('✅ Холст очищен')
+    
+    def save_scene(self, path: str) -> None:
+        """Сохранить доску в файл сцены (.skd)"""
+        drawings, baked_layer = self.scene.snapshot()
+        scene_file.save_scene(path, list(drawings), baked_layer)
+        logger.info('💾 Доска сохранена: %s (рисунков: %d)', path, len(self.drawings))
+    
+    def load_scene(self, path: str) -> None:
+        """
+        Загрузить доску из файла сцены (.skd)
+        
+        Текущая доска сохраняется в истории как контрольная точка,
+        поэтому загрузку можно отменить.
+        
+        Raises:
+            OSError, scene_file.SceneFileError: Если файл не удалось прочитать
+        """
+        self.load_scene_data(scene_file.load_scene(path))
+        logger.info('📂 Доска загружена: %s (рисунков: %d)', path, len(self.drawings))
+    
+    def load_scene_data(self, data: scene_file.SceneData) -> None:
+        """
+        Заменить доску разобранной сценой (с контрольной точкой в истории)
+        
+        Рисунки сверх лимитов запекаются в фоне: первый кадр показывает
+        новейшие рисунки сразу, старые появляются, когда слой готов.
+        """
+        self._abandon_stroke()
+        state, to_bake = self.scene.build_loaded_state(data.drawings, data.baked_layer, MAX_DRAWINGS,
+                                                       DRAWINGS_MEMORY_BUDGET, MEMORY_BAKE_TARGET)
+        checkpoint = self._swap_scene_state(state)
+        self.history.record(HistoryEntry(HistoryEntry.CLEAR, checkpoint=checkpoint,
+                                         size=Scene.state_size(checkpoint)))
+        if to_bake:
+            self.scene.bake_in_background(to_bake, on_finished=self._on_background_bake)
+    
+    def _on_background_bake(self) -> None:
+        """Фоновое запекание закончено - показать запечённый слой"""
+        self.scene.settle_bake()
+        # Результат мог быть уже применён раньше (снимок, замена сцены) - кэш перестраивается в любом случае
+        self.renderer.invalidate()
+        self.render_scheduler.request_update()
+    
+    def export_png(self, path: str, on_finished: Optional[Callable[[str], None]] = None,
+                   on_failed: Optional[Callable[[str], None]] = None) -> ExportSignals:
+        """
+        Экспортировать аннотации в PNG в фоновом потоке
+        
+        Args:
+            path: Путь к файлу
+            on_finished: Вызывается с путём к файлу после записи
+            on_failed: Вызывается с текстом ошибки
+        
+        Returns:
+            ExportSignals: Сигналы прогресса и завершения
+        """
+        drawings, baked_layer = self.scene.snapshot()
+        task = PngExportTask(path, drawings, baked_layer, self.size(), self.devicePixelRatioF())
+        return self._start_export(task, on_finished, on_failed)
+    
+    def export_svg(self, path: str, on_finished: Optional[Callable[[str], None]] = None,
+                   on_failed: Optional[Callable[[str], None]] = None) -> ExportSignals:
+        """
+        Экспортировать сцену в SVG в фоновом потоке
+        
+        Args:
+            path: Путь к файлу
+            on_finished: Вызывается с путём к файлу после записи
+            on_failed: Вызывается с текстом ошибки
+        
+        Returns:
+            ExportSignals: Сигналы прогресса и завершения
+        """
+        drawings, baked_layer = self.scene.snapshot()
+        task = SvgExportTask(path, drawings, baked_layer, self.size())
+        return self._start_export(task, on_finished, on_failed)
+    
+    @staticmethod
+    def _start_export(task, on_finished: Optional[Callable[[str], None]],
+                      on_failed: Optional[Callable[[str], None]]) -> ExportSignals:
+        """
+        Запустить задачу экспорта в пуле потоков
+        
+        Обработчики подключаются до запуска: быстрая задача может завершиться
+        раньше, чем вызывающий код получит её сигналы.
+        """
+        if on_finished is not None:
+            task.signals.finished.connect(on_finished)
+        if on_failed is not None:
+            task.signals.failed.connect(on_failed)
+        QThreadPool.globalInstance().start(task)
+        return task.signals
+    
+    def capture_screenshot(self, path: str, on_finished: Optional[Callable[[str], None]] = None,
+                           on_failed: Optional[Callable[[str], None]] = None,
+                           on_grabbed: Optional[Callable[[], None]] = None) -> ExportSignals:
+        """
+        Снять экран под холстом и наложить на него рисунки
+        
+        Холст становится прозрачным, а экран захватывается через
+        SCREENSHOT_HIDE_DELAY_MS - после processEvents() композитор ещё мог
+        не перерисовать экран, и на снимок попало бы затемнение. Захват
+        выполняется в GUI-потоке, наложение растрового кэша рисунков и
+        кодирование - в пуле потоков.
+        
+        Args:
+            path: Путь к файлу
+            on_finished: Вызывается с путём к файлу после записи
+            on_failed: Вызывается с текстом ошибки
+            on_grabbed: Вызывается сразу после захвата экрана (можно вернуть скрытые окна)
+        
+        Returns:
+            ExportSignals: Сигналы прогресса и завершения
+        """
+        started = time.perf_counter()
+        
+        # Кэш завершённых рисунков нужен актуальным - перерисовывать каждый Tool не придётся
+        self._sync_scene_size()
+        layer = QImage(self.renderer.committed_layer()) if not self.scene.is_empty() else None
+        
+        task = ScreenshotTask(path, None, layer, SCREENSHOT_FORMAT.upper(), SCREENSHOT_QUALITY)
+        task.signals.finished.connect(lambda _: self._record_capture_latency(started))
+        if on_finished is not None:
+            task.signals.finished.connect(on_finished)
+        if on_failed is not None:
+            task.signals.failed.connect(on_failed)
+        
+        # Прячем затемнение холста на время захвата (один раз на все ждущие снимки)
+        if self._pending_captures == 0:
+            self._capture_opacity = self.windowOpacity()
+            self.setWindowOpacity(0.0)
+        self._pending_captures += 1
+        QTimer.singleShot(SCREENSHOT_HIDE_DELAY_MS, lambda: self._grab_screen(task, on_grabbed))
+        return task.signals
+    
+    def _grab_screen(self, task: ScreenshotTask, on_grabbed: Optional[Callable[[], None]]) -> None:
+        """Захватить экран под скрытым холстом и запустить задачу снимка"""
+        screen = self.screen() or QApplication.primaryScreen()
+        origin = self.mapToGlobal(QPoint(0, 0)) - screen.geometry().topLeft()
+        pixmap = screen.grabWindow(0, origin.x(), origin.y(), self.width(), self.height())
+        
+        self._pending_captures -= 1
+        if self._pending_captures == 0:
+            self.setWindowOpacity(self._capture_opacity)
+        if on_grabbed is not None:
+            on_grabbed()
+        
+        screen_image = pixmap.toImage().convertToFormat(QImage.Format_RGB32)
+        screen_image.setDevicePixelRatio(pixmap.devicePixelRatio())
+        task.screen_image = screen_image
+        QThreadPool.globalInstance().start(task)
+    
+    def _record_capture_latency(self, started: float) -> None:
+        """Зафиксировать задержку снимка экрана от запроса до записи файла"""
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.capture_latencies.append(latency_ms)
+        logger.info('⏱️  Снимок экрана готов за %.1f мс', latency_ms)
+    
+    def attach_journal(self, journal) -> None:
+        """Подключить журнал автосохранения и записать в него снимок текущей сцены"""
+        self.scene.attach_journal(journal)
+    
+    def restore_from_journal(self, snapshot, operations: List[tuple]) -> None:
+        """Восстановить сцену из снимка и операций журнала автосохранения (без истории)"""
+        self.scene.replay(snapshot, operations)
+        self.history.clear()
+        self.renderer.invalidate()
+        self.render_scheduler.request_update()
+        if not self.scene.is_empty():
+            logger.info('♻️  Восстановлена доска из автосохранения (рисунков: %d)', len(self.drawings))
+    
+    def _swap_scene_state(self, state: tuple) -> tuple:
+        """Заменить состояние сцены целиком и перерисовать холст (возвращает прежнее)"""
+        old_state = self.scene.swap_state(state)
+        self.renderer.invalidate()
+        self.render_scheduler.request_update()
+        return old_state
+    
+    def undo(self) -> None:
+        """Отменить последнее изменение сцены"""
+        if self.is_drawing:
+            return
+        entry = self.history.pop_undo()
+        if entry is None:
+            return
+        
+        if entry.kind == HistoryEntry.ADD:
+            self.scene.remove(entry.drawing)
+            self.renderer.invalidate()
+            self.invalidate_rect(entry.drawing.bounding_rect())
+        elif entry.kind == HistoryEntry.ERASE:
+            for batch in reversed(entry.erased):
+                self.scene.insert_at(batch)
+            self.renderer.invalidate()
+            self.invalidate_rect(self._erased_bounds(entry.erased))
+        elif entry.kind == HistoryEntry.CLEAR:
+            entry.checkpoint = self._swap_scene_state(entry.checkpoint)
+        logger.debug('↩️  Отменено: %s (рисунков: %d)', entry.kind, len(self.drawings))
+    
+    def redo(self) -> None:
+        """Повторить отменённое изменение сцены"""
+        if self.is_drawing:
+            return
+        entry = self.history.pop_redo()
+        if entry is None:
+            return
+        
+        if entry.kind == HistoryEntry.ADD:
+            self.scene.add(entry.drawing)
+            self.renderer.commit(entry.drawing)
+            self.invalidate_rect(entry.drawing.bounding_rect())
+        elif entry.kind == HistoryEntry.ERASE:
+            for batch in entry.erased:
+                self.scene.remove_at(batch)
+            self.renderer.invalidate()
+            self.invalidate_rect(self._erased_bounds(entry.erased))
+        elif entry.kind == HistoryEntry.CLEAR:
+            entry.checkpoint = self._swap_scene_state(entry.checkpoint)
+        logger.debug('↪️  Повторено: %s (рисунков: %d)', entry.kind, len(self.drawings))
+    
+    @staticmethod
+    def _erased_bounds(batches: List[List[Tuple[int, Tool]]]) -> QRect:
+        """Общие габариты стёртых рисунков"""
+        damaged = QRect()
+        for batch in batches:
+            for _, drawing in batch:
+                damaged = damaged.united(drawing.bounding_rect())
+        return damaged
     
     def _check_memory_limit(self) -> None:
-        """Проверить и применить ограничение на количество рисунков"""
-        if len(self.drawings) > MAX_DRAWINGS:
-            # Удаляем самые старые рисунки
-            excess = len(self.drawings) - MAX_DRAWINGS
-            self.drawings = self.drawings[excess:]
-            if DEBUG_MODE:
-                print(f'⚠️  Удалено {excess} старых рисунков (лимит: {MAX_DRAWINGS})')
+        """Проверить бюджет памяти и запечь самые старые рисунки в растр"""
+        count = self.scene.bake_count(MAX_DRAWINGS, DRAWINGS_MEMORY_BUDGET, MEMORY_BAKE_TARGET)
+        if count:
+            self._bake_drawings(count)
+    
+    def _bake_drawings(self, count: int) -> None:
+        """Перенести count самых старых рисунков в растровый слой, освободив их векторы"""
+        baked = self.scene.bake(count)
+        if baked:
+            # Запечённые рисунки - самые старые, поэтому кэш рисунков не меняется
+            self.history.on_baked(count, set(baked))
     
     def create_tool(self) -> Tool:
         """Создать новый инструмент на основе текущих настроек"""
@@ -159,14 +537,14 @@ class TransparentCanvas(QWidget):
     
     def mousePressEvent(self, event: QMouseEvent) -> None:
         """Обработка нажатия кнопки мыши"""
+        if self.perf_hud is not None:
+            self.perf_hud.input_received()
         # Используем левую кнопку для рисования
         if event.button() == Qt.LeftButton:
-            if DEBUG_MODE:
-                print(f'🖱️  Нажата левая кнопка мыши в точке ({event.pos().x()}, {event.pos().y()})')
+            logger.debug('🖱️  Нажата левая кнопка мыши в точке (%d, %d)', event.pos().x(), event.pos().y())
             self.is_drawing = True
             self.current_tool = self.create_tool()
-            if DEBUG_MODE:
-                print(f'✏️  Начато рисование инструментом: {self.current_tool_type.value}')
+            logger.debug('✏️  Начато рисование инструментом: %s', self.current_tool_type.value)
             
             # Для инструментов с одной точкой начала
             if self.current_tool_type in [ToolType.LINE, ToolType.RECTANGLE, 
@@ -175,125 +553,174 @@ class TransparentCanvas(QWidget):
             
             # Для карандаша добавляем первую точку
             elif self.current_tool_type == ToolType.PEN:
+                self.renderer.prepare_active_layer()
                 self.current_tool.add_point(event.pos())
             
             # Для ластика
             elif self.current_tool_type == ToolType.ERASER:
+                self._eraser_gesture_recorded = False
                 self.erase_at_point(event.pos())
+                self._eraser_last_pos = (event.pos().x(), event.pos().y())
     
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
         """Обработка движения мыши"""
         if not self.is_drawing or not self.current_tool:
             return
+        if self.perf_hud is not None:
+            self.perf_hud.input_received()
         
         # Логируем движение только в режиме отладки и с интервалом
-        if DEBUG_MODE and event.pos().x() % MOUSE_LOG_INTERVAL == 0:
-            print(f'↔️  Движение мыши: ({event.pos().x()}, {event.pos().y()})')
+        if event.pos().x() % MOUSE_LOG_INTERVAL == 0:
+            logger.debug('↔️  Движение мыши: (%d, %d)', event.pos().x(), event.pos().y())
         
         # Для инструментов с конечной точкой
         if self.current_tool_type in [ToolType.LINE, ToolType.RECTANGLE, 
                                       ToolType.CIRCLE, ToolType.ARROW]:
+            # Перерисовываем старые и новые габариты предпросмотра
+            old_rect = self.current_tool.bounding_rect()
             self.current_tool.set_end_point(event.pos())
-            self.update()
+            self.invalidate_rect(old_rect.united(self.current_tool.bounding_rect()))
         
         # Для карандаша добавляем точки
         elif self.current_tool_type == ToolType.PEN:
             self.current_tool.add_point(event.pos())
-            self.update()
+            self.renderer.paint_active_segment(self.current_tool)
+            self.invalidate_rect(self.current_tool.last_segment_rect())
         
-        # Для ластика продолжаем стирать
+        # Для ластика запоминаем положение до следующего кадра
         elif self.current_tool_type == ToolType.ERASER:
-            self.erase_at_point(event.pos())
+            self._eraser_pending.append((event.pos().x(), event.pos().y()))
+            self.render_scheduler.request_frame()
     
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
         """Обработка отпускания кнопки мыши"""
         if event.button() == Qt.LeftButton and self.is_drawing:
-            if DEBUG_MODE:
-                print(f'🖱️  Отпущена левая кнопка мыши')
+            logger.debug('🖱️  Отпущена левая кнопка мыши')
             self.is_drawing = False
             
+            # Дотираем накопленный путь ластика
+            if self.current_tool_type == ToolType.ERASER:
+                self._flush_eraser()
+                self._eraser_last_pos = None
+            
             # Сохраняем завершённый рисунок (кроме ластика)
             if self.current_tool and self.current_tool_type != ToolType.ERASER:
-                self.drawings.append(self.current_tool)
+                self.scene.add(self.current_tool)
+                self.history.record(HistoryEntry(HistoryEntry.ADD, drawing=self.current_tool))
+                if isinstance(self.current_tool, PenTool):
+                    self.renderer.merge_active_layer(self.current_tool.bounding_rect())
+                else:
+                    self.renderer.commit(self.current_tool)
                 # Проверяем лимит памяти
                 self._check_memory_limit()
-                if DEBUG_MODE:
-                    print(f'💾 Рисунок сохранён! Всего рисунков: {len(self.drawings)}')
+                logger.debug('💾 Рисунок сохранён! Всего рисунков: %d', len(self.drawings))
             
+            if self.current_tool:
+                self.invalidate_rect(self.current_tool.bounding_rect())
             self.current_tool = None
-            self.update()
-            if DEBUG_MODE:
-                print(f'🔄 Холст обновлён')
+            logger.debug('🔄 Холст обновлён')
+    
+    def _flush_eraser(self) -> None:
+        """Обработать накопленное за кадр движение ластика одной проверкой"""
+        if not self._eraser_pending:
+            return
+        
+        path = self._eraser_pending
+        if self._eraser_last_pos is not None:
+            path.insert(0, self._eraser_last_pos)
+        self.erase_along(path)
+        self._eraser_last_pos = path[-1]
+        self._eraser_pending = []
     
     def erase_at_point(self, point: QPoint) -> None:
         """Стереть рисунки в указанной точке"""
+        self.erase_along([(point.x(), point.y())])
+    
+    def erase_along(self, path: List[Tuple[int, int]]) -> None:
+        """Стереть рисунки, задетые ластиком при движении по цепочке положений"""
         eraser_radius = self.current_width * ERASER_RADIUS_MULTIPLIER
+        erased = self.scene.hit_test(path, eraser_radius)
+        if not erased:
+            return
         
-        # Проверяем каждый рисунок
-        drawings_to_remove = []
-        for drawing in self.drawings:
-            # Проверяем пересечение с точками рисунка
-            if hasattr(drawing, 'points') and drawing.points:
-                for draw_point in drawing.points:
-                    distance = ((point.x() - draw_point.x()) ** 2 + 
-                               (point.y() - draw_point.y()) ** 2) ** 0.5
-                    if distance < eraser_radius:
-                        drawings_to_remove.append(drawing)
-                        break
-            
-            # Проверяем пересечение с линией/фигурой
-            elif drawing.start_point and drawing.end_point:
-                import math
-                # Вычисляем расстояние от точки до отрезка
-                x1, y1 = drawing.start_point.x(), drawing.start_point.y()
-                x2, y2 = drawing.end_point.x(), drawing.end_point.y()
-                px, py = point.x(), point.y()
-                
-                dx = x2 - x1
-                dy = y2 - y1
-                
-                if dx == 0 and dy == 0:
-                    # Линия - это точка
-                    dist = math.sqrt((px - x1)**2 + (py - y1)**2)
-                else:
-                    # Параметр t проекции точки на линию
-                    t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
-                    
-                    # Ближайшая точка на отрезке
-                    closest_x = x1 + t * dx
-                    closest_y = y1 + t * dy
-                    
-                    # Расстояние до ближайшей точки
-                    dist = math.sqrt((px - closest_x)**2 + (py - closest_y)**2)
-                
-                if dist < eraser_radius:
-                    drawings_to_remove.append(drawing)
-        
-        # Удаляем помеченные рисунки
-        for drawing in drawings_to_remove:
-            if drawing in self.drawings:
-                self.drawings.remove(drawing)
-                if DEBUG_MODE:
-                    print(f'🧹 Стёрт рисунок типа: {type(drawing).__name__}')
-        
-        if drawings_to_remove:
-            self.update()
+        # Удаляем задетые рисунки, запоминая их позиции для отмены
+        self.scene.remove_at(erased)
+        
+        # Весь жест ластика - один шаг отмены
+        size = sum(drawing.memory_size() for _, drawing in erased)
+        if not (self._eraser_gesture_recorded and self.history.extend_last_erase(erased, size)):
+            self.history.record(HistoryEntry(HistoryEntry.ERASE, erased=[erased], size=size))
+        self._eraser_gesture_recorded = self.is_drawing
+        if logger.isEnabledFor(logging.DEBUG):
+            for _, drawing in erased:
+                logger.debug('🧹 Стёрт рисунок типа: %s', type(drawing).__name__)
+        
+        self.renderer.invalidate()
+        self.invalidate_rect(self._erased_bounds([erased]))
+    
+    def invalidate_rect(self, rect: QRect) -> None:
+        """Запросить перерисовку только изменённой области (с запасом на сглаживание)"""
+        if rect.isEmpty():
+            return
+        self.render_scheduler.request_update(
+            rect.adjusted(-DAMAGE_MARGIN, -DAMAGE_MARGIN, DAMAGE_MARGIN, DAMAGE_MARGIN))
+    
+    def _sync_scene_size(self) -> None:
+        """Передать сцене размер и плотность пикселей окна (для растровых слоёв)"""
+        ratio = self.devicePixelRatioF()
+        if self.scene.size != self.size() or self.scene.device_pixel_ratio != ratio:
+            self.scene.set_canvas_size(self.size(), ratio)
+            self.history.fit_layer_size(int(self.width() * ratio) * int(self.height() * ratio) * 4)
+    
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        """При изменении размера окна кэш рисунков и маску нужно пересоздать"""
+        self._sync_scene_size()
+        self.renderer.invalidate()
+        self._screen_region = None
+        self.update_mask()
+        super().resizeEvent(event)
+    
+    def keyPressEvent(self, event: QKeyEvent) -> None:
+        """Отмена и повтор стандартными сочетаниями (Ctrl+Z, Ctrl+Y / Ctrl+Shift+Z)"""
+        if event.matches(QKeySequence.Undo):
+            self.undo()
+        elif event.matches(QKeySequence.Redo):
+            self.redo()
+        else:
+            super().keyPressEvent(event)
     
     def paintEvent(self, event: QPaintEvent) -> None:
         """Отрисовка всех элементов на холсте"""
+        if not self.drawing_enabled:
+            # Выключенный холст полностью прозрачен
+            self._record_toggle_latency()
+            return
+        
+        hud = self.perf_hud
+        started = time.perf_counter() if hud is not None else 0.0
+        
         painter = QPainter(self)
         
         # Включаем сглаживание для красивых линий
         painter.setRenderHint(QPainter.Antialiasing, True)
         painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
         
+        # Перерисовываем только запрошенную область
+        dirty_rect = event.rect()
+        
         # Рисуем полупрозрачный фон чтобы было видно, что режим рисования активен
-        painter.fillRect(self.rect(), QColor(0, 0, 0, OVERLAY_OPACITY))  # Тёмный полупрозрачный фон
+        painter.fillRect(dirty_rect, QColor(0, 0, 0, OVERLAY_OPACITY))  # Тёмный полупрозрачный фон
+        
+        # Выводим завершённые рисунки из кэша и текущий инструмент в процессе рисования
+        self._sync_scene_size()
+        active_tool = self.current_tool if self.is_drawing else None
+        self.renderer.render(painter, dirty_rect, active_tool)
         
-        # Рисуем все завершённые рисунки
-        for drawing in self.drawings:
-            drawing.draw(painter)
+        # Индикатор рисуется поверх и в замер длительности кадра не входит
+        if hud is not None:
+            hud.frame_painted(started, time.perf_counter())
+            if dirty_rect.intersects(hud.rect):
+                hud.paint(painter)
         
-        # Рисуем текущий инструмент в процессе рисования
-        if self.current_tool and self.is_drawing:
-            self.current_tool.draw(painter)
+        painter.end()
+        self._record_toggle_latency()
@@ -4,6 +4,7 @@
 Содержит константы, настройки и перечисления
 """
 
+import os
 from enum import Enum
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QColor
@@ -41,6 +42,38 @@ MAX_LINE_WIDTH = 10
 HOTKEY_TOGGLE = 'ctrl+d'      # Включить/выключить режим рисования
 HOTKEY_CLEAR = 'ctrl+shift+c' # Очистить экран
 HOTKEY_EXIT = 'esc'           # Выход из приложения
+HOTKEY_EXPORT_PNG = 'ctrl+shift+e'  # Экспорт аннотаций в PNG
+HOTKEY_SCREENSHOT = 'ctrl+shift+s'  # Снимок экрана с аннотациями
+HOTKEY_EXPORT_SVG = 'ctrl+shift+g'  # Экспорт сцены в SVG
+HOTKEY_RECORD_INPUT = 'ctrl+shift+r'  # Начать/остановить запись ввода
+HOTKEY_PERF_HUD = 'ctrl+shift+p'  # Показать/скрыть индикатор производительности
+HOTKEY_PROFILE = 'ctrl+shift+f'   # Начать/остановить профилирование
+
+# Файлы сцены
+SCENE_FILE_FILTER = 'Доска SharkDraw (*.skd)'
+
+# Папка для экспорта изображений
+EXPORT_DIR = os.path.join(os.path.expanduser('~'), 'Pictures', 'SharkDraw')
+SCREENSHOT_FORMAT = 'png'     # Формат снимков экрана: 'png' или 'jpg'
+SCREENSHOT_QUALITY = 90       # Качество JPEG (для PNG не используется)
+SCREENSHOT_LATENCY_SAMPLES = 20  # Сколько последних замеров задержки снимка хранить
+SCREENSHOT_HIDE_DELAY_MS = 50    # Пауза между скрытием холста и захватом экрана (мс):
+                                 # композитор должен успеть перерисовать экран без холста
+
+# Папка для записей ввода (воспроизведение: python main.py --replay <файл>)
+RECORDINGS_DIR = os.path.join(os.path.expanduser('~'), '.sharkdraw', 'recordings')
+
+# Папка для профилей (.pstats и свёрнутые стеки для flame graph)
+PROFILES_DIR = os.path.join(os.path.expanduser('~'), '.sharkdraw', 'profiles')
+
+# Кэш растрированных SVG-иконок (по хэшу файла, размеру и плотности пикселей)
+ICON_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.sharkdraw', 'cache', 'icons')
+
+# Автосохранение (журнал изменений холста)
+AUTOSAVE_ENABLED = True
+AUTOSAVE_DIR = os.path.join(os.path.expanduser('~'), '.sharkdraw', 'autosave')
+JOURNAL_FSYNC_DELAY_MS = 100  # Сколько копить записи журнала перед одним fsync (в мс от первой записи пачки)
+JOURNAL_COMPACT_EVERY = 500   # Через сколько записей журнал сворачивается в полный снимок
 
 # Настройки окна
 WINDOW_OPACITY = 1.0          # Непрозрачность окна (1.0 = полностью непрозрачно)
@@ -48,13 +81,34 @@ TOOLBAR_WIDTH = 80            # Ширина панели инструменто
 TOOLBAR_PADDING = 10          # Отступы в панели инструментов
 
 # Настройки производительности
-MAX_DRAWINGS = 1000           # Максимальное количество рисунков (для предотвращения утечки памяти)
-DEBUG_MODE = False            # Режим отладки (выводить подробные логи)
+MAX_DRAWINGS = 1000           # Максимальное количество векторных рисунков (старые запекаются в растр)
+DRAWINGS_MEMORY_BUDGET = 64 * 1024 * 1024  # Бюджет памяти векторных рисунков (в байтах)
+MEMORY_BAKE_TARGET = 0.75     # При превышении лимита запекаем старые рисунки до этой доли лимита
+HISTORY_MAX_ENTRIES = 500     # Максимальное число шагов отмены
+HISTORY_MEMORY_BUDGET = 32 * 1024 * 1024  # Бюджет памяти истории отмены (в байтах)
+HISTORY_BUDGET_LAYERS = 2     # Бюджет истории не меньше стольких растров размером с холст
+                              # (контрольная точка очистки 4K-доски - это один такой растр)
+DEBUG_MODE = False            # Режим отладки (журналировать сообщения уровня DEBUG)
+SPATIAL_GRID_CELL_SIZE = 128  # Размер ячейки пространственного индекса для ластика (в пикселях)
+TARGET_FPS = 60               # Целевая частота перерисовки холста (например, 60/120/144 Гц)
+CANVAS_TOGGLE_MODE = 'passthrough'  # Переключение рисования: 'passthrough' (окно остаётся на экране) или 'hide'
+TOGGLE_LATENCY_SAMPLES = 50   # Сколько последних замеров задержки переключения хранить
+PERF_HUD_SAMPLES = 240        # Сколько последних кадров учитывает индикатор производительности
+PERF_HUD_REFRESH_MS = 250     # Период обновления показателей индикатора (в мс)
+PROFILER_SAMPLE_INTERVAL_MS = 5  # Период снятия стека при профилировании (в мс)
+
+# Журналирование
+LOG_LEVEL = 'DEBUG' if DEBUG_MODE else 'INFO'  # Минимальный уровень сообщений
+LOG_DIR = os.path.join(os.path.expanduser('~'), '.sharkdraw', 'logs')
+LOG_FILE_MAX_BYTES = 1024 * 1024  # Размер файла журнала до ротации (в байтах)
+LOG_FILE_BACKUPS = 3              # Сколько старых файлов журнала хранить
+LOG_RING_BUFFER_SIZE = 1000       # Сколько последних сообщений держать в памяти
 
 # Настройки рисования
 ERASER_RADIUS_MULTIPLIER = 3  # Множитель радиуса ластика относительно толщины линии
 OVERLAY_OPACITY = 40          # Прозрачность оверлея при рисовании (0-255)
 MOUSE_LOG_INTERVAL = 20       # Интервал логирования движения мыши (в пикселях)
+DAMAGE_MARGIN = 2             # Запас на сглаживание при перерисовке изменённой области (в пикселях)
 
 # ============================================================================
 # SHARKDRAW BRANDING
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Экспорт аннотаций в изображение
+Отрисовка и кодирование выполняются в пуле потоков, чтобы холст
+продолжал отвечать на ввод во время экспорта
+"""
+
+from typing import Optional, Sequence
+from PyQt5.QtCore import QObject, QRunnable, QSize, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter
+from src.scene_renderer import create_layer, paint_drawings
+from src.svg_export import write_svg
+
+# Как часто сообщать о прогрессе (в рисунках)
+PROGRESS_STEP = 256
+
+
+class ExportSignals(QObject):
+    """Сигналы фоновой задачи экспорта (доставляются в GUI-поток)"""
+    progress = pyqtSignal(int)    # Прогресс в процентах
+    finished = pyqtSignal(str)    # Путь к готовому файлу
+    failed = pyqtSignal(str)      # Описание ошибки
+
+
+class PngExportTask(QRunnable):
+    """Фоновая задача: отрисовать снимок сцены в QImage и сохранить в PNG"""
+    
+    def __init__(self, path: str, drawings: Sequence, baked_layer: Optional[QImage],
+                 size: QSize, ratio: float = 1.0):
+        """
+        Инициализация задачи
+        
+        Args:
+            path: Путь к PNG-файлу
+            drawings: Неизменяемый снимок рисунков (кортеж)
+            baked_layer: Копия запечённого слоя (или None)
+            size: Логический размер изображения
+            ratio: Плотность пикселей
+        """
+        super().__init__()
+        self.path = path
+        self.drawings = tuple(drawings)
+        self.baked_layer = baked_layer
+        self.size = size
+        self.ratio = ratio
+        self.signals = ExportSignals()
+    
+    def render(self) -> QImage:
+        """Отрисовать снимок сцены на прозрачном фоне"""
+        image = create_layer(self.size, self.ratio)
+        painter = QPainter(image)
+        paint_drawings(painter, (), self.baked_layer)
+        
+        total = len(self.drawings)
+        for i, drawing in enumerate(self.drawings, 1):
+            drawing.draw(painter)
+            if i % PROGRESS_STEP == 0:
+                # Отрисовка - основная часть работы, кодирование - последние 10%
+                self.signals.progress.emit(i * 90 // total)
+        painter.end()
+        return image
+    
+    def run(self) -> None:
+        """Выполняется в потоке пула"""
+        try:
+            image = self.render()
+            self.signals.progress.emit(90)
+            if not image.save(self.path, 'PNG'):
+                self.signals.failed.emit(f'Не удалось записать файл: {self.path}')
+                return
+            self.signals.progress.emit(100)
+            self.signals.finished.emit(self.path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class ScreenshotTask(QRunnable):
+    """Фоновая задача: наложить слой рисунков на снимок экрана и сохранить"""
+    
+    def __init__(self, path: str, screen_image: Optional[QImage], layer: Optional[QImage],
+                 image_format: str = 'PNG', quality: int = -1):
+        """
+        Инициализация задачи
+        
+        Args:
+            path: Путь к файлу снимка
+            screen_image: Снимок экрана под холстом (None - задаётся до запуска задачи)
+            layer: Копия растрового кэша завершённых рисунков (или None)
+            image_format: Формат файла ('PNG' или 'JPG')
+            quality: Качество сжатия (-1 - по умолчанию)
+        """
+        super().__init__()
+        self.path = path
+        self.screen_image = screen_image
+        self.layer = layer
+        self.image_format = image_format
+        self.quality = quality
+        self.signals = ExportSignals()
+    
+    def run(self) -> None:
+        """Выполняется в потоке пула"""
+        try:
+            image = self.screen_image
+            if self.layer is not None:
+                # Кэш рисунков уже отрисован - достаточно одного блита
+                painter = QPainter(image)
+                painter.drawImage(0, 0, self.layer)
+                painter.end()
+            self.signals.progress.emit(50)
+            if not image.save(self.path, self.image_format, self.quality):
+                self.signals.failed.emit(f'Не удалось записать файл: {self.path}')
+                return
+            self.signals.progress.emit(100)
+            self.signals.finished.emit(self.path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class SvgExportTask(QRunnable):
+    """Фоновая задача: потоково записать снимок сцены в SVG"""
+    
+    def __init__(self, path: str, drawings: Sequence, baked_layer: Optional[QImage], size: QSize):
+        """
+        Инициализация задачи
+        
+        Args:
+            path: Путь к SVG-файлу
+            drawings: Неизменяемый снимок рисунков (кортеж)
+            baked_layer: Копия запечённого слоя (или None)
+            size: Логический размер холста
+        """
+        super().__init__()
+        self.path = path
+        self.drawings = tuple(drawings)
+        self.baked_layer = baked_layer
+        self.size = size
+        self.signals = ExportSignals()
+    
+    def run(self) -> None:
+        """Выполняется в потоке пула"""
+        try:
+            write_svg(self.path, self.drawings, self.size.width(), self.size.height(),
+                      self.baked_layer, self.signals.progress.emit)
+            self.signals.progress.emit(100)
+            self.signals.finished.emit(self.path)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Геометрические ядра для проверки попадания ластиком
+Все фигуры представляются набором отрезков (x1, y1, x2, y2), а расстояние
+до них считается пакетно через NumPy - один вызов на все отрезки кандидатов
+"""
+
+import math
+from array import array
+from typing import List, Sequence, Tuple
+import numpy as np
+
+# Допустимое отклонение многоугольника от настоящего эллипса (в пикселях)
+ELLIPSE_TOLERANCE = 0.5
+MIN_ELLIPSE_SEGMENTS = 16
+MAX_ELLIPSE_SEGMENTS = 256
+
+_EMPTY_SEGMENTS = np.empty((0, 4), dtype=np.float64)
+
+
+def polyline_segments(points: array) -> np.ndarray:
+    """
+    Отрезки ломаной из плоского массива точек x0, y0, x1, y1, ...
+    
+    Массив читается напрямую через буфер, без объектов на каждую точку.
+    Одиночная точка превращается в вырожденный отрезок.
+    """
+    if not points:
+        return _EMPTY_SEGMENTS
+    xy = np.frombuffer(points, dtype=np.int32).reshape(-1, 2).astype(np.float64)
+    if len(xy) == 1:
+        return np.hstack((xy, xy))
+    return np.hstack((xy[:-1], xy[1:]))
+
+
+def rectangle_outline_segments(x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+    """Четыре стороны прямоугольника"""
+    return np.array([
+        (x0, y0, x1, y0),
+        (x1, y0, x1, y1),
+        (x1, y1, x0, y1),
+        (x0, y1, x0, y0),
+    ], dtype=np.float64)
+
+
+def ellipse_outline_segments(x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+    """
+    Контур эллипса, вписанного в прямоугольник, в виде многоугольника
+    
+    Число сторон подбирается по радиусу так, чтобы отклонение от
+    настоящего эллипса не превышало ELLIPSE_TOLERANCE.
+    """
+    cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+    rx, ry = abs(x1 - x0) / 2, abs(y1 - y0) / 2
+    radius = max(rx, ry)
+    if radius <= ELLIPSE_TOLERANCE:
+        return np.array([(cx, cy, cx, cy)], dtype=np.float64)
+    
+    step = 2 * math.acos(1 - ELLIPSE_TOLERANCE / radius)
+    count = min(MAX_ELLIPSE_SEGMENTS, max(MIN_ELLIPSE_SEGMENTS, math.ceil(2 * math.pi / step)))
+    angles = np.linspace(0, 2 * math.pi, count + 1)
+    xs = cx + rx * np.cos(angles)
+    ys = cy + ry * np.sin(angles)
+    return np.column_stack((xs[:-1], ys[:-1], xs[1:], ys[1:]))
+
+
+def arrow_segments(x0: float, y0: float, x1: float, y1: float,
+                   head1: Sequence[float], head2: Sequence[float]) -> np.ndarray:
+    """Древко стрелки и два отрезка наконечника"""
+    return np.array([
+        (x0, y0, x1, y1),
+        (x1, y1, head1[0], head1[1]),
+        (x1, y1, head2[0], head2[1]),
+    ], dtype=np.float64)
+
+
+def point_to_segments_distance(px, py, segments: np.ndarray) -> np.ndarray:
+    """
+    Расстояния от точки до каждого отрезка
+    
+    Args:
+        px, py: Координаты точки (или массивы из k точек - по одной на отрезок)
+        segments: Массив формы (k, 4) из отрезков (x1, y1, x2, y2)
+    
+    Returns:
+        np.ndarray: Массив из k расстояний
+    """
+    x1, y1, x2, y2 = segments[:, 0], segments[:, 1], segments[:, 2], segments[:, 3]
+    dx = x2 - x1
+    dy = y2 - y1
+    length_sq = dx * dx + dy * dy
+    
+    # Параметр проекции точки на отрезок; для вырожденных отрезков t = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = ((px - x1) * dx + (py - y1) * dy) / length_sq
+    t = np.clip(np.nan_to_num(t, nan=0.0, posinf=0.0, neginf=0.0), 0.0, 1.0)
+    
+    return np.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+def segment_to_segments_distance(ax: float, ay: float, bx: float, by: float,
+                                 segments: np.ndarray) -> np.ndarray:
+    """
+    Расстояния от отрезка AB до каждого отрезка из набора
+    
+    Если отрезки пересекаются, расстояние равно нулю, иначе это минимум
+    из расстояний от концов одного отрезка до другого.
+    
+    Args:
+        ax, ay, bx, by: Концы отрезка AB
+        segments: Массив формы (k, 4) из отрезков (x1, y1, x2, y2)
+    
+    Returns:
+        np.ndarray: Массив из k расстояний
+    """
+    x1, y1, x2, y2 = segments[:, 0], segments[:, 1], segments[:, 2], segments[:, 3]
+    axis = np.broadcast_to(np.array((ax, ay, bx, by), dtype=np.float64), segments.shape)
+    
+    distances = np.minimum.reduce([
+        point_to_segments_distance(ax, ay, segments),
+        point_to_segments_distance(bx, by, segments),
+        point_to_segments_distance(x1, y1, axis),
+        point_to_segments_distance(x2, y2, axis),
+    ])
+    
+    # Собственное пересечение: концы каждого отрезка лежат по разные стороны другого
+    def cross(ox, oy, px, py, qx, qy):
+        return (px - ox) * (qy - oy) - (py - oy) * (qx - ox)
+    
+    d1 = cross(ax, ay, bx, by, x1, y1)
+    d2 = cross(ax, ay, bx, by, x2, y2)
+    d3 = cross(x1, y1, x2, y2, ax, ay)
+    d4 = cross(x1, y1, x2, y2, bx, by)
+    crossing = (d1 * d2 < 0) & (d3 * d4 < 0)
+    distances[crossing] = 0.0
+    return distances
+
+
+def hit_segment_groups(path: Sequence[Tuple[float, float]], radius: float,
+                       groups: List[np.ndarray], half_widths: Sequence[float]) -> np.ndarray:
+    """
+    Найти группы отрезков (рисунки), задетые следом ластика
+    
+    След - это цепочка капсул (след круга ластика при движении между
+    соседними положениями); из одного положения получается обычный круг.
+    Все отрезки всех групп проверяются пакетно для каждой капсулы.
+    
+    Args:
+        path: Положения центра ластика, накопленные за кадр
+        radius: Радиус ластика
+        groups: Отрезки каждого рисунка, массивы формы (k_i, 4)
+        half_widths: Половина толщины линии каждого рисунка
+    
+    Returns:
+        np.ndarray: Индексы задетых групп
+    """
+    if not groups or not path:
+        return np.empty(0, dtype=np.intp)
+    
+    counts = np.fromiter((len(group) for group in groups), dtype=np.intp, count=len(groups))
+    segments = np.concatenate(groups)
+    if not len(segments):
+        return np.empty(0, dtype=np.intp)
+    
+    owners = np.repeat(np.arange(len(groups)), counts)
+    thresholds = radius + np.asarray(half_widths, dtype=np.float64)[owners]
+    
+    ax, ay = path[0]
+    distances = point_to_segments_distance(ax, ay, segments)
+    for bx, by in path[1:]:
+        if (ax, ay) != (bx, by):
+            np.minimum(distances, segment_to_segments_distance(ax, ay, bx, by, segments),
+                       out=distances)
+        ax, ay = bx, by
+    return np.unique(owners[distances < thresholds])
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""
+История изменений холста (отмена/повтор)
+Журнал команд над списком рисунков с ограничением по числу записей и памяти
+"""
+
+import sys
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+from src.config import HISTORY_MAX_ENTRIES, HISTORY_MEMORY_BUDGET, HISTORY_BUDGET_LAYERS
+
+
+class HistoryEntry:
+    """Одна команда истории"""
+    
+    ADD = 'add'      # Добавлен рисунок (в конец списка)
+    ERASE = 'erase'  # Стёрты рисунки (пачки пар (позиция, рисунок) - по пачке на кадр ластика)
+    CLEAR = 'clear'  # Сцена целиком заменена - очистка или загрузка (хранится контрольная точка)
+    
+    __slots__ = ('kind', 'drawing', 'erased', 'checkpoint', 'size')
+    
+    def __init__(self, kind: str, drawing=None,
+                 erased: Optional[List[List[Tuple[int, object]]]] = None,
+                 checkpoint=None, size: int = 0):
+        """
+        Инициализация записи
+        
+        Args:
+            kind: Тип команды (ADD, ERASE, CLEAR)
+            drawing: Добавленный рисунок (для ADD)
+            erased: Пачки пар (позиция, рисунок) по возрастанию позиций,
+                    в порядке удаления (для ERASE)
+            checkpoint: Прежнее состояние сцены (для CLEAR)
+            size: Память, которую удерживает запись (в байтах)
+        """
+        self.kind = kind
+        self.drawing = drawing
+        self.erased = erased
+        self.checkpoint = checkpoint
+        self.size = size + sys.getsizeof(self)
+    
+    def references(self, drawings: set) -> bool:
+        """Ссылается ли запись на какой-либо из указанных рисунков"""
+        if self.kind == self.ADD:
+            return self.drawing in drawings
+        if self.kind == self.ERASE:
+            return any(drawing in drawings for batch in self.erased for _, drawing in batch)
+        return False
+
+
+class History:
+    """Стеки отмены и повтора; каждая операция над стеком - O(1)"""
+    
+    def __init__(self, max_entries: int = HISTORY_MAX_ENTRIES,
+                 max_bytes: int = HISTORY_MEMORY_BUDGET):
+        """
+        Инициализация истории
+        
+        Args:
+            max_entries: Максимальное число записей отмены
+            max_bytes: Бюджет памяти, удерживаемой историей (в байтах)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._base_bytes = max_bytes
+        self._undo: Deque[HistoryEntry] = deque()
+        self._redo: Deque[HistoryEntry] = deque()
+        self.bytes = 0
+    
+    def fit_layer_size(self, layer_bytes: int) -> None:
+        """
+        Подстроить бюджет памяти под размер растрового слоя холста
+        
+        Контрольная точка с запечённым слоем на большом экране весит
+        почти столько же, сколько базовый бюджет, поэтому бюджет не
+        опускается ниже HISTORY_BUDGET_LAYERS таких слоёв.
+        """
+        self.max_bytes = max(self._base_bytes, HISTORY_BUDGET_LAYERS * layer_bytes)
+        self._enforce_limits()
+    
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+    
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+    
+    def record(self, entry: HistoryEntry) -> None:
+        """Записать новую команду (стек повтора при этом сбрасывается)"""
+        self._clear_redo()
+        self._undo.append(entry)
+        self.bytes += entry.size
+        self._enforce_limits()
+    
+    def extend_last_erase(self, batch: List[Tuple[int, object]], size: int) -> bool:
+        """
+        Дописать пачку стёртых рисунков к последней записи стирания
+        (один жест ластика - один шаг отмены)
+        
+        Returns:
+            bool: False, если последняя запись - не стирание
+        """
+        if not self._undo or self._undo[-1].kind != HistoryEntry.ERASE:
+            return False
+        self._clear_redo()
+        entry = self._undo[-1]
+        entry.erased.append(batch)
+        entry.size += size
+        self.bytes += size
+        self._enforce_limits()
+        return True
+    
+    def pop_undo(self) -> Optional[HistoryEntry]:
+        """Взять команду для отмены и переложить её в стек повтора"""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        return entry
+    
+    def pop_redo(self) -> Optional[HistoryEntry]:
+        """Взять команду для повтора и вернуть её в стек отмены"""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        return entry
+    
+    def on_baked(self, count: int, baked: set) -> None:
+        """
+        Согласовать историю с запеканием count самых старых рисунков в растр
+        
+        Записи, ссылающиеся на запечённые рисунки, и все более старые
+        записи отбрасываются. Запечённые рисунки стояли в начале списка во
+        всех состояниях после последней замены сцены, поэтому позиции
+        стёртых рисунков сдвигаются на count. Рисунок, стёртый из той части
+        списка, что теперь запечена, под растр уже не вернуть: такая запись
+        стирания (позиция после сдвига меньше нуля) и все более старые
+        записи тоже отбрасываются.
+        """
+        self._clear_redo()
+        
+        keep = len(self._undo)
+        for i in range(len(self._undo) - 1, -1, -1):
+            entry = self._undo[i]
+            # Записи до замены сцены относятся к прежнему списку - он не запекался
+            if entry.kind == HistoryEntry.CLEAR:
+                break
+            if entry.references(baked):
+                keep = len(self._undo) - i - 1
+                break
+            if entry.kind == HistoryEntry.ERASE:
+                shifted = [[(index - count, drawing) for index, drawing in batch]
+                           for batch in entry.erased]
+                if any(index < 0 for batch in shifted for index, _ in batch):
+                    keep = len(self._undo) - i - 1
+                    break
+                entry.erased = shifted
+        while len(self._undo) > keep:
+            self.bytes -= self._undo.popleft().size
+    
+    def clear(self) -> None:
+        """Полностью очистить историю"""
+        self._undo.clear()
+        self._redo.clear()
+        self.bytes = 0
+    
+    def _clear_redo(self) -> None:
+        """Сбросить стек повтора"""
+        while self._redo:
+            self.bytes -= self._redo.pop().size
+    
+    def _enforce_limits(self) -> None:
+        """
+        Отбросить самые старые записи сверх лимитов
+        
+        Новейшая запись остаётся даже сверх бюджета памяти: иначе только что
+        выполненную команду (например, очистку большой доски) нельзя было бы отменить.
+        """
+        while self._undo and (len(self._undo) > self.max_entries or
+                              (len(self._undo) > 1 and self.bytes > self.max_bytes)):
+            self.bytes -= self._undo.popleft().size
@@ -6,7 +6,12 @@
 
 import keyboard
 from PyQt5.QtCore import QObject, pyqtSignal
-from src.config import HOTKEY_TOGGLE, HOTKEY_CLEAR, HOTKEY_EXIT
+from src.config import (HOTKEY_TOGGLE, HOTKEY_CLEAR, HOTKEY_EXIT, HOTKEY_EXPORT_PNG,
+                        HOTKEY_SCREENSHOT, HOTKEY_EXPORT_SVG, HOTKEY_RECORD_INPUT,
+                        HOTKEY_PERF_HUD, HOTKEY_PROFILE)
+from src.logger import get_logger
+
+logger = get_logger('hotkeys')
 
 
 class HotkeyManager(QObject):
@@ -16,10 +21,29 @@ class HotkeyManager(QObject):
     toggle_requested = pyqtSignal()
     clear_requested = pyqtSignal()
     exit_requested = pyqtSignal()
+    export_png_requested = pyqtSignal()
+    screenshot_requested = pyqtSignal()
+    export_svg_requested = pyqtSignal()
+    record_input_requested = pyqtSignal()
+    perf_hud_requested = pyqtSignal()
+    profile_requested = pyqtSignal()
     
     def __init__(self):
         super().__init__()
         self.registered = False
+        
+        # Горячая клавиша, обработчик, описание
+        self.hotkeys = [
+            (HOTKEY_TOGGLE, self.on_toggle, 'Включить/выключить рисование'),
+            (HOTKEY_CLEAR, self.on_clear, 'Очистить экран'),
+            (HOTKEY_EXIT, self.on_exit, 'Выход'),
+            (HOTKEY_EXPORT_PNG, self.export_png_requested.emit, 'Экспорт в PNG'),
+            (HOTKEY_SCREENSHOT, self.screenshot_requested.emit, 'Снимок экрана с рисунками'),
+            (HOTKEY_EXPORT_SVG, self.export_svg_requested.emit, 'Экспорт в SVG'),
+            (HOTKEY_RECORD_INPUT, self.record_input_requested.emit, 'Начать/остановить запись ввода'),
+            (HOTKEY_PERF_HUD, self.perf_hud_requested.emit, 'Индикатор производительности'),
+            (HOTKEY_PROFILE, self.profile_requested.emit, 'Начать/остановить профилирование'),
+        ]
     
     def register_hotkeys(self) -> bool:
         """
@@ -33,27 +57,25 @@ class HotkeyManager(QObject):
         
         try:
             # Регистрируем горячие клавиши
-            keyboard.add_hotkey(HOTKEY_TOGGLE, self.on_toggle)
-            keyboard.add_hotkey(HOTKEY_CLEAR, self.on_clear)
-            keyboard.add_hotkey(HOTKEY_EXIT, self.on_exit)
+            for hotkey, handler, _ in self.hotkeys:
+                keyboard.add_hotkey(hotkey, handler)
             
             self.registered = True
-            print(f'✓ Горячие клавиши зарегистрированы:')
-            print(f'  - {HOTKEY_TOGGLE.upper()} - Включить/выключить рисование')
-            print(f'  - {HOTKEY_CLEAR.upper()} - Очистить экран')
-            print(f'  - {HOTKEY_EXIT.upper()} - Выход')
+            logger.info('✓ Горячие клавиши зарегистрированы:')
+            for hotkey, _, description in self.hotkeys:
+                logger.info('  - %s - %s', hotkey.upper(), description)
             return True
         
         except PermissionError:
-            print(f'⚠ Недостаточно прав для регистрации горячих клавиш')
-            print(f'  Попробуйте запустить приложение от имени администратора')
-            print(f'  Приложение будет работать без глобальных горячих клавиш')
+            logger.warning('⚠ Недостаточно прав для регистрации горячих клавиш')
+            logger.warning('  Попробуйте запустить приложение от имени администратора')
+            logger.warning('  Приложение будет работать без глобальных горячих клавиш')
             self.registered = False
             return False
         
         except Exception as e:
-            print(f'⚠ Ошибка регистрации горячих клавиш: {e}')
-            print(f'  Приложение будет работать без глобальных горячих клавиш')
+            logger.warning('⚠ Ошибка регистрации горячих клавиш: %s', e)
+            logger.warning('  Приложение будет работать без глобальных горячих клавиш')
             self.registered = False
             return False
     
@@ -68,15 +90,14 @@ class HotkeyManager(QObject):
             return True
         
         try:
-            keyboard.remove_hotkey(HOTKEY_TOGGLE)
-            keyboard.remove_hotkey(HOTKEY_CLEAR)
-            keyboard.remove_hotkey(HOTKEY_EXIT)
+            for hotkey, _, _ in self.hotkeys:
+                keyboard.remove_hotkey(hotkey)
             self.registered = False
-            print('✓ Горячие клавиши отменены')
+            logger.info('✓ Горячие клавиши отменены')
             return True
         
         except Exception as e:
-            print(f'⚠ Ошибка отмены горячих клавиш: {e}')
+            logger.warning('⚠ Ошибка отмены горячих клавиш: %s', e)
             return False
     
     def on_toggle(self):
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Кэш растровых иконок
+SVG-иконки растрируются один раз для каждой пары (размер, плотность пикселей)
+и хранятся в памяти и на диске; при повторном запуске SVG не разбирается вовсе
+
+Ключ - (хэш содержимого SVG, логический размер, плотность пикселей), поэтому
+изменённая иконка получает новую запись, а старая просто перестаёт читаться
+"""
+
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QPixmap
+from src.config import ICON_CACHE_DIR
+from src.logger import get_logger
+
+logger = get_logger('icons')
+
+# Растры в памяти: (хэш, размер, плотность) -> пиксмап
+_pixmaps: Dict[Tuple[str, int, float], QPixmap] = {}
+# Хэш содержимого по пути файла (файлы иконок за время работы не меняются)
+_hashes: Dict[str, str] = {}
+
+
+def _file_hash(path: str) -> str:
+    """Хэш содержимого файла иконки"""
+    digest = _hashes.get(path)
+    if digest is None:
+        with open(path, 'rb') as file:
+            digest = hashlib.sha1(file.read()).hexdigest()
+        _hashes[path] = digest
+    return digest
+
+
+def _render_svg(path: str, size: int, ratio: float) -> QImage:
+    """Растрировать SVG в прозрачное изображение size x size логических пикселей"""
+    from PyQt5.QtSvg import QSvgRenderer
+    
+    pixels = round(size * ratio)
+    image = QImage(pixels, pixels, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    QSvgRenderer(path).render(painter)
+    painter.end()
+    return image
+
+
+def _save(image: QImage, path: str) -> None:
+    """Записать растр на диск атомарно (недописанный файл не попадёт в кэш)"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = path + '.tmp'
+    if not image.save(temp_path, 'PNG'):
+        raise OSError(f'Не удалось записать {temp_path}')
+    os.replace(temp_path, path)
+
+
+def icon_pixmap(path: str, size: int, ratio: float = 1.0,
+                cache_dir: Optional[str] = ICON_CACHE_DIR) -> Optional[QPixmap]:
+    """
+    Растровая иконка из SVG с учётом плотности пикселей
+    
+    Args:
+        path: Путь к SVG
+        size: Логический размер стороны иконки (в пикселях)
+        ratio: Плотность пикселей экрана
+        cache_dir: Папка дискового кэша (None - только в памяти)
+    
+    Returns:
+        QPixmap: Иконка (None, если файла нет)
+    """
+    try:
+        digest = _file_hash(path)
+    except OSError:
+        return None
+    
+    key = (digest, size, ratio)
+    pixmap = _pixmaps.get(key)
+    if pixmap is not None:
+        return pixmap
+    
+    cache_path = None
+    image = QImage()
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f'{digest}_{size}@{ratio:g}x.png')
+        image.load(cache_path)
+    
+    if image.isNull():
+        image = _render_svg(path, size, ratio)
+        logger.debug('🖼️  Иконка растрирована: %s (%d px, x%g)', os.path.basename(path), size, ratio)
+        if cache_path is not None:
+            try:
+                _save(image, cache_path)
+            except OSError as e:
+                logger.warning('⚠ Не удалось сохранить иконку в кэш: %s', e)
+    
+    pixmap = QPixmap.fromImage(image)
+    pixmap.setDevicePixelRatio(ratio)
+    _pixmaps[key] = pixmap
+    return pixmap
@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+"""
+Запись и воспроизведение ввода
+Поток событий мыши, клавиш и горячих клавиш холста пишется в компактный
+файл с отметками времени и воспроизводится через те же обработчики
+
+Структура файла (little-endian):
+    Заголовок - сигнатура, версия, размер холста, флаги (с версии 3)
+    Сцена     - длина и доска на момент начала записи в формате .skd
+                (с версии 2)
+    Записи    - фиксированного размера: пауза после прошлой записи (мкс),
+                тип, аргумент, два целых значения; за записью загрузки
+                доски следует сама доска в формате .skd
+"""
+
+import struct
+import time
+from typing import BinaryIO, Callable, Dict, List, NamedTuple, Optional
+from PyQt5.QtCore import QObject, QEvent, QPointF, QTimer, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QKeyEvent, QMouseEvent
+from PyQt5.QtWidgets import QApplication
+from src.config import ToolType
+from src import scene_file
+from src.logger import get_logger
+
+RECORDING_MAGIC = b'SKDI'
+RECORDING_VERSION = 3
+
+FLAG_DRAWING_ENABLED = 0x1  # Режим рисования был включён в начале записи
+
+# сигнатура, версия, ширина и высота холста, флаги
+_HEADER = struct.Struct('<4sHHHH')
+# заголовок версий 1 и 2 (без флагов)
+_HEADER_V2 = struct.Struct('<4sHHH')
+# длина сцены в байтах
+_SCENE_SIZE = struct.Struct('<I')
+# пауза (мкс), тип, аргумент, значения a и b
+_RECORD = struct.Struct('<IBBii')
+
+# Пауза хранится в uint32 (мкс) - более долгие паузы укорачиваются
+_MAX_DELAY_US = 0xFFFFFFFF
+
+# Типы записей
+EVENT_PRESS = 1       # Нажатие кнопки мыши: аргумент - кнопка, a, b - координаты
+EVENT_MOVE = 2        # Движение мыши: a, b - координаты, аргумент - зажатые кнопки
+EVENT_RELEASE = 3     # Отпускание кнопки мыши: аргумент - кнопка, a, b - координаты
+EVENT_KEY = 4         # Клавиша на холсте: a - код клавиши, b - модификаторы
+EVENT_HOTKEY = 5      # Горячая клавиша: аргумент - номер в HOTKEY_ACTIONS
+EVENT_TOOL = 6        # Смена инструмента: аргумент - номер в списке ToolType
+EVENT_COLOR = 7       # Смена цвета: a - цвет ARGB
+EVENT_WIDTH = 8       # Смена толщины: a - толщина
+EVENT_SCENE = 9       # Загрузка доски: a - длина доски в байтах (при чтении - номер в Recording.scenes)
+
+_MOUSE_EVENTS = {
+    QEvent.MouseButtonPress: EVENT_PRESS,
+    QEvent.MouseMove: EVENT_MOVE,
+    QEvent.MouseButtonRelease: EVENT_RELEASE,
+}
+_QT_MOUSE_EVENTS = {code: kind for kind, code in _MOUSE_EVENTS.items()}
+
+# Действия горячих клавиш - имена сигналов HotkeyManager
+HOTKEY_ACTIONS = [
+    'toggle_requested',
+    'clear_requested',
+    'exit_requested',
+    'export_png_requested',
+    'screenshot_requested',
+    'export_svg_requested',
+    'perf_hud_requested',
+    'profile_requested',
+]
+
+_TOOL_TYPES = list(ToolType)
+
+logger = get_logger('input')
+
+
+class RecordingError(Exception):
+    """Файл записи ввода повреждён или имеет неподдерживаемый формат"""
+
+
+class Recording(NamedTuple):
+    """Содержимое файла записи ввода"""
+    scene: Optional[scene_file.SceneData]  # Доска на момент начала записи (None - версия 1)
+    records: List[tuple]                   # Записи (пауза в мкс, тип, аргумент, a, b)
+    drawing_enabled: Optional[bool]        # Режим рисования в начале записи (None - до версии 3)
+    scenes: List[scene_file.SceneData]     # Доски, загруженные во время записи
+
+
+class InputRecorder(QObject):
+    """Запись событий ввода холста в файл"""
+    
+    def __init__(self, canvas, parent: Optional[QObject] = None):
+        """
+        Инициализация записи
+        
+        Args:
+            canvas: Холст, события мыши и клавиш которого записываются
+            parent: Родительский объект Qt
+        """
+        super().__init__(parent)
+        self.canvas = canvas
+        self.path = None
+        self.count = 0
+        self._file: Optional[BinaryIO] = None
+        self._last_time = 0.0
+    
+    @property
+    def recording(self) -> bool:
+        """Идёт ли запись"""
+        return self._file is not None
+    
+    def start(self, path: str) -> None:
+        """
+        Начать запись в файл
+        
+        Текущие режим рисования, доска, инструмент, цвет и толщина
+        записываются первыми, чтобы воспроизведение начиналось с того же
+        состояния холста.
+        """
+        if self.recording:
+            self.stop()
+        blocks = self._encode_scene()
+        flags = FLAG_DRAWING_ENABLED if self.canvas.drawing_enabled else 0
+        
+        self._file = open(path, 'wb')
+        self._file.write(_HEADER.pack(RECORDING_MAGIC, RECORDING_VERSION,
+                                      self.canvas.width(), self.canvas.height(), flags))
+        self._file.write(_SCENE_SIZE.pack(sum(len(block) for block in blocks)))
+        for block in blocks:
+            self._file.write(block)
+        self.path = path
+        self.count = 0
+        self._last_time = time.perf_counter()
+        
+        self.record_tool(self.canvas.current_tool_type)
+        self.record_color(self.canvas.current_color)
+        self.record_width(self.canvas.current_width)
+        self.canvas.installEventFilter(self)
+        logger.info('⏺️  Запись ввода начата: %s', path)
+    
+    def stop(self) -> int:
+        """
+        Остановить запись
+        
+        Returns:
+            int: Число записанных событий
+        """
+        if not self.recording:
+            return 0
+        self.canvas.removeEventFilter(self)
+        self._file.close()
+        self._file = None
+        logger.info('⏹️  Запись ввода остановлена: %s (событий: %d)', self.path, self.count)
+        return self.count
+    
+    def _encode_scene(self) -> List[bytes]:
+        """Закодировать текущую доску холста в формат .skd"""
+        drawings, baked_layer = self.canvas.scene.snapshot()
+        return scene_file.encode_scene(list(drawings), baked_layer)
+    
+    def _write(self, kind: int, argument: int = 0, a: int = 0, b: int = 0) -> None:
+        """Записать одно событие с паузой от предыдущего"""
+        if not self.recording:
+            return
+        now = time.perf_counter()
+        delay_us = min(int((now - self._last_time) * 1_000_000), _MAX_DELAY_US)
+        self._last_time = now
+        self._file.write(_RECORD.pack(delay_us, kind, argument, a, b))
+        self.count += 1
+    
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        """Перехват событий мыши и клавиш холста (события не поглощаются)"""
+        kind = _MOUSE_EVENTS.get(event.type())
+        if kind is not None:
+            button = int(event.buttons()) if kind == EVENT_MOVE else int(event.button())
+            self._write(kind, button & 0xFF, event.pos().x(), event.pos().y())
+        elif event.type() == QEvent.KeyPress:
+            self._write(EVENT_KEY, 0, event.key(), int(event.modifiers()))
+        return False
+    
+    def record_hotkey(self, action: str) -> None:
+        """Записать срабатывание горячей клавиши (имя сигнала HotkeyManager)"""
+        self._write(EVENT_HOTKEY, HOTKEY_ACTIONS.index(action))
+    
+    def record_tool(self, tool_type: ToolType) -> None:
+        """Записать смену инструмента"""
+        self._write(EVENT_TOOL, _TOOL_TYPES.index(tool_type))
+    
+    def record_color(self, color: QColor) -> None:
+        """Записать смену цвета"""
+        self._write(EVENT_COLOR, 0, struct.unpack('<i', struct.pack('<I', color.rgba()))[0])
+    
+    def record_width(self, width: int) -> None:
+        """Записать смену толщины линии"""
+        self._write(EVENT_WIDTH, 0, width)
+    
+    def record_scene_loaded(self) -> None:
+        """Записать загрузку доски из файла (вызывается после загрузки)"""
+        if not self.recording:
+            return
+        blocks = self._encode_scene()
+        self._write(EVENT_SCENE, 0, sum(len(block) for block in blocks))
+        for block in blocks:
+            self._file.write(block)
+
+
+def _decode_scene(data: bytes, offset: int, size: int) -> scene_file.SceneData:
+    """Разобрать доску, записанную в файле записи ввода"""
+    if size > len(data) - offset:
+        raise RecordingError('Доска в записи обрезана')
+    try:
+        return scene_file.decode_scene(memoryview(data)[offset:offset + size])
+    except scene_file.SceneFileError as e:
+        raise RecordingError(f'Доска в записи повреждена: {e}') from e
+
+
+def load_recording(path: str) -> Recording:
+    """
+    Прочитать файл записи ввода
+    
+    Returns:
+        Recording: Начальное состояние и записи
+    
+    Raises:
+        RecordingError: Если файл повреждён
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if len(data) < _HEADER_V2.size:
+        raise RecordingError('Файл слишком короткий')
+    magic, version, _, _ = _HEADER_V2.unpack_from(data)
+    if magic != RECORDING_MAGIC:
+        raise RecordingError('Это не файл записи ввода SharkDraw')
+    if version > RECORDING_VERSION:
+        raise RecordingError(f'Неподдерживаемая версия записи: {version}')
+    
+    offset = _HEADER_V2.size
+    drawing_enabled = None
+    if version >= 3:
+        if len(data) < _HEADER.size:
+            raise RecordingError('Файл слишком короткий')
+        flags = _HEADER.unpack_from(data)[4]
+        drawing_enabled = bool(flags & FLAG_DRAWING_ENABLED)
+        offset = _HEADER.size
+    
+    scene = None
+    if version >= 2:
+        if len(data) < offset + _SCENE_SIZE.size:
+            raise RecordingError('Файл слишком короткий')
+        (scene_size,) = _SCENE_SIZE.unpack_from(data, offset)
+        offset += _SCENE_SIZE.size
+        scene = _decode_scene(data, offset, scene_size)
+        offset += scene_size
+    
+    # Записи фиксированного размера разбираются блоками между загрузками доски;
+    # недописанная последняя запись (сбой во время записи) отбрасывается
+    records = []
+    scenes = []
+    while offset + _RECORD.size <= len(data):
+        body = memoryview(data)[offset:]
+        body = body[:len(body) - len(body) % _RECORD.size]
+        for record in _RECORD.iter_unpack(body):
+            offset += _RECORD.size
+            if record[1] != EVENT_SCENE:
+                records.append(record)
+                continue
+            delay_us, kind, argument, size, b = record
+            scenes.append(_decode_scene(data, offset, size))
+            records.append((delay_us, kind, argument, len(scenes) - 1, b))
+            offset += size
+            break
+    return Recording(scene, records, drawing_enabled, scenes)
+
+
+class InputReplayer(QObject):
+    """Воспроизведение записи ввода через обработчики холста и горячих клавиш"""
+    
+    finished = pyqtSignal(dict)  # Статистика воспроизведения
+    
+    def __init__(self, canvas, hotkey_manager=None,
+                 set_drawing_mode: Optional[Callable[[bool], None]] = None,
+                 parent: Optional[QObject] = None):
+        """
+        Инициализация воспроизведения
+        
+        Args:
+            canvas: Холст, которому отправляются события
+            hotkey_manager: Менеджер горячих клавиш (его сигналы испускаются повторно)
+            set_drawing_mode: Включение и выключение режима рисования (по умолчанию -
+                              напрямую у холста; приложение передаёт свой обработчик,
+                              чтобы его состояние совпадало с холстом)
+            parent: Родительский объект Qt
+        """
+        super().__init__(parent)
+        self.canvas = canvas
+        self.hotkey_manager = hotkey_manager
+        self.set_drawing_mode = set_drawing_mode or self._set_canvas_mode
+        self._scenes: List[scene_file.SceneData] = []
+        
+        # Выход из приложения при воспроизведении обычно не нужен
+        self.skip_exit = True
+        
+        self._records: List[tuple] = []
+        self._position = 0
+        self._started = 0.0
+        self._due_us = 0  # Смещение очередной записи от начала воспроизведения (мкс)
+        self._handler_times: List[float] = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._play_next)
+    
+    def play(self, path: str, realtime: bool = True) -> Optional[Dict[str, float]]:
+        """
+        Воспроизвести запись
+        
+        Args:
+            path: Файл записи
+            realtime: С исходными паузами (через цикл событий) или как можно быстрее
+        
+        Returns:
+            dict: Статистика (только для realtime=False; иначе - через сигнал finished)
+        """
+        recording = load_recording(path)
+        if recording.drawing_enabled is not None and \
+                recording.drawing_enabled != self.canvas.drawing_enabled:
+            self.set_drawing_mode(recording.drawing_enabled)
+        if recording.scene is not None:
+            self.canvas.load_scene_data(recording.scene)
+        self._records = recording.records
+        self._scenes = recording.scenes
+        self._position = 0
+        self._due_us = 0
+        self._handler_times = []
+        self._started = time.perf_counter()
+        logger.info('▶️  Воспроизведение ввода: %s (событий: %d)', path, len(self._records))
+        
+        if realtime:
+            self._schedule_next()
+            return None
+        
+        app = QApplication.instance()
+        for record in self._records:
+            self._dispatch(record)
+            # Таймеры (кадры, перетаскивание) срабатывают так же, как при живом вводе
+            app.processEvents()
+        return self._finish()
+    
+    def stop(self) -> None:
+        """Прервать воспроизведение в реальном времени"""
+        if self._timer.isActive():
+            self._timer.stop()
+            self._finish()
+    
+    def _schedule_next(self) -> None:
+        """
+        Запланировать следующую запись с исходной паузой
+        
+        Срок отсчитывается от начала воспроизведения по сумме пауз, а не от
+        предыдущей записи: время обработки событий и запаздывание таймера
+        не накапливаются.
+        """
+        if self._position >= len(self._records):
+            self._finish()
+            return
+        self._due_us += self._records[self._position][0]
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        self._timer.start(max(0, round(self._due_us / 1000 - elapsed_ms)))
+    
+    def _play_next(self) -> None:
+        """Воспроизвести очередную запись"""
+        self._dispatch(self._records[self._position])
+        self._position += 1
+        self._schedule_next()
+    
+    def _dispatch(self, record: tuple) -> None:
+        """Отправить одно событие тем же обработчикам, что и при живом вводе"""
+        _, kind, argument, a, b = record
+        started = time.perf_counter()
+        
+        if kind in _QT_MOUSE_EVENTS:
+            if kind == EVENT_MOVE:
+                button, buttons = Qt.NoButton, Qt.MouseButtons(argument)
+            else:
+                button = Qt.MouseButton(argument)
+                buttons = Qt.MouseButtons(argument if kind == EVENT_PRESS else 0)
+            event = QMouseEvent(_QT_MOUSE_EVENTS[kind], QPointF(a, b), button, buttons, Qt.NoModifier)
+            QApplication.sendEvent(self.canvas, event)
+        elif kind == EVENT_KEY:
+            QApplication.sendEvent(self.canvas, QKeyEvent(QEvent.KeyPress, a, Qt.KeyboardModifiers(b)))
+        elif kind == EVENT_HOTKEY:
+            action = HOTKEY_ACTIONS[argument]
+            if self.hotkey_manager is not None and not (self.skip_exit and action == 'exit_requested'):
+                getattr(self.hotkey_manager, action).emit()
+        elif kind == EVENT_TOOL:
+            self.canvas.set_tool(_TOOL_TYPES[argument])
+        elif kind == EVENT_COLOR:
+            self.canvas.set_color(QColor.fromRgba(a & 0xFFFFFFFF))
+        elif kind == EVENT_WIDTH:
+            self.canvas.set_width(a)
+        elif kind == EVENT_SCENE:
+            self.canvas.load_scene_data(self._scenes[a])
+        
+        self._handler_times.append((time.perf_counter() - started) * 1000)
+    
+    def _set_canvas_mode(self, enabled: bool) -> None:
+        """Переключить режим рисования у самого холста"""
+        if enabled:
+            self.canvas.enable_drawing()
+        else:
+            self.canvas.disable_drawing()
+    
+    def _finish(self) -> Dict[str, float]:
+        """Подвести итоги воспроизведения и сообщить о завершении"""
+        times = sorted(self._handler_times)
+        stats = {
+            'events': len(times),
+            'total_ms': (time.perf_counter() - self._started) * 1000,
+            'max_event_ms': times[-1] if times else 0.0,
+            'p95_event_ms': times[min(len(times) - 1, int(len(times) * 0.95))] if times else 0.0,
+        }
+        logger.info('⏹️  Воспроизведение завершено: %d событий за %.0f мс (самое долгое событие: %.2f мс)',
+                    stats['events'], stats['total_ms'], stats['max_event_ms'])
+        logger.debug('   p95 обработки события: %.2f мс', stats['p95_event_ms'])
+        self.finished.emit(stats)
+        return stats
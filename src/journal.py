@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+Журнал автосохранения холста
+Каждое изменение сцены дописывается в журнал на диске фоновым потоком;
+при запуске сцена восстанавливается из последнего снимка и журнала
+
+Файлы в папке автосохранения:
+    autosave-<N>.skd   - снимок сцены (формат scene_file)
+    autosave.journal   - заголовок с номером снимка N и записи после него
+
+Запись журнала: код операции (uint8), длина данных (uint32), данные и
+CRC32 кода с данными. Восстановление останавливается на первой
+повреждённой или недописанной записи.
+"""
+
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+from array import array
+from typing import List, Optional, Tuple
+from PyQt5.QtGui import QImage
+from src import scene_file
+from src.scene_file import SceneData, SceneFileError
+from src.config import JOURNAL_FSYNC_DELAY_MS
+from src.logger import get_logger
+
+JOURNAL_MAGIC = b'SKDJ'
+JOURNAL_VERSION = 1
+
+# Коды операций
+OP_ADD = 1     # Добавлен рисунок в конец списка
+OP_ERASE = 2   # Удалены рисунки по позициям
+OP_INSERT = 3  # Рисунки вставлены на позиции (отмена стирания)
+OP_CLEAR = 4   # Сцена очищена
+OP_BAKE = 5    # Самые старые рисунки запечены в растр
+
+JOURNAL_NAME = 'autosave.journal'
+
+logger = get_logger('journal')
+
+# сигнатура, версия, номер снимка
+_HEADER = struct.Struct('<4sHQ')
+# код операции, длина данных
+_RECORD = struct.Struct('<BI')
+_CRC = struct.Struct('<I')
+_COUNT = struct.Struct('<I')
+
+# Сообщения для фонового потока
+_STOP = object()
+
+
+def _snapshot_name(snapshot_id: int) -> str:
+    return f'autosave-{snapshot_id}.skd'
+
+
+def _encode_positions(positions: List[int]) -> bytes:
+    """Позиции: количество (uint32) и массив int32"""
+    data = array('i', positions)
+    if data.itemsize != 4:
+        raise ValueError('int32 array expected')
+    return _COUNT.pack(len(data)) + data.tobytes()
+
+
+def _decode_positions(payload: bytes, offset: int = 0) -> Tuple[List[int], int]:
+    """Разобрать позиции; возвращает список и смещение после них"""
+    (count,) = _COUNT.unpack_from(payload, offset)
+    offset += _COUNT.size
+    data = array('i')
+    data.frombytes(payload[offset:offset + count * 4])
+    return data.tolist(), offset + count * 4
+
+
+class SceneJournal:
+    """Журнал автосохранения с фоновой записью на диск"""
+    
+    def __init__(self, directory: str, fsync_delay_ms: int = JOURNAL_FSYNC_DELAY_MS):
+        """
+        Инициализация журнала
+        
+        Args:
+            directory: Папка для файлов автосохранения
+            fsync_delay_ms: Сколько копить записи от первой записи пачки до fsync
+        """
+        self.directory = directory
+        self.journal_path = os.path.join(directory, JOURNAL_NAME)
+        self.fsync_delay = fsync_delay_ms / 1000
+        self.snapshot_id = 0
+        
+        # Сколько записей добавлено после последнего снимка
+        self.records_since_snapshot = 0
+        self.failed = False
+        
+        self._queue = queue.Queue()
+        self._file = None
+        self._thread = None
+    
+    # ------------------------------------------------------------------
+    # Восстановление (вызывается до start())
+    # ------------------------------------------------------------------
+    
+    def recover(self) -> Tuple[Optional[SceneData], List[tuple]]:
+        """
+        Прочитать последний снимок и операции журнала после него
+        
+        Returns:
+            tuple: (снимок сцены или None, список операций)
+                   Операции: ('add', рисунок), ('erase', позиции),
+                   ('insert', [(позиция, рисунок)]), ('clear',), ('bake', количество)
+        """
+        try:
+            with open(self.journal_path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            return None, []
+        
+        if len(data) < _HEADER.size:
+            return None, []
+        magic, version, snapshot_id = _HEADER.unpack_from(data, 0)
+        if magic != JOURNAL_MAGIC or version > JOURNAL_VERSION:
+            logger.warning('⚠ Журнал автосохранения не распознан: %s', self.journal_path)
+            return None, []
+        self.snapshot_id = snapshot_id
+        
+        snapshot = None
+        if snapshot_id:
+            try:
+                snapshot = scene_file.load_scene(os.path.join(self.directory,
+                                                              _snapshot_name(snapshot_id)))
+            except (OSError, SceneFileError) as e:
+                logger.warning('⚠ Снимок автосохранения не прочитан: %s', e)
+        
+        operations = []
+        offset = _HEADER.size
+        while offset + _RECORD.size <= len(data):
+            op, length = _RECORD.unpack_from(data, offset)
+            start = offset + _RECORD.size
+            end = start + length
+            if end + _CRC.size > len(data):
+                break  # Запись не дописана
+            (crc,) = _CRC.unpack_from(data, end)
+            if zlib.crc32(data[offset:offset + 1] + data[start:end]) != crc:
+                break  # Запись повреждена
+            try:
+                operations.append(self._decode_operation(op, data[start:end]))
+            except (SceneFileError, struct.error, ValueError):
+                break
+            offset = end + _CRC.size
+        
+        return snapshot, operations
+    
+    @staticmethod
+    def _decode_operation(op: int, payload: bytes) -> tuple:
+        """Разобрать данные одной записи журнала"""
+        if op == OP_ADD:
+            return ('add', scene_file.decode_scene(payload).drawings[0])
+        if op == OP_ERASE:
+            return ('erase', _decode_positions(payload)[0])
+        if op == OP_INSERT:
+            positions, offset = _decode_positions(payload)
+            drawings = scene_file.decode_scene(payload[offset:]).drawings
+            return ('insert', list(zip(positions, drawings)))
+        if op == OP_CLEAR:
+            return ('clear',)
+        if op == OP_BAKE:
+            return ('bake', _COUNT.unpack(payload)[0])
+        raise ValueError(f'Неизвестная операция журнала: {op}')
+    
+    # ------------------------------------------------------------------
+    # Запись (вызывается из GUI-потока, на диск пишет фоновый поток)
+    # ------------------------------------------------------------------
+    
+    def start(self, drawings: List, baked_layer: Optional[QImage]) -> None:
+        """
+        Запустить фоновую запись
+        
+        Первым делом записывается снимок текущей сцены: журнал начинается
+        заново и недописанный хвост прошлого запуска отбрасывается.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._writer_loop, name='SceneJournal', daemon=True)
+        self._thread.start()
+        self.snapshot(drawings, baked_layer)
+    
+    def add(self, drawing) -> None:
+        """Записать добавление рисунка"""
+        self._append(OP_ADD, b''.join(scene_file.encode_scene([drawing])))
+    
+    def erase(self, positions: List[int]) -> None:
+        """Записать удаление рисунков по позициям (по возрастанию)"""
+        self._append(OP_ERASE, _encode_positions(positions))
+    
+    def insert(self, batch: List[Tuple[int, object]]) -> None:
+        """Записать вставку рисунков на позиции (по возрастанию)"""
+        positions = [index for index, _ in batch]
+        drawings = [drawing for _, drawing in batch]
+        self._append(OP_INSERT, _encode_positions(positions) +
+                     b''.join(scene_file.encode_scene(drawings)))
+    
+    def clear(self) -> None:
+        """Записать очистку сцены"""
+        self._append(OP_CLEAR, b'')
+    
+    def bake(self, count: int) -> None:
+        """Записать запекание count самых старых рисунков"""
+        self._append(OP_BAKE, _COUNT.pack(count))
+    
+    def snapshot(self, drawings: List, baked_layer: Optional[QImage]) -> None:
+        """
+        Записать полный снимок сцены и начать журнал заново
+        
+        Рисунки после сохранения не изменяются, поэтому фоновому потоку
+        передаётся кортеж ссылок, а слой - как неявно разделяемая копия.
+        """
+        if self._thread is None:
+            return
+        self.records_since_snapshot = 0
+        baked_copy = QImage(baked_layer) if baked_layer is not None else None
+        self._queue.put(('snapshot', tuple(drawings), baked_copy))
+    
+    def close(self) -> None:
+        """Дописать очередь, сбросить данные на диск и остановить поток"""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+    
+    def _append(self, op: int, payload: bytes) -> None:
+        """Сформировать запись и передать её фоновому потоку"""
+        if self._thread is None:
+            return
+        head = _RECORD.pack(op, len(payload))
+        crc = zlib.crc32(head[:1] + payload)
+        self._queue.put(('record', head + payload + _CRC.pack(crc)))
+        self.records_since_snapshot += 1
+    
+    # ------------------------------------------------------------------
+    # Фоновый поток
+    # ------------------------------------------------------------------
+    
+    def _writer_loop(self) -> None:
+        """Писать записи пачками: один fsync на пачку"""
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            # Собираем записи не дольше fsync_delay от первой записи пачки:
+            # непрерывный поток изменений (ластик) не должен откладывать запись
+            deadline = time.monotonic() + self.fsync_delay
+            while batch[-1] is not _STOP:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            for item in batch:
+                if item is _STOP:
+                    running = False
+                    break
+                if self.failed:
+                    continue
+                try:
+                    if item[0] == 'record':
+                        self._file.write(item[1])
+                    else:
+                        self._write_snapshot(item[1], item[2])
+                except OSError as e:
+                    logger.warning('⚠ Ошибка записи журнала автосохранения: %s', e)
+                    self.failed = True
+            
+            self._sync()
+        
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _sync(self) -> None:
+        """Сбросить журнал на диск"""
+        if self._file is None or self.failed:
+            return
+        try:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError as e:
+            logger.warning('⚠ Ошибка записи журнала автосохранения: %s', e)
+            self.failed = True
+    
+    def _write_snapshot(self, drawings: tuple, baked_layer: Optional[QImage]) -> None:
+        """
+        Записать снимок и заменить журнал пустым, ссылающимся на него
+        
+        Порядок шагов гарантирует, что после сбоя на любом шаге журнал
+        ссылается на существующий снимок и не содержит записей, уже
+        вошедших в снимок.
+        """
+        new_id = self.snapshot_id + 1
+        scene_file.save_scene(os.path.join(self.directory, _snapshot_name(new_id)),
+                              list(drawings), baked_layer)
+        
+        temp_path = self.journal_path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            file.write(_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, new_id))
+            file.flush()
+            os.fsync(file.fileno())
+        
+        if self._file is not None:
+            self._file.close()
+        os.replace(temp_path, self.journal_path)
+        self._file = open(self.journal_path, 'ab')
+        
+        old_id, self.snapshot_id = self.snapshot_id, new_id
+        if old_id:
+            try:
+                os.remove(os.path.join(self.directory, _snapshot_name(old_id)))
+            except OSError:
+                pass
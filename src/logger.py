@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+Журналирование SharkDraw
+Уровни, отложенное форматирование (аргументы в стиле %) и неблокирующий
+вывод: GUI-поток лишь кладёт запись в очередь, а кольцевой буфер, файл и
+консоль обслуживает отдельный поток
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+import traceback
+from collections import deque
+from typing import List, Optional
+from src.config import LOG_LEVEL, LOG_DIR, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUPS, LOG_RING_BUFFER_SIZE
+
+LOGGER_NAME = 'sharkdraw'
+
+# Формат файла журнала; в консоль выводится только текст сообщения
+FILE_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_ring_buffer: Optional['RingBufferHandler'] = None
+
+
+class RingBufferHandler(logging.Handler):
+    """Последние сообщения журнала в памяти (для индикатора и отчётов об ошибках)"""
+    
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.lines = deque(maxlen=capacity)
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(self.format(record))
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Журнал модуля
+    
+    Сообщения передаются с аргументами, а не готовой строкой:
+    logger.debug('Рисунков: %d', count) - для выключенного уровня
+    строка не форматируется вовсе.
+    """
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
+
+
+def setup_logging(level: str = LOG_LEVEL, log_dir: Optional[str] = LOG_DIR) -> None:
+    """
+    Настроить журналирование приложения
+    
+    Args:
+        level: Минимальный уровень ('DEBUG', 'INFO', 'WARNING', ...)
+        log_dir: Папка файла журнала (None - без файла)
+    """
+    global _listener, _ring_buffer
+    shutdown_logging()
+    
+    _ring_buffer = RingBufferHandler(LOG_RING_BUFFER_SIZE)
+    _ring_buffer.setFormatter(logging.Formatter(FILE_FORMAT))
+    handlers = [_ring_buffer]
+    
+    file_error = None
+    if log_dir is not None:
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            file_handler = logging.handlers.RotatingFileHandler(
+                os.path.join(log_dir, 'sharkdraw.log'), maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+            file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+            handlers.append(file_handler)
+        except OSError as e:
+            file_error = e
+    
+    # В оконной сборке PyInstaller консоли нет
+    if sys.stdout is not None:
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(logging.Formatter('%(message)s'))
+        handlers.append(console)
+    
+    records = queue.SimpleQueue()
+    root = logging.getLogger(LOGGER_NAME)
+    root.handlers = [logging.handlers.QueueHandler(records)]
+    root.setLevel(level)
+    root.propagate = False
+    
+    _listener = logging.handlers.QueueListener(records, *handlers)
+    _listener.start()
+    if file_error is not None:
+        root.warning('⚠ Файл журнала недоступен: %s', file_error)
+
+
+def shutdown_logging() -> None:
+    """Дописать очередь сообщений и остановить поток вывода"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def recent_lines() -> List[str]:
+    """Последние сообщения журнала из кольцевого буфера"""
+    return list(_ring_buffer.lines) if _ring_buffer is not None else []
+
+
+def install_crash_handler(log_dir: Optional[str] = LOG_DIR) -> None:
+    """
+    Перехватывать необработанные исключения
+    
+    Исключение пишется в журнал, а в папку журнала - отчёт crash-<время>.txt
+    с трассировкой и последними сообщениями из кольцевого буфера.
+    Без перехватчика PyQt завершает процесс при исключении в обработчике сигнала.
+    
+    Args:
+        log_dir: Папка для отчётов (None - только запись в журнал)
+    """
+    def handle(exc_type, exc, tb):
+        if issubclass(exc_type, KeyboardInterrupt):
+            sys.__excepthook__(exc_type, exc, tb)
+            return
+        # Буфер читается до записи исключения - оно попадёт в отчёт отдельно
+        lines = recent_lines()
+        text = ''.join(traceback.format_exception(exc_type, exc, tb))
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.critical('💥 Необработанное исключение:\n%s', text)
+        if log_dir is None:
+            return
+        path = os.path.join(log_dir, f'crash-{time.strftime("%Y%m%d_%H%M%S")}.txt')
+        try:
+            os.makedirs(log_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write('Последние сообщения журнала:\n')
+                file.writelines(line + '\n' for line in lines)
+                file.write('\n' + text)
+            logger.critical('💥 Отчёт об ошибке сохранён: %s', path)
+        except OSError as e:
+            logger.warning('⚠ Не удалось сохранить отчёт об ошибке: %s', e)
+    
+    sys.excepthook = handle
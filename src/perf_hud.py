@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Индикатор производительности (HUD) поверх холста
+Длительность отрисовки, частота кадров, задержка от ввода до кадра и
+размер сцены; пока индикатор скрыт, счётчики не ведутся вовсе
+"""
+
+import time
+from collections import deque
+from typing import List
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QColor, QFont, QPainter
+from src.config import PERF_HUD_SAMPLES
+
+# Границы столбцов гистограммы времени кадра (мс)
+FRAME_BUCKETS = (2, 4, 8, 16, 33, 66)
+
+_HUD_WIDTH = 380
+_HUD_MARGIN = 12
+_LINE_HEIGHT = 16
+_HISTOGRAM_HEIGHT = 40
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """Перцентиль по отсортированным замерам"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class PerfHud:
+    """Счётчики производительности холста и их отрисовка"""
+    
+    def __init__(self, samples: int = PERF_HUD_SAMPLES):
+        """
+        Инициализация индикатора
+        
+        Args:
+            samples: Сколько последних замеров хранить
+        """
+        self.paint_times = deque(maxlen=samples)     # Длительность paintEvent (мс)
+        self.frame_times = deque(maxlen=samples)     # Моменты кадров (perf_counter)
+        self.input_latencies = deque(maxlen=samples) # От события ввода до кадра (мс)
+        self._input_pending_since = None
+        
+        # Текст и гистограмма пересчитываются при обновлении, а не в каждом кадре
+        self.lines: List[str] = []
+        self.histogram: List[int] = [0] * (len(FRAME_BUCKETS) + 1)
+        self.rect = QRect(_HUD_MARGIN, _HUD_MARGIN, _HUD_WIDTH, 0)
+        self._font = QFont('Consolas', 9)
+    
+    def input_received(self) -> None:
+        """Событие ввода получено (задержка считается от первого ещё не показанного)"""
+        if self._input_pending_since is None:
+            self._input_pending_since = time.perf_counter()
+    
+    def frame_painted(self, started: float, finished: float) -> None:
+        """Кадр отрисован за время от started до finished"""
+        self.paint_times.append((finished - started) * 1000)
+        self.frame_times.append(finished)
+        if self._input_pending_since is not None:
+            self.input_latencies.append((finished - self._input_pending_since) * 1000)
+            self._input_pending_since = None
+    
+    def refresh(self, canvas) -> None:
+        """Пересчитать показатели по счётчикам и состоянию холста"""
+        paint = sorted(self.paint_times)
+        latency = sorted(self.input_latencies)
+        
+        # Частота кадров за последнюю секунду
+        now = time.perf_counter()
+        fps = sum(1 for moment in self.frame_times if now - moment <= 1.0)
+        
+        scene = canvas.scene
+        points = sum(drawing.point_count() for drawing in scene.drawings)
+        memory = scene.drawings_bytes + canvas.history.bytes
+        if scene.baked_layer is not None:
+            memory += scene.baked_layer.sizeInBytes()
+        memory += canvas.renderer.memory_size()
+        
+        scheduler = canvas.render_scheduler
+        self.lines = [
+            f'FPS {fps:3d}   кадров пропущено: {scheduler.dropped_frames}',
+            f'Кадров {scheduler.frames}   запросов {scheduler.requests}'
+            f'   объединено {scheduler.merged_requests}',
+            f'Отрисовка  p50 {_percentile(paint, 0.5):6.2f}  p95 {_percentile(paint, 0.95):6.2f}'
+            f'  max {paint[-1] if paint else 0:6.2f} мс',
+            f'Ввод→кадр  p50 {_percentile(latency, 0.5):6.2f}  p95 {_percentile(latency, 0.95):6.2f}'
+            f'  p99 {_percentile(latency, 0.99):6.2f} мс',
+            self._toggle_line(canvas.toggle_latency_stats()),
+            f'Рисунков {len(scene.drawings)}   точек {points}',
+            f'Память сцены ~{memory / (1024 * 1024):.1f} МБ',
+        ]
+        
+        # Гистограмма интервалов между кадрами
+        self.histogram = [0] * (len(FRAME_BUCKETS) + 1)
+        moments = list(self.frame_times)
+        for previous, current in zip(moments, moments[1:]):
+            interval = (current - previous) * 1000
+            bucket = 0
+            while bucket < len(FRAME_BUCKETS) and interval > FRAME_BUCKETS[bucket]:
+                bucket += 1
+            self.histogram[bucket] += 1
+        
+        self.rect.setHeight(len(self.lines) * _LINE_HEIGHT + _HISTOGRAM_HEIGHT + 3 * _HUD_MARGIN)
+    
+    @staticmethod
+    def _toggle_line(stats: dict) -> str:
+        """Строка задержки переключения режима рисования"""
+        if not stats['count']:
+            return 'Переключение  нет замеров'
+        return (f'Переключение  посл. {stats["last"]:6.2f}  медиана {stats["median"]:6.2f}'
+                f'  max {stats["max"]:6.2f} мс')
+    
+    def paint(self, painter: QPainter) -> None:
+        """Нарисовать индикатор в его прямоугольнике"""
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.fillRect(self.rect, QColor(0, 0, 0, 190))
+        painter.setFont(self._font)
+        painter.setPen(QColor(230, 230, 230))
+        
+        x = self.rect.x() + _HUD_MARGIN
+        y = self.rect.y() + _HUD_MARGIN
+        for line in self.lines:
+            painter.drawText(QRect(x, y, self.rect.width() - 2 * _HUD_MARGIN, _LINE_HEIGHT),
+                             Qt.AlignLeft | Qt.AlignVCenter, line)
+            y += _LINE_HEIGHT
+        
+        # Столбцы гистограммы: зелёные укладываются в 60 FPS, красные - нет
+        y += _HUD_MARGIN
+        peak = max(self.histogram) or 1
+        bar_width = (self.rect.width() - 2 * _HUD_MARGIN) // len(self.histogram)
+        for i, count in enumerate(self.histogram):
+            height = count * _HISTOGRAM_HEIGHT // peak
+            limit = FRAME_BUCKETS[i] if i < len(FRAME_BUCKETS) else None
+            color = QColor(52, 199, 89) if limit is not None and limit <= 16 else QColor(255, 59, 48)
+            painter.fillRect(x + i * bar_width, y + _HISTOGRAM_HEIGHT - height,
+                             bar_width - 2, height, color)
+        painter.restore()
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Профилирование по запросу
+cProfile на GUI-потоке (цикл событий Qt и все обработчики) и поток-сэмплер,
+который снимает стек GUI-потока для flame graph
+
+Сеанс записывает два файла с общим именем:
+    <имя>.pstats    - статистика cProfile (python -m pstats, snakeviz)
+    <имя>.collapsed - свёрнутые стеки "кадр;кадр;кадр число" (flamegraph.pl, speedscope)
+"""
+
+import cProfile
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Optional, Tuple
+from src.config import PROFILER_SAMPLE_INTERVAL_MS
+from src.logger import get_logger
+
+logger = get_logger('profiler')
+
+
+def _frame_name(frame) -> str:
+    """Имя кадра стека для свёрнутого формата"""
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+
+class Profiler:
+    """Сеанс профилирования GUI-потока"""
+    
+    def __init__(self, interval_ms: float = PROFILER_SAMPLE_INTERVAL_MS):
+        """
+        Инициализация профилировщика
+        
+        Args:
+            interval_ms: Период снятия стека сэмплером (в мс)
+        """
+        self.interval = interval_ms / 1000
+        self.timestamp = None
+        self._profile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[threading.Thread] = None
+        self._stop_sampling = threading.Event()
+        self._stacks = Counter()
+        self._target_thread = None
+        self._started = 0.0
+    
+    @property
+    def running(self) -> bool:
+        """Идёт ли сеанс"""
+        return self._profile is not None
+    
+    def start(self) -> None:
+        """
+        Начать сеанс на текущем (GUI) потоке
+        
+        Raises:
+            ValueError: Если в процессе уже работает другой профилировщик
+        """
+        if self.running:
+            return
+        profile = cProfile.Profile()
+        profile.enable()
+        self._profile = profile
+        self.timestamp = time.strftime('%Y%m%d_%H%M%S')
+        self._started = time.perf_counter()
+        
+        self._stacks = Counter()
+        self._target_thread = threading.get_ident()
+        self._stop_sampling.clear()
+        self._sampler = threading.Thread(target=self._sample, name='sharkdraw-profiler', daemon=True)
+        self._sampler.start()
+        logger.info('🔬 Профилирование начато')
+    
+    def stop(self, directory: str, label: str) -> Tuple[str, str]:
+        """
+        Остановить сеанс и записать результаты
+        
+        Args:
+            directory: Папка для файлов профиля
+            label: Метка в имени файлов (например, размер сцены)
+        
+        Returns:
+            tuple: Пути к файлам .pstats и .collapsed
+        
+        Raises:
+            OSError: Если файлы не удалось записать
+        """
+        profile, self._profile = self._profile, None
+        profile.disable()
+        self._stop_sampling.set()
+        self._sampler.join()
+        self._sampler = None
+        duration = time.perf_counter() - self._started
+        
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f'profile_{self.timestamp}_{label}')
+        stats_path = base + '.pstats'
+        collapsed_path = base + '.collapsed'
+        profile.dump_stats(stats_path)
+        with open(collapsed_path, 'w', encoding='utf-8') as file:
+            for stack, count in self._stacks.most_common():
+                file.write(f'{stack} {count}\n')
+        
+        logger.info('🔬 Профилирование завершено за %.1f с (стеков: %d): %s',
+                    duration, sum(self._stacks.values()), stats_path)
+        return stats_path, collapsed_path
+    
+    def _sample(self) -> None:
+        """Поток-сэмплер: периодически снимает стек GUI-потока"""
+        while not self._stop_sampling.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread)
+            names = []
+            while frame is not None:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self._stacks[';'.join(reversed(names))] += 1
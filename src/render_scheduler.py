@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Планировщик перерисовки
+Копит запросы перерисовки и изменённые области и сбрасывает их в виджет
+не чаще целевой частоты кадров
+"""
+
+import time
+from typing import Callable, List, Optional
+from PyQt5.QtCore import QObject, QTimer, QRect, Qt
+from PyQt5.QtGui import QRegion
+from PyQt5.QtWidgets import QWidget
+from src.config import TARGET_FPS
+
+
+class RenderScheduler(QObject):
+    """Планировщик кадров: один вызов update() на кадр вместо одного на событие"""
+    
+    def __init__(self, widget: QWidget, target_fps: int = TARGET_FPS):
+        """
+        Инициализация планировщика
+        
+        Args:
+            widget: Виджет, который нужно перерисовывать
+            target_fps: Целевая частота кадров
+        """
+        super().__init__(widget)
+        self.widget = widget
+        
+        # Накопленная область перерисовки
+        self._pending_region = QRegion()
+        self._pending_full = False
+        self._frame_requested = False
+        
+        # Обработчики, вызываемые в начале каждого кадра (например, ластик)
+        self._frame_callbacks: List[Callable[[], None]] = []
+        
+        self._last_flush = 0.0
+        self._deadline = 0.0
+        
+        # Счётчики
+        self.requests = 0         # Всего запросов перерисовки
+        self.frames = 0           # Выполнено кадров
+        self.merged_requests = 0  # Запросов, объединённых с уже ожидающим кадром
+        self.dropped_frames = 0   # Кадров, пропущенных из-за опоздания сброса
+        
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+        
+        self.set_target_fps(target_fps)
+    
+    def set_target_fps(self, fps: int) -> None:
+        """Установить целевую частоту кадров"""
+        self.target_fps = max(1, fps)
+        self.frame_interval = 1.0 / self.target_fps
+    
+    def add_frame_callback(self, callback: Callable[[], None]) -> None:
+        """Добавить обработчик, вызываемый перед каждым сбросом кадра"""
+        self._frame_callbacks.append(callback)
+    
+    def request_update(self, rect: Optional[QRect] = None) -> None:
+        """
+        Запросить перерисовку области в ближайшем кадре
+        
+        Args:
+            rect: Изменённая область (None - весь виджет)
+        """
+        if rect is None:
+            self._pending_full = True
+        elif not rect.isEmpty():
+            self._pending_region += rect
+        self.request_frame()
+    
+    def request_frame(self) -> None:
+        """Запросить кадр (обработчики кадра будут вызваны даже без изменённой области)"""
+        self.requests += 1
+        if self._frame_requested:
+            self.merged_requests += 1
+            return
+        
+        self._frame_requested = True
+        now = time.perf_counter()
+        self._deadline = max(now, self._last_flush + self.frame_interval)
+        self._timer.start(int((self._deadline - now) * 1000))
+    
+    def flush(self) -> None:
+        """Выполнить кадр: вызвать обработчики и передать накопленную область виджету"""
+        self._timer.stop()
+        if not self._frame_requested:
+            return
+        
+        now = time.perf_counter()
+        lateness = now - self._deadline
+        if lateness > self.frame_interval:
+            self.dropped_frames += int(lateness / self.frame_interval)
+        self._last_flush = now
+        self.frames += 1
+        
+        # Кадр ещё не сброшен: области, запрошенные обработчиками (стирание),
+        # попадают в этот же кадр, а не планируют следующий
+        for callback in self._frame_callbacks:
+            callback()
+        self._frame_requested = False
+        
+        if self._pending_full:
+            self.widget.update()
+        elif not self._pending_region.isEmpty():
+            self.widget.update(self._pending_region)
+        self._pending_region = QRegion()
+        self._pending_full = False
+    
+    def stats(self) -> dict:
+        """Текущие значения счётчиков"""
+        return {
+            'target_fps': self.target_fps,
+            'requests': self.requests,
+            'frames': self.frames,
+            'merged_requests': self.merged_requests,
+            'dropped_frames': self.dropped_frames,
+        }
@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+"""
+Модель сцены
+Завершённые рисунки, их пространственный индекс, учёт памяти и запечённый
+растровый слой; не зависит от окна холста
+"""
+
+import itertools
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from PyQt5.QtCore import QPoint, QRect, QSize, QThreadPool
+from PyQt5.QtGui import QImage, QPainter
+from src.config import JOURNAL_COMPACT_EVERY
+from src.logger import get_logger
+from src.tools import Tool
+from src.spatial_index import SpatialGrid
+from src.geometry import hit_segment_groups
+from src.scene_renderer import BakeTask, create_layer
+
+logger = get_logger('scene')
+
+# Источник ключей порядка рисунков: значения только растут
+_order_keys = itertools.count()
+
+
+class _OrderKeys:
+    """Ключи порядка рисунков списка как последовательность (для bisect без копирования)"""
+    
+    __slots__ = ('drawings',)
+    
+    def __init__(self, drawings: List[Tool]):
+        self.drawings = drawings
+    
+    def __len__(self) -> int:
+        return len(self.drawings)
+    
+    def __getitem__(self, index: int) -> int:
+        return self.drawings[index].order
+
+
+def _assign_order(drawings: List[Tool]) -> None:
+    """Назначить рисункам возрастающие ключи порядка"""
+    for drawing in drawings:
+        drawing.order = next(_order_keys)
+
+
+class Scene:
+    """Сцена: упорядоченный список завершённых рисунков и всё, что из него выводится"""
+    
+    def __init__(self, size: Optional[QSize] = None, ratio: float = 1.0):
+        """
+        Инициализация пустой сцены
+        
+        Args:
+            size: Логический размер холста (для растровых слоёв)
+            ratio: Плотность пикселей растровых слоёв
+        """
+        self.size = QSize(size) if size is not None else QSize()
+        self.device_pixel_ratio = ratio
+        
+        # Список завершённых рисунков
+        self.drawings = []
+        
+        # Пространственный индекс завершённых рисунков (для ластика)
+        self.spatial_index = SpatialGrid()
+        
+        # Учёт памяти векторных рисунков; старые рисунки сверх бюджета
+        # запекаются в постоянный растровый слой и остаются видимыми
+        self.drawings_bytes = 0
+        self.baked_layer = None
+        
+        # Журнал автосохранения (все изменения сцены пишутся в него)
+        self.journal = None
+        
+        # Запекание загруженной доски, идущее в фоне (см. bake_in_background)
+        self._pending_bake: Optional[BakeTask] = None
+    
+    def __len__(self) -> int:
+        return len(self.drawings)
+    
+    def set_canvas_size(self, size: QSize, ratio: float) -> None:
+        """Задать размер и плотность пикселей растровых слоёв"""
+        self.size = QSize(size)
+        self.device_pixel_ratio = ratio
+    
+    def is_empty(self) -> bool:
+        """Нет ни рисунков, ни запечённого слоя"""
+        return not self.drawings and self.baked_layer is None
+    
+    def query(self, rect: QRect) -> Set[Tool]:
+        """Рисунки, габариты которых пересекают прямоугольник"""
+        return self.spatial_index.query(rect)
+    
+    def bounds(self) -> QRect:
+        """Общие габариты векторных рисунков"""
+        bounds = QRect()
+        for drawing in self.drawings:
+            bounds = bounds.united(drawing.bounding_rect())
+        return bounds
+    
+    def styles(self) -> Dict[Tuple[int, int], int]:
+        """Уникальные стили (цвет ARGB, толщина) и число рисунков каждого стиля"""
+        styles = {}
+        for drawing in self.drawings:
+            key = (drawing.color.rgba(), drawing.width)
+            styles[key] = styles.get(key, 0) + 1
+        return styles
+    
+    def hit_test(self, path: List[Tuple[int, int]], radius: float) -> List[Tuple[int, Tool]]:
+        """
+        Найти рисунки, задетые кругом радиуса radius при движении по цепочке положений
+        
+        Returns:
+            list: Пары (позиция, рисунок) по возрастанию позиций
+        """
+        # Проверяем только рисунки, габариты которых рядом со следом
+        margin = int(radius) + 1
+        xs = [x for x, _ in path]
+        ys = [y for _, y in path]
+        search_rect = QRect(QPoint(min(xs), min(ys)), QPoint(max(xs), max(ys))).adjusted(
+            -margin, -margin, margin, margin)
+        candidates = list(self.spatial_index.query(search_rect))
+        
+        # Точная проверка по контурам всех кандидатов одним пакетным вызовом
+        hits = hit_segment_groups(
+            path, radius,
+            [drawing.outline_segments() for drawing in candidates],
+            [drawing.width / 2 for drawing in candidates]
+        )
+        return sorted((self.position(candidates[i]), candidates[i]) for i in hits)
+    
+    def position(self, drawing: Tool) -> int:
+        """
+        Позиция рисунка в списке за O(log n)
+        
+        Ключи порядка возрастают вдоль списка, поэтому позиция находится
+        двоичным поиском, а не просмотром всего списка.
+        """
+        index = bisect_left(_OrderKeys(self.drawings), drawing.order)
+        if index == len(self.drawings) or self.drawings[index] is not drawing:
+            raise ValueError('Рисунка нет в сцене')
+        return index
+    
+    def snapshot(self) -> Tuple[tuple, Optional[QImage]]:
+        """
+        Неизменяемый снимок для фоновых задач
+        
+        Рисунки после сохранения не меняются, поэтому снимком служит кортеж
+        ссылок на них; запечённый слой передаётся неявно разделяемой копией.
+        """
+        self.settle_bake()
+        baked_layer = QImage(self.baked_layer) if self.baked_layer is not None else None
+        return tuple(self.drawings), baked_layer
+    
+    def add(self, drawing: Tool) -> None:
+        """Добавить завершённый рисунок в сцену"""
+        drawing.order = next(_order_keys)
+        self.drawings.append(drawing)
+        self.spatial_index.insert(drawing, drawing.bounding_rect())
+        self.drawings_bytes += drawing.memory_size()
+        if self.journal is not None:
+            self.journal.add(drawing)
+            self._journal_changed()
+    
+    def remove(self, drawing: Tool) -> None:
+        """Удалить рисунок из сцены"""
+        self.spatial_index.remove(drawing)
+        if self.drawings and self.drawings[-1] is drawing:
+            index = len(self.drawings) - 1
+            self.drawings.pop()
+        else:
+            index = self.position(drawing)
+            del self.drawings[index]
+        self.drawings_bytes -= drawing.memory_size()
+        if self.journal is not None:
+            self.journal.erase([index])
+            self._journal_changed()
+    
+    def remove_at(self, erased: List[Tuple[int, Tool]]) -> None:
+        """Удалить рисунки по позициям (пары отсортированы по возрастанию позиций)"""
+        for index, drawing in reversed(erased):
+            del self.drawings[index]
+            self.spatial_index.remove(drawing)
+            self.drawings_bytes -= drawing.memory_size()
+        if self.journal is not None:
+            self.journal.erase([index for index, _ in erased])
+            self._journal_changed()
+    
+    def insert_at(self, erased: List[Tuple[int, Tool]]) -> None:
+        """Вернуть рисунки на прежние позиции (пары отсортированы по возрастанию позиций)"""
+        ordered = True
+        for index, drawing in erased:
+            self.drawings.insert(index, drawing)
+            self.spatial_index.insert(drawing, drawing.bounding_rect())
+            self.drawings_bytes += drawing.memory_size()
+            ordered = ordered and self._order_fits(index)
+        # Отмена стирания возвращает рисунки с прежними ключами; новые
+        # объекты (восстановление из журнала) получают ключи заново
+        if not ordered:
+            _assign_order(self.drawings)
+        if self.journal is not None:
+            self.journal.insert(erased)
+            self._journal_changed()
+    
+    def _order_fits(self, index: int) -> bool:
+        """Не нарушает ли ключ рисунка на позиции index возрастания ключей"""
+        order = self.drawings[index].order
+        if order is None:
+            return False
+        if index > 0 and self.drawings[index - 1].order >= order:
+            return False
+        return index + 1 == len(self.drawings) or order < self.drawings[index + 1].order
+    
+    @staticmethod
+    def build_state(drawings: List[Tool], baked_layer: Optional[QImage],
+                    sizes: Optional[List[int]] = None) -> tuple:
+        """
+        Собрать состояние сцены (с индексом и учётом памяти) из готовых рисунков
+        
+        Args:
+            drawings: Рисунки
+            baked_layer: Запечённый слой (или None)
+            sizes: Уже подсчитанная память каждого рисунка (если есть)
+        """
+        _assign_order(drawings)
+        spatial_index = SpatialGrid()
+        spatial_index.insert_many((drawing, drawing.bounding_rect()) for drawing in drawings)
+        if sizes is None:
+            sizes = [drawing.memory_size() for drawing in drawings]
+        return (drawings, spatial_index, sum(sizes), baked_layer)
+    
+    def build_loaded_state(self, drawings: List[Tool], baked_layer: Optional[QImage],
+                           max_drawings: int, memory_budget: int,
+                           target: float) -> Tuple[tuple, List[Tool]]:
+        """
+        Собрать состояние загруженной доски без рисунков сверх лимитов
+        
+        Лишние старые рисунки не вставляются в сетку, чтобы тут же быть из
+        неё удалены: их нужно запечь в растр (bake_in_background) после
+        замены состояния.
+        
+        Returns:
+            tuple: Состояние для swap_state и старые рисунки для запекания
+        """
+        sizes = [drawing.memory_size() for drawing in drawings]
+        count = self._count_to_bake(sizes, max_drawings, memory_budget, target)
+        return self.build_state(drawings[count:], baked_layer, sizes[count:]), drawings[:count]
+    
+    @staticmethod
+    def empty_state() -> tuple:
+        """Состояние пустой сцены"""
+        return ([], SpatialGrid(), 0, None)
+    
+    @staticmethod
+    def state_size(state: tuple) -> int:
+        """Память, удерживаемая сохранённым состоянием сцены"""
+        drawings, _, drawings_bytes, baked_layer = state
+        size = drawings_bytes
+        if baked_layer is not None:
+            size += baked_layer.sizeInBytes()
+        return size
+    
+    def swap_state(self, state: tuple) -> tuple:
+        """
+        Заменить состояние сцены целиком
+        
+        Args:
+            state: (рисунки, пространственный индекс, байты рисунков, запечённый слой)
+        
+        Returns:
+            tuple: Прежнее состояние в том же формате
+        """
+        self.settle_bake()
+        old_state = (self.drawings, self.spatial_index, self.drawings_bytes, self.baked_layer)
+        self.drawings, self.spatial_index, self.drawings_bytes, self.baked_layer = state
+        if self.journal is not None:
+            if self.is_empty():
+                self.journal.clear()
+            else:
+                self.journal.snapshot(self.drawings, self.baked_layer)
+        return old_state
+    
+    def bake_count(self, max_drawings: int, memory_budget: int, target: float) -> int:
+        """
+        Сколько самых старых рисунков запечь, чтобы уложиться в лимиты
+        
+        Запекание идёт с запасом (до доли target от лимитов), чтобы не
+        повторять его после каждого рисунка.
+        
+        Returns:
+            int: Число рисунков (0 - лимиты не превышены)
+        """
+        if len(self.drawings) <= max_drawings and self.drawings_bytes <= memory_budget:
+            return 0
+        return self._count_to_bake([drawing.memory_size() for drawing in self.drawings],
+                                   max_drawings, memory_budget, target)
+    
+    @staticmethod
+    def _count_to_bake(sizes: List[int], max_drawings: int, memory_budget: int,
+                       target: float) -> int:
+        """Сколько первых рисунков с памятью sizes запечь (см. bake_count)"""
+        remaining_bytes = sum(sizes)
+        if len(sizes) <= max_drawings and remaining_bytes <= memory_budget:
+            return 0
+        
+        target_bytes = memory_budget * target
+        target_count = int(max_drawings * target)
+        count = 0
+        for size in sizes:
+            if remaining_bytes <= target_bytes and len(sizes) - count <= target_count:
+                break
+            remaining_bytes -= size
+            count += 1
+        return count
+    
+    def bake(self, count: int) -> List[Tool]:
+        """
+        Перенести count самых старых рисунков в растровый слой, освободив их векторы
+        
+        Returns:
+            list: Запечённые рисунки
+        """
+        baked = self.drawings[:count]
+        if not baked:
+            return baked
+        
+        self.settle_bake()
+        if self.baked_layer is None:
+            self.baked_layer = create_layer(self.size, self.device_pixel_ratio)
+        painter = QPainter(self.baked_layer)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        for drawing in baked:
+            drawing.draw(painter)
+            self.spatial_index.remove(drawing)
+            self.drawings_bytes -= drawing.memory_size()
+        painter.end()
+        
+        del self.drawings[:count]
+        if self.journal is not None:
+            self.journal.bake(count)
+        logger.debug('🧊 Запечено в растр %d старых рисунков (векторных: %d, %d байт)',
+                     count, len(self.drawings), self.drawings_bytes)
+        return baked
+    
+    def bake_in_background(self, drawings: List[Tool],
+                           on_finished: Optional[Callable[[], None]] = None) -> None:
+        """
+        Запечь рисунки под слой в пуле потоков
+        
+        Рисунки должны быть старше всех рисунков сцены. Пока запекание идёт,
+        запечённый слой их ещё не содержит; всё, что читает или меняет слой
+        (снимок, замена состояния, запекание), сначала дожидается результата.
+        
+        Args:
+            drawings: Рисунки, не входящие в сцену
+            on_finished: Вызывается в GUI-потоке после завершения
+        """
+        self.settle_bake()
+        task = BakeTask(drawings, self.baked_layer, self.size, self.device_pixel_ratio)
+        if on_finished is not None:
+            task.signals.finished.connect(on_finished)
+        self._pending_bake = task
+        QThreadPool.globalInstance().start(task)
+        logger.debug('🧊 Запекание %d рисунков загруженной доски начато в фоне', len(drawings))
+    
+    def settle_bake(self) -> bool:
+        """
+        Дождаться фонового запекания и подставить готовый слой
+        
+        Returns:
+            bool: Был ли применён результат
+        """
+        task, self._pending_bake = self._pending_bake, None
+        if task is None:
+            return False
+        task.done.wait()
+        if task.layer is None:
+            return False
+        self.baked_layer = task.layer
+        if self.journal is not None:
+            self.journal.snapshot(self.drawings, self.baked_layer)
+        logger.debug('🧊 Фоновое запекание применено (%d рисунков)', len(task.drawings))
+        return True
+    
+    def attach_journal(self, journal) -> None:
+        """Подключить журнал автосохранения и записать в него снимок текущей сцены"""
+        self.journal = journal
+        journal.start(self.drawings, self.baked_layer)
+    
+    def replay(self, snapshot, operations: List[tuple]) -> None:
+        """
+        Восстановить сцену из снимка и операций журнала автосохранения
+        
+        Операции применяются теми же методами, что и при рисовании, но без
+        записи в журнал.
+        """
+        journal, self.journal = self.journal, None
+        try:
+            if snapshot is not None:
+                self.swap_state(self.build_state(snapshot.drawings, snapshot.baked_layer))
+            for operation in operations:
+                kind = operation[0]
+                if kind == 'add':
+                    self.add(operation[1])
+                elif kind == 'erase':
+                    self.remove_at([(index, self.drawings[index]) for index in operation[1]])
+                elif kind == 'insert':
+                    self.insert_at(operation[1])
+                elif kind == 'clear':
+                    self.swap_state(self.empty_state())
+                elif kind == 'bake':
+                    self.bake(operation[1])
+        except IndexError:
+            logger.warning('⚠ Журнал автосохранения не согласован со снимком, '
+                           'восстановлены только первые записи')
+        finally:
+            self.journal = journal
+    
+    def _journal_changed(self) -> None:
+        """Свернуть журнал в снимок, если в нём накопилось много записей"""
+        if self.journal.records_since_snapshot >= JOURNAL_COMPACT_EVERY:
+            self.journal.snapshot(self.drawings, self.baked_layer)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Двоичный формат файла сцены SharkDraw (.skd)
+Сохранение доски и быстрая загрузка через mmap
+
+Структура файла (little-endian):
+    Заголовок    - сигнатура, версия, флаги, размеры разделов
+    Стили        - таблица уникальных пар (цвет ARGB, толщина)
+    Рисунки      - записи фиксированного размера: тип, стиль и координаты
+                   (для карандаша - смещение и длина в блоке точек)
+    Точки        - все точки карандаша подряд как упакованные int32 (x, y)
+    Растр        - PNG запечённого слоя (если есть)
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+from typing import List, NamedTuple, Optional
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice, QPoint
+from PyQt5.QtGui import QColor, QImage
+from src.tools import Tool, PenTool, LineTool, RectangleTool, CircleTool, ArrowTool
+
+SCENE_MAGIC = b'SKDS'
+SCENE_VERSION = 1
+
+FLAG_BAKED_LAYER = 0x1
+
+# сигнатура, версия, флаги, стилей, рисунков, int32 в блоке точек, байт растра, DPR растра
+_HEADER = struct.Struct('<4sHHIIIIf')
+# цвет ARGB, толщина, резерв
+_STYLE = struct.Struct('<IHH')
+# тип, резерв, стиль, четыре координаты (для карандаша: смещение, длина, 0, 0)
+_RECORD = struct.Struct('<BBHiiii')
+
+# Коды типов рисунков в файле
+TOOL_CODES = {
+    PenTool: 1,
+    LineTool: 2,
+    RectangleTool: 3,
+    CircleTool: 4,
+    ArrowTool: 5,
+}
+TOOL_CLASSES = {code: cls for cls, code in TOOL_CODES.items()}
+
+
+class SceneFileError(Exception):
+    """Файл сцены повреждён или имеет неподдерживаемый формат"""
+
+
+class SceneData(NamedTuple):
+    """Содержимое файла сцены"""
+    drawings: List[Tool]
+    baked_layer: Optional[QImage]
+
+
+def encode_scene(drawings: List[Tool], baked_layer: Optional[QImage] = None) -> List[bytes]:
+    """
+    Закодировать сцену в набор блоков, которые записываются в файл подряд
+    
+    Args:
+        drawings: Завершённые рисунки
+        baked_layer: Запечённый растровый слой (или None)
+    
+    Returns:
+        list: Блоки для записи (заголовок, стили, рисунки, точки каждого штриха, растр)
+    """
+    styles = {}
+    style_table = bytearray()
+    records = bytearray()
+    point_blocks = []
+    point_ints = 0
+    
+    for drawing in drawings:
+        code = TOOL_CODES.get(type(drawing))
+        if code is None:
+            continue
+        
+        style_key = (drawing.color.rgba(), drawing.width)
+        style = styles.get(style_key)
+        if style is None:
+            style = styles[style_key] = len(styles)
+            style_table += _STYLE.pack(style_key[0], style_key[1], 0)
+        
+        if drawing.points:
+            records += _RECORD.pack(code, 0, style, point_ints, len(drawing.points), 0, 0)
+            point_blocks.append(drawing.points)
+            point_ints += len(drawing.points)
+        elif drawing.start_point is not None and drawing.end_point is not None:
+            records += _RECORD.pack(code, 0, style,
+                                    drawing.start_point.x(), drawing.start_point.y(),
+                                    drawing.end_point.x(), drawing.end_point.y())
+        else:
+            continue
+    
+    if sys.byteorder == 'big':
+        point_blocks = [_swapped(block) for block in point_blocks]
+    
+    raster = b''
+    ratio = 1.0
+    if baked_layer is not None:
+        buffer = QBuffer()
+        buffer.open(QIODevice.WriteOnly)
+        baked_layer.save(buffer, 'PNG')
+        raster = bytes(buffer.data())
+        ratio = baked_layer.devicePixelRatio()
+    
+    header = _HEADER.pack(SCENE_MAGIC, SCENE_VERSION, FLAG_BAKED_LAYER if raster else 0,
+                          len(styles), len(records) // _RECORD.size, point_ints,
+                          len(raster), ratio)
+    return [header, bytes(style_table), bytes(records), *point_blocks, raster]
+
+
+def _swapped(points: array) -> array:
+    """Копия массива с обратным порядком байтов (файл всегда little-endian)"""
+    copy = array('i', points)
+    copy.byteswap()
+    return copy
+
+
+def save_scene(path: str, drawings: List[Tool], baked_layer: Optional[QImage] = None) -> None:
+    """
+    Сохранить сцену в файл (атомарно: через временный файл)
+    
+    Args:
+        path: Путь к файлу .skd
+        drawings: Завершённые рисунки
+        baked_layer: Запечённый растровый слой (или None)
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        for block in encode_scene(drawings, baked_layer):
+            file.write(block)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def decode_scene(data) -> SceneData:
+    """
+    Разобрать сцену из буфера (bytes, memoryview или mmap)
+    
+    Таблицы читаются через struct.iter_unpack, точки каждого штриха
+    копируются в array('i') одним блоком, без объектов на каждую точку.
+    """
+    with memoryview(data) as view:
+        return _decode_view(view)
+
+
+def _decode_view(view: memoryview) -> SceneData:
+    """Разобрать сцену из memoryview (все срезы освобождаются до выхода)"""
+    if len(view) < _HEADER.size:
+        raise SceneFileError('Файл слишком короткий')
+    
+    magic, version, flags, style_count, record_count, point_ints, raster_size, ratio = \
+        _HEADER.unpack_from(view, 0)
+    if magic != SCENE_MAGIC:
+        raise SceneFileError('Неверная сигнатура файла')
+    if version > SCENE_VERSION:
+        raise SceneFileError(f'Неподдерживаемая версия файла: {version}')
+    
+    offset = _HEADER.size
+    styles_end = offset + style_count * _STYLE.size
+    records_end = styles_end + record_count * _RECORD.size
+    points_end = records_end + point_ints * 4
+    if len(view) < points_end + raster_size:
+        raise SceneFileError('Файл обрезан')
+    
+    styles = []
+    colors = {}
+    for rgba, width, _ in _STYLE.iter_unpack(view[offset:styles_end]):
+        # Одинаковые цвета разделяют один QColor
+        color = colors.get(rgba)
+        if color is None:
+            color = colors[rgba] = QColor.fromRgba(rgba)
+        styles.append((color, width))
+    
+    drawings = []
+    with view[records_end:points_end] as points_view:
+        for code, _, style, a, b, c, d in _RECORD.iter_unpack(view[styles_end:records_end]):
+            cls = TOOL_CLASSES.get(code)
+            if cls is None or style >= len(styles):
+                raise SceneFileError(f'Повреждённая запись рисунка (тип {code})')
+            color, width = styles[style]
+            drawing = cls(color, width)
+            if cls is PenTool:
+                if a < 0 or b < 0 or a + b > point_ints:
+                    raise SceneFileError('Точки штриха выходят за пределы файла')
+                drawing.points.frombytes(points_view[a * 4:(a + b) * 4])
+                if sys.byteorder == 'big':
+                    drawing.points.byteswap()
+            else:
+                drawing.start_point = QPoint(a, b)
+                drawing.end_point = QPoint(c, d)
+            drawings.append(drawing)
+    
+    baked_layer = None
+    if flags & FLAG_BAKED_LAYER and raster_size:
+        baked_layer = QImage.fromData(QByteArray(bytes(view[points_end:points_end + raster_size])), 'PNG')
+        if baked_layer.isNull():
+            raise SceneFileError('Повреждённый растровый слой')
+        baked_layer = baked_layer.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+        baked_layer.setDevicePixelRatio(ratio)
+    
+    return SceneData(drawings, baked_layer)
+
+
+def load_scene(path: str) -> SceneData:
+    """
+    Загрузить сцену из файла через mmap
+    
+    Args:
+        path: Путь к файлу .skd
+    
+    Returns:
+        SceneData: Рисунки и запечённый слой
+    """
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            raise SceneFileError('Файл пуст')
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode_scene(mapped)
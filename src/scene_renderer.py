@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+"""
+Отрисовка сцены
+Рисует сцену в любое QPaintDevice и ведёт растровые кэши холста;
+от QWidget не зависит и работает на платформе offscreen
+"""
+
+import threading
+from typing import Iterable, List, Optional, TYPE_CHECKING
+from PyQt5.QtCore import Qt, QObject, QRect, QRectF, QRunnable, QSize, pyqtSignal
+from PyQt5.QtGui import QImage, QPainter, QPaintDevice
+from src.config import DAMAGE_MARGIN
+from src.logger import get_logger
+from src.tools import PenTool, Tool
+
+if TYPE_CHECKING:
+    from src.scene import Scene
+
+logger = get_logger('renderer')
+
+
+def create_layer(size: QSize, ratio: float) -> QImage:
+    """
+    Создать прозрачный слой с учётом плотности пикселей
+    
+    Args:
+        size: Логический размер слоя
+        ratio: Плотность пикселей
+    """
+    layer = QImage(int(size.width() * ratio), int(size.height() * ratio),
+                   QImage.Format_ARGB32_Premultiplied)
+    layer.setDevicePixelRatio(ratio)
+    layer.fill(Qt.transparent)
+    return layer
+
+
+def paint_drawings(painter: QPainter, drawings: Iterable[Tool],
+                   baked_layer: Optional[QImage] = None) -> None:
+    """Нарисовать запечённый слой и рисунки поверх него"""
+    painter.setRenderHint(QPainter.Antialiasing, True)
+    if baked_layer is not None:
+        painter.drawImage(0, 0, baked_layer)
+    for drawing in drawings:
+        drawing.draw(painter)
+
+
+def blit_layer(painter: QPainter, layer: QImage, rect: QRect) -> None:
+    """Скопировать только указанную (логическую) область слоя"""
+    ratio = layer.devicePixelRatio()
+    source = QRectF(rect.x() * ratio, rect.y() * ratio,
+                    rect.width() * ratio, rect.height() * ratio)
+    painter.drawImage(QRectF(rect), layer, source)
+
+
+class BakeSignals(QObject):
+    """Сигналы фонового запекания (доставляются в GUI-поток)"""
+    finished = pyqtSignal()
+
+
+class BakeTask(QRunnable):
+    """Фоновая задача: нарисовать рисунки поверх копии запечённого слоя"""
+    
+    def __init__(self, drawings: List[Tool], baked_layer: Optional[QImage], size: QSize, ratio: float):
+        """
+        Инициализация задачи
+        
+        Args:
+            drawings: Запекаемые рисунки (в сцену не входят и не меняются)
+            baked_layer: Прежний запечённый слой (или None)
+            size: Логический размер слоя
+            ratio: Плотность пикселей
+        """
+        super().__init__()
+        # Результат забирается после завершения - объект не должен удаляться пулом
+        self.setAutoDelete(False)
+        self.drawings = drawings
+        self.baked_layer = baked_layer
+        self.size = QSize(size)
+        self.ratio = ratio
+        self.layer: Optional[QImage] = None
+        self.done = threading.Event()
+        self.signals = BakeSignals()
+    
+    def run(self) -> None:
+        """Выполняется в потоке пула"""
+        try:
+            layer = create_layer(self.size, self.ratio)
+            painter = QPainter(layer)
+            paint_drawings(painter, self.drawings, self.baked_layer)
+            painter.end()
+            self.layer = layer
+        except Exception as e:
+            logger.warning('⚠ Ошибка фонового запекания: %s', e)
+        finally:
+            # Сигнал - до отметки о готовности: дождавшийся задачи GUI-поток
+            # может сразу отпустить её вместе с объектом сигналов
+            try:
+                self.signals.finished.emit()
+            except RuntimeError:
+                pass  # Приложение завершается - сообщать о готовности некому
+            self.done.set()
+
+
+class SceneRenderer:
+    """Отрисовщик сцены с растровым кэшем завершённых рисунков и слоем текущего штриха"""
+    
+    def __init__(self, scene: 'Scene'):
+        """
+        Инициализация отрисовщика
+        
+        Args:
+            scene: Отрисовываемая сцена (размер слоёв берётся из неё)
+        """
+        self.scene = scene
+        
+        # Растровый кэш завершённых рисунков: перерисовывается только при
+        # изменении сцены (сохранение, стирание, очистка)
+        self._committed_layer = None
+        self._committed_layer_dirty = True
+        
+        # Слой текущего штриха карандаша: на каждое событие мыши
+        # дорисовывается только новый сегмент
+        self._active_layer = None
+    
+    def _layer_matches(self, layer: Optional[QImage]) -> bool:
+        """Совпадает ли слой по размеру и плотности пикселей со сценой"""
+        scene = self.scene
+        return (layer is not None and
+                layer.devicePixelRatio() == scene.device_pixel_ratio and
+                layer.width() == int(scene.size.width() * scene.device_pixel_ratio) and
+                layer.height() == int(scene.size.height() * scene.device_pixel_ratio))
+    
+    def memory_size(self) -> int:
+        """Память растровых кэшей (в байтах)"""
+        return sum(layer.sizeInBytes() for layer in (self._committed_layer, self._active_layer)
+                   if layer is not None)
+    
+    def create_layer(self) -> QImage:
+        """Создать прозрачный слой размером со сцену"""
+        return create_layer(self.scene.size, self.scene.device_pixel_ratio)
+    
+    def invalidate(self) -> None:
+        """Пометить растровый кэш рисунков как устаревший"""
+        self._committed_layer_dirty = True
+    
+    def committed_layer(self) -> QImage:
+        """Актуальный растровый кэш завершённых рисунков (перестраивается при необходимости)"""
+        if self._committed_layer_dirty or not self._layer_matches(self._committed_layer):
+            self._rebuild_committed_layer()
+        return self._committed_layer
+    
+    def _rebuild_committed_layer(self) -> None:
+        """Перерисовать все завершённые рисунки в растровый кэш"""
+        self._committed_layer = self.create_layer()
+        
+        painter = QPainter(self._committed_layer)
+        paint_drawings(painter, self.scene.drawings, self.scene.baked_layer)
+        painter.end()
+        
+        self._committed_layer_dirty = False
+        logger.debug('🖼️  Кэш рисунков перестроен (%d рисунков)', len(self.scene.drawings))
+    
+    def commit(self, drawing: Tool) -> None:
+        """Дорисовать новый рисунок в актуальный кэш без полной перестройки"""
+        if self._committed_layer is None or self._committed_layer_dirty:
+            # Кэш всё равно будет перестроен при следующей отрисовке
+            return
+        
+        painter = QPainter(self._committed_layer)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        drawing.draw(painter)
+        painter.end()
+    
+    def prepare_active_layer(self) -> None:
+        """Подготовить чистый слой для нового штриха карандаша"""
+        if not self._layer_matches(self._active_layer):
+            self._active_layer = self.create_layer()
+    
+    def discard_active_stroke(self) -> None:
+        """Стереть брошенный незавершённый штрих (весь слой: его габариты могут быть неизвестны)"""
+        if self._active_layer is not None:
+            self._active_layer.fill(Qt.transparent)
+    
+    def paint_active_segment(self, tool: PenTool) -> None:
+        """Дорисовать новейший сегмент штриха в слой текущего штриха"""
+        painter = QPainter(self._active_layer)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        tool.draw_last_segment(painter)
+        painter.end()
+    
+    def merge_active_layer(self, rect: QRect) -> None:
+        """Перенести завершённый штрих в кэш рисунков и очистить слой штриха"""
+        rect = rect.adjusted(-DAMAGE_MARGIN, -DAMAGE_MARGIN, DAMAGE_MARGIN, DAMAGE_MARGIN)
+        
+        # Если кэш устарел, штрих попадёт в него при перестройке
+        if self._committed_layer is not None and not self._committed_layer_dirty:
+            painter = QPainter(self._committed_layer)
+            blit_layer(painter, self._active_layer, rect)
+            painter.end()
+        
+        # Очищаем только область штриха, а не весь слой
+        painter = QPainter(self._active_layer)
+        painter.setCompositionMode(QPainter.CompositionMode_Clear)
+        painter.fillRect(rect, Qt.transparent)
+        painter.end()
+    
+    def render(self, painter: QPainter, rect: QRect, active_tool: Optional[Tool] = None) -> None:
+        """
+        Вывести область сцены из кэшей
+        
+        Args:
+            painter: Рисовальщик на целевом устройстве
+            rect: Перерисовываемая область (логические пиксели)
+            active_tool: Рисунок в процессе рисования (или None)
+        """
+        # Завершённые рисунки - одним блитом из кэша
+        blit_layer(painter, self.committed_layer(), rect)
+        
+        if active_tool is not None:
+            if isinstance(active_tool, PenTool) and self._active_layer is not None:
+                # Штрих карандаша уже нарисован в своём слое
+                blit_layer(painter, self._active_layer, rect)
+            else:
+                active_tool.draw(painter)
+    
+    def render_to(self, device: QPaintDevice) -> None:
+        """Нарисовать сцену целиком (без кэшей) на произвольном устройстве"""
+        painter = QPainter(device)
+        paint_drawings(painter, self.scene.drawings, self.scene.baked_layer)
+        painter.end()
+    
+    def render_image(self) -> QImage:
+        """Нарисовать сцену целиком в новое изображение на прозрачном фоне"""
+        image = self.create_layer()
+        self.render_to(image)
+        return image
@@ -7,6 +7,9 @@
 import os
 import sys
 from pathlib import Path
+from src.logger import get_logger
+
+logger = get_logger('sound')
 
 
 class SoundManager:
@@ -20,6 +23,7 @@ class SoundManager:
             sounds_dir: Путь к папке со звуками (по умолчанию assets/sounds)
         """
         self.enabled = False
+        self.loaded = False
         self.sounds = {}
         
         # Определяем путь к папке со звуками
@@ -38,18 +42,26 @@ class SoundManager:
                 import winsound
                 self.winsound = winsound
                 self.enabled = True
-                print('✓ Звуковая система инициализирована (winsound)')
+                logger.info('✓ Звуковая система инициализирована (winsound)')
             except ImportError:
-                print('⚠ Модуль winsound не доступен')
+                logger.warning('⚠ Модуль winsound не доступен')
                 self.enabled = False
                 return
         else:
-            print('⚠ Звуки поддерживаются только на Windows')
+            logger.info('⚠ Звуки поддерживаются только на Windows')
             self.enabled = False
             return
+    
+    def load(self):
+        """
+        Найти звуковые файлы
         
-        # Загружаем звуковые файлы
-        self._load_sounds()
+        Обращается к диску, поэтому вызывается после показа окон, а не в
+        конструкторе; до загрузки звуки просто не воспроизводятся.
+        """
+        if not self.loaded:
+            self._load_sounds()
+            self.loaded = True
     
     def _load_sounds(self):
         """Загрузка звуковых файлов из папки"""
@@ -57,7 +69,7 @@ class SoundManager:
             return
         
         if not self.sounds_dir.exists():
-            print(f'⚠ Папка со звуками не найдена: {self.sounds_dir}')
+            logger.warning('⚠ Папка со звуками не найдена: %s', self.sounds_dir)
             return
         
         # Список звуковых файлов для загрузки (только WAV для winsound)
@@ -74,12 +86,12 @@ class SoundManager:
                 sound_path = self.sounds_dir / filename
                 if sound_path.exists():
                     self.sounds[sound_name] = str(sound_path)
-                    print(f'✓ Найден звук: {sound_name} ({filename})')
+                    logger.debug('✓ Найден звук: %s (%s)', sound_name, filename)
                     loaded = True
                     break
             
             if not loaded:
-                print(f'⚠ Звук "{sound_name}" не найден в {self.sounds_dir}')
+                logger.warning('⚠ Звук "%s" не найден в %s', sound_name, self.sounds_dir)
     
     def play_startup(self):
         """Воспроизвести звук запуска приложения"""
@@ -140,6 +152,6 @@ class SoundManager:
             try:
                 # Останавливаем все звуки
                 self.winsound.PlaySound(None, self.winsound.SND_PURGE)
-                print('✓ Звуковая система остановлена')
+                logger.info('✓ Звуковая система остановлена')
             except Exception as e:
-                print(f'⚠ Ошибка при остановке звуковой системы: {e}')
+                logger.warning('⚠ Ошибка при остановке звуковой системы: %s', e)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Пространственный индекс рисунков
+Равномерная сетка над габаритами рисунков для быстрого поиска ластиком
+"""
+
+from typing import Dict, Hashable, Iterable, Set, Tuple
+from PyQt5.QtCore import QRect
+from src.config import SPATIAL_GRID_CELL_SIZE
+
+
+class SpatialGrid:
+    """Равномерная сетка: каждая ячейка хранит рисунки, габариты которых её задевают"""
+    
+    def __init__(self, cell_size: int = SPATIAL_GRID_CELL_SIZE):
+        """
+        Инициализация сетки
+        
+        Args:
+            cell_size: Размер ячейки в пикселях
+        """
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], Set[Hashable]] = {}
+        self._items: Dict[Hashable, Tuple[int, int, int, int]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._items
+    
+    def _cell_span(self, rect: QRect) -> Tuple[int, int, int, int]:
+        """Диапазон ячеек (включительно), покрываемых прямоугольником"""
+        size = self.cell_size
+        return (rect.left() // size, rect.top() // size,
+                rect.right() // size, rect.bottom() // size)
+    
+    def insert(self, item: Hashable, rect: QRect) -> None:
+        """Добавить элемент с указанными габаритами"""
+        if rect.isEmpty():
+            return
+        if item in self._items:
+            self.remove(item)
+        
+        span = self._cell_span(rect)
+        self._items[item] = span
+        x0, y0, x1, y1 = span
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is None:
+                    cell = self._cells[(cx, cy)] = set()
+                cell.add(item)
+    
+    def insert_many(self, items: Iterable[Tuple[Hashable, QRect]]) -> None:
+        """
+        Добавить много новых элементов сразу (построение индекса загруженной сцены)
+        
+        То же, что insert для каждого элемента, но без проверки повторов и
+        с локальными ссылками в цикле; элементов в индексе быть не должно.
+        """
+        size = self.cell_size
+        cells = self._cells
+        spans = self._items
+        for item, rect in items:
+            if rect.isEmpty():
+                continue
+            x0, y0 = rect.left() // size, rect.top() // size
+            x1, y1 = rect.right() // size, rect.bottom() // size
+            spans[item] = (x0, y0, x1, y1)
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cell = cells.get((cx, cy))
+                    if cell is None:
+                        cells[(cx, cy)] = {item}
+                    else:
+                        cell.add(item)
+    
+    def remove(self, item: Hashable) -> None:
+        """Удалить элемент из индекса (если он есть)"""
+        span = self._items.pop(item, None)
+        if span is None:
+            return
+        
+        x0, y0, x1, y1 = span
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is None:
+                    continue
+                cell.discard(item)
+                if not cell:
+                    del self._cells[(cx, cy)]
+    
+    def clear(self) -> None:
+        """Очистить индекс"""
+        self._cells.clear()
+        self._items.clear()
+    
+    def query(self, rect: QRect) -> Set[Hashable]:
+        """
+        Найти элементы, чьи ячейки пересекаются с прямоугольником
+        
+        Returns:
+            set: Кандидаты для точной проверки (могут быть ложные срабатывания)
+        """
+        result = set()
+        if rect.isEmpty():
+            return result
+        
+        x0, y0, x1, y1 = self._cell_span(rect)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell:
+                    result |= cell
+        return result
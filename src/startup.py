@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Шкала запуска
+Длительность этапов запуска и время до первого кадра; несрочная работа
+(звуки, глобальные горячие клавиши) откладывается до первого кадра
+"""
+
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+from PyQt5.QtCore import QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QWidget
+from src.logger import get_logger
+
+logger = get_logger('startup')
+
+
+class StartupTimeline(QObject):
+    """Замеры этапов запуска от начала отсчёта"""
+    
+    first_frame = pyqtSignal()  # Первый кадр отрисован - пора выполнять отложенную работу
+    
+    def __init__(self, started: Optional[float] = None, parent: Optional[QObject] = None):
+        """
+        Инициализация шкалы
+        
+        Args:
+            started: Начало отсчёта (perf_counter), по умолчанию - сейчас
+            parent: Родительский объект Qt
+        """
+        super().__init__(parent)
+        self.started = time.perf_counter() if started is None else started
+        self.phases: List[Tuple[str, float, float]] = []  # Этап, начало и длительность (мс)
+        self.first_frame_ms: Optional[float] = None        # Время до первого кадра (мс)
+        self._watched: Optional[QWidget] = None
+    
+    def elapsed_ms(self) -> float:
+        """Сколько прошло от начала отсчёта (мс)"""
+        return (time.perf_counter() - self.started) * 1000
+    
+    def mark(self, name: str, since: float) -> None:
+        """Записать этап, начавшийся в момент since (perf_counter) и закончившийся сейчас"""
+        now = time.perf_counter()
+        self.phases.append((name, (since - self.started) * 1000, (now - since) * 1000))
+    
+    @contextmanager
+    def phase(self, name: str):
+        """Замерить этап запуска: with timeline.phase('Холст'): ..."""
+        since = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.mark(name, since)
+    
+    def watch_first_frame(self, widget: QWidget) -> None:
+        """Дождаться первой отрисовки виджета и испустить first_frame"""
+        self._watched = widget
+        widget.installEventFilter(self)
+    
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        """Первое событие отрисовки: кадр готов, когда обработчик отрисовки завершится"""
+        if watched is self._watched and event.type() == QEvent.Paint:
+            watched.removeEventFilter(self)
+            self._watched = None
+            QTimer.singleShot(0, self._first_frame_painted)
+        return False
+    
+    def _first_frame_painted(self) -> None:
+        """Зафиксировать время до первого кадра и запустить отложенную работу"""
+        self.first_frame_ms = self.elapsed_ms()
+        logger.info('🚀 Первый кадр через %.0f мс после запуска', self.first_frame_ms)
+        self.first_frame.emit()
+    
+    def report(self) -> None:
+        """Записать шкалу запуска в журнал"""
+        logger.info('⏱️  Этапы запуска:')
+        for name, start, duration in self.phases:
+            logger.info('   %7.1f мс  %-24s %7.1f мс', start, name, duration)
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""
+Потоковый экспорт сцены в SVG
+Элементы пишутся в файл по одному, документ целиком в памяти не строится
+
+Стили (цвет, толщина) выносятся в CSS-классы, штрихи карандаша
+записываются путями с относительными координатами.
+"""
+
+import base64
+import os
+from typing import Callable, Dict, Iterable, Optional, Sequence, TextIO, Tuple
+import numpy as np
+from PyQt5.QtCore import QBuffer, QByteArray, QIODevice
+from PyQt5.QtGui import QImage
+from src.tools import Tool, PenTool, LineTool, RectangleTool, CircleTool, ArrowTool
+
+# Размер блока base64 при встраивании растра (кратен 3 байтам исходных данных)
+_BASE64_CHUNK = 57 * 1024
+
+
+def _style_key(drawing: Tool) -> Tuple[int, int]:
+    """Ключ стиля рисунка: цвет ARGB и толщина"""
+    return drawing.color.rgba(), drawing.width
+
+
+def _collect_styles(drawings: Iterable[Tool]) -> Dict[Tuple[int, int], str]:
+    """Сопоставить уникальным стилям короткие имена CSS-классов"""
+    styles = {}
+    for drawing in drawings:
+        key = _style_key(drawing)
+        if key not in styles:
+            styles[key] = f's{len(styles)}'
+    return styles
+
+
+def _write_style_sheet(file: TextIO, styles: Dict[Tuple[int, int], str]) -> None:
+    """Записать таблицу CSS-классов"""
+    file.write('<style>\n')
+    file.write('path,line,rect,ellipse{fill:none;stroke-linecap:round;stroke-linejoin:round}\n')
+    for (rgba, width), name in styles.items():
+        color = f'#{rgba & 0xFFFFFF:06x}'
+        alpha = (rgba >> 24) & 0xFF
+        opacity = '' if alpha == 255 else f';stroke-opacity:{alpha / 255:.3g}'
+        file.write(f'.{name}{{stroke:{color};stroke-width:{width}{opacity}}}\n')
+    file.write('</style>\n')
+
+
+def pen_path_data(drawing: PenTool) -> str:
+    """
+    Данные пути штриха карандаша: абсолютная первая точка и относительные смещения
+    
+    Returns:
+        str: Строка для атрибута d (пустая для штриха из одной точки)
+    """
+    if drawing.point_count() < 2:
+        return ''
+    coords = np.frombuffer(drawing.points, dtype=np.int32).reshape(-1, 2)
+    deltas = np.diff(coords, axis=0).ravel().tolist()
+    return f'M{coords[0, 0]} {coords[0, 1]}l' + ' '.join(map(str, deltas))
+
+
+def _write_drawing(file: TextIO, drawing: Tool, css_class: str) -> None:
+    """Записать один рисунок как SVG-примитив"""
+    if isinstance(drawing, PenTool):
+        data = pen_path_data(drawing)
+        if data:
+            file.write(f'<path class="{css_class}" d="{data}"/>\n')
+        return
+    
+    if drawing.start_point is None or drawing.end_point is None:
+        return
+    x1, y1 = drawing.start_point.x(), drawing.start_point.y()
+    x2, y2 = drawing.end_point.x(), drawing.end_point.y()
+    
+    if isinstance(drawing, LineTool):
+        file.write(f'<line class="{css_class}" x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}"/>\n')
+    elif isinstance(drawing, RectangleTool):
+        file.write(f'<rect class="{css_class}" x="{min(x1, x2)}" y="{min(y1, y2)}" '
+                   f'width="{abs(x2 - x1)}" height="{abs(y2 - y1)}"/>\n')
+    elif isinstance(drawing, CircleTool):
+        file.write(f'<ellipse class="{css_class}" cx="{(x1 + x2) / 2:g}" cy="{(y1 + y2) / 2:g}" '
+                   f'rx="{abs(x2 - x1) / 2:g}" ry="{abs(y2 - y1) / 2:g}"/>\n')
+    elif isinstance(drawing, ArrowTool):
+        point1, point2 = drawing.head_points()
+        file.write(f'<path class="{css_class}" d="M{x1} {y1}L{x2} {y2}'
+                   f'M{point1.x()} {point1.y()}L{x2} {y2}L{point2.x()} {point2.y()}"/>\n')
+
+
+def _write_raster(file: TextIO, image: QImage, width: int, height: int) -> None:
+    """Встроить растровый слой как PNG в data URI (base64 пишется блоками)"""
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.WriteOnly)
+    image.save(buffer, 'PNG')
+    buffer.close()
+    
+    png = memoryview(data.data())
+    file.write(f'<image x="0" y="0" width="{width}" height="{height}" href="data:image/png;base64,')
+    for offset in range(0, len(png), _BASE64_CHUNK):
+        file.write(base64.b64encode(png[offset:offset + _BASE64_CHUNK]).decode('ascii'))
+    file.write('"/>\n')
+
+
+def write_svg(path: str, drawings: Sequence[Tool], width: int, height: int,
+              baked_layer: Optional[QImage] = None,
+              progress: Optional[Callable[[int], None]] = None) -> None:
+    """
+    Записать сцену в SVG-файл (атомарно: через временный файл)
+    
+    Args:
+        path: Путь к файлу .svg
+        drawings: Завершённые рисунки
+        width: Ширина холста (логические пиксели)
+        height: Высота холста (логические пиксели)
+        baked_layer: Запечённый растровый слой (встраивается как изображение)
+        progress: Функция, получающая прогресс в процентах
+    """
+    styles = _collect_styles(drawings)
+    total = len(drawings)
+    
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8', newline='\n') as file:
+        file.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        file.write(f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                   f'viewBox="0 0 {width} {height}">\n')
+        _write_style_sheet(file, styles)
+        
+        if baked_layer is not None:
+            _write_raster(file, baked_layer, width, height)
+        
+        for i, drawing in enumerate(drawings, 1):
+            _write_drawing(file, drawing, styles[_style_key(drawing)])
+            if progress is not None and i % 1024 == 0:
+                progress(i * 100 // total)
+        
+        file.write('</svg>\n')
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
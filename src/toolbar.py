@@ -5,16 +5,20 @@ SharkDraw Toolbar
 """
 
 import os
-from typing import Optional
+from typing import List, Optional, Tuple
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QSlider, QLabel, QButtonGroup, QGridLayout, QApplication)
-from PyQt5.QtCore import Qt, pyqtSignal, QPoint
-from PyQt5.QtGui import QColor, QPalette, QMouseEvent, QPixmap
+from PyQt5.QtCore import Qt, pyqtSignal, QPoint, QSize, QTimer
+from PyQt5.QtGui import QColor, QPalette, QMouseEvent, QPixmap, QIcon, QShowEvent
 from src.config import (ToolType, COLORS, MIN_LINE_WIDTH, MAX_LINE_WIDTH, DEFAULT_LINE_WIDTH,
-                        APP_NAME, SHARK_GRAY, BANANA_YELLOW, DEEP_OCEAN, WHITE_TEETH)
+                        APP_NAME, SHARK_GRAY, BANANA_YELLOW, DEEP_OCEAN, WHITE_TEETH, TARGET_FPS)
 from src import styles
 from src.clickable_slider import ClickableSlider
 from src.resource_path import get_resource_path
+from src.icon_cache import icon_pixmap
+from src.logger import get_logger
+
+logger = get_logger('toolbar')
 
 
 class Toolbar(QWidget):
@@ -28,16 +32,30 @@ class Toolbar(QWidget):
     close_requested = pyqtSignal()
     toggle_drawing_requested = pyqtSignal()  # Новый сигнал для переключения режима рисования
     geometry_changed = pyqtSignal()  # Сигнал при изменении позиции панели
+    save_requested = pyqtSignal()  # Сохранить доску в файл
+    open_requested = pyqtSignal()  # Открыть доску из файла
     
     def __init__(self, sound_manager=None):
         super().__init__()
         self.sound_manager = sound_manager
+        
+        # SVG-иконки кнопок (кнопка, файл, размер) и плотность пикселей, под
+        # которую они растрированы - при переходе на другой экран перезагружаются
+        self._svg_icons: List[Tuple[QPushButton, str, int]] = []
+        self._icon_ratio = self.devicePixelRatioF()
+        self._screen_watched = False
         self.init_ui()
         
         # Для перетаскивания панели
         self.dragging = False
         self.drag_position = QPoint()
         
+        # Во время перетаскивания сообщаем о новой позиции не чаще раза в кадр
+        self._geometry_timer = QTimer(self)
+        self._geometry_timer.setSingleShot(True)
+        self._geometry_timer.setInterval(1000 // TARGET_FPS)
+        self._geometry_timer.timeout.connect(self.geometry_changed.emit)
+        
         # Состояние режима рисования
         self.drawing_mode = False
     
@@ -142,6 +160,26 @@ class Toolbar(QWidget):
         clear_btn.setCursor(Qt.PointingHandCursor)
         main_layout.addWidget(clear_btn)
         
+        # ========== SAVE / OPEN BUTTONS ==========
+        file_layout = QHBoxLayout()
+        file_layout.setSpacing(6)
+        
+        save_btn = QPushButton('СОХРАНИТЬ')
+        save_btn.setStyleSheet(styles.TOOL_BUTTON_STYLE)
+        save_btn.setFixedHeight(26)
+        save_btn.setCursor(Qt.PointingHandCursor)
+        save_btn.clicked.connect(lambda: (self._play_click(), self.save_requested.emit()))
+        file_layout.addWidget(save_btn)
+        
+        open_btn = QPushButton('ОТКРЫТЬ')
+        open_btn.setStyleSheet(styles.TOOL_BUTTON_STYLE)
+        open_btn.setFixedHeight(26)
+        open_btn.setCursor(Qt.PointingHandCursor)
+        open_btn.clicked.connect(lambda: (self._play_click(), self.open_requested.emit()))
+        file_layout.addWidget(open_btn)
+        
+        main_layout.addLayout(file_layout)
+        
         # Разделитель
         main_layout.addWidget(self.create_separator())
         
@@ -253,31 +291,53 @@ class Toolbar(QWidget):
         screen = QApplication.desktop().screenGeometry()
         self.move(screen.width() - self.width() - 20, 20)
     
+    def _set_svg_icon(self, button: QPushButton, icon_file: str, size: int) -> None:
+        """
+        Установить кнопке SVG-иконку из assets/icons
+        
+        Иконка растрируется под плотность пикселей экрана (чёткая на HiDPI)
+        и берётся из кэша, если уже растрировалась раньше.
+        """
+        self._svg_icons.append((button, icon_file, size))
+        self._apply_svg_icon(button, icon_file, size, self._icon_ratio)
+    
+    @staticmethod
+    def _apply_svg_icon(button: QPushButton, icon_file: str, size: int, ratio: float) -> None:
+        """Взять иконку из кэша под плотность пикселей ratio и установить кнопке"""
+        # Путь с учётом сборки PyInstaller
+        icon_path = get_resource_path(os.path.join('assets', 'icons', icon_file))
+        pixmap = icon_pixmap(icon_path, size, ratio)
+        if pixmap is not None:
+            button.setIcon(QIcon(pixmap))
+            button.setIconSize(QSize(size, size))
+    
+    def _refresh_icons(self) -> None:
+        """Перезагрузить иконки, если плотность пикселей экрана изменилась"""
+        ratio = self.devicePixelRatioF()
+        if ratio == self._icon_ratio:
+            return
+        self._icon_ratio = ratio
+        for button, icon_file, size in self._svg_icons:
+            self._apply_svg_icon(button, icon_file, size, ratio)
+        logger.debug('🖼️  Иконки панели перезагружены для плотности x%g', ratio)
+    
+    def showEvent(self, event: QShowEvent) -> None:
+        """Следить за сменой экрана окна (у окна другая плотность пикселей)"""
+        super().showEvent(event)
+        window = self.windowHandle()
+        if window is not None and not self._screen_watched:
+            window.screenChanged.connect(lambda _: self._refresh_icons())
+            self._screen_watched = True
+        self._refresh_icons()
+    
     def create_icon_button(self, icon_file: str, tooltip: str, tool_type: ToolType) -> QPushButton:
         """Создать кнопку инструмента с иконкой"""
-        from PyQt5.QtSvg import QSvgRenderer
-        from PyQt5.QtGui import QPixmap, QPainter, QIcon
-        
         btn = QPushButton()
         btn.setCheckable(True)
         btn.setFixedSize(56, 56)
         btn.setToolTip(tooltip)
         btn.setCursor(Qt.PointingHandCursor)
-        
-        # Загрузка SVG иконки с правильным путём для PyInstaller
-        icon_path = get_resource_path(os.path.join('assets', 'icons', icon_file))
-        if os.path.exists(icon_path):
-            # Создаем QIcon из SVG
-            pixmap = QPixmap(24, 24)
-            pixmap.fill(Qt.transparent)
-            
-            renderer = QSvgRenderer(icon_path)
-            painter = QPainter(pixmap)
-            renderer.render(painter)
-            painter.end()
-            
-            btn.setIcon(QIcon(pixmap))
-            btn.setIconSize(pixmap.size())
+        self._set_svg_icon(btn, icon_file, 24)
         
         btn.setStyleSheet(styles.ICON_BUTTON_STYLE)
         btn.clicked.connect(lambda: (self._play_click(), self.tool_changed.emit(tool_type)))
@@ -321,24 +381,8 @@ class Toolbar(QWidget):
     
     def _load_button_icon(self, button: QPushButton, icon_file: str, tooltip: str) -> None:
         """Загрузить SVG иконку для кнопки"""
-        from PyQt5.QtSvg import QSvgRenderer
-        from PyQt5.QtGui import QPixmap, QPainter, QIcon
-        import os
-        
         button.setToolTip(tooltip)
-        
-        icon_path = os.path.join('assets', 'icons', icon_file)
-        if os.path.exists(icon_path):
-            pixmap = QPixmap(20, 20)
-            pixmap.fill(Qt.transparent)
-            
-            renderer = QSvgRenderer(icon_path)
-            painter = QPainter(pixmap)
-            renderer.render(painter)
-            painter.end()
-            
-            button.setIcon(QIcon(pixmap))
-            button.setIconSize(pixmap.size())
+        self._set_svg_icon(button, icon_file, 20)
     
     def create_separator(self) -> QLabel:
         """Создать разделительную линию"""
@@ -357,10 +401,10 @@ class Toolbar(QWidget):
         self.drawing_mode = self.toggle_btn.isChecked()
         if self.drawing_mode:
             self.toggle_btn.setText('ВЫКЛЮЧИТЬ\nРИСОВАНИЕ')
-            print('🟢 Кнопка: Режим рисования ВКЛЮЧЕН')
+            logger.info('🟢 Кнопка: Режим рисования ВКЛЮЧЕН')
         else:
             self.toggle_btn.setText('ВКЛЮЧИТЬ\nРИСОВАНИЕ')
-            print('🔴 Кнопка: Режим рисования ВЫКЛЮЧЕН')
+            logger.info('🔴 Кнопка: Режим рисования ВЫКЛЮЧЕН')
         
         self._play_click()
         self.toggle_drawing_requested.emit()
@@ -391,11 +435,16 @@ class Toolbar(QWidget):
         """Перетаскивание панели"""
         if self.dragging:
             self.move(event.globalPos() - self.drag_position)
-            self.geometry_changed.emit()  # Уведомляем об изменении позиции
+            if not self._geometry_timer.isActive():
+                self._geometry_timer.start()  # Уведомим об изменении позиции в конце кадра
             event.accept()
     
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
         """Конец перетаскивания"""
         if event.button() == Qt.LeftButton:
+            if self.dragging:
+                # Финальная точная позиция без ожидания кадра
+                self._geometry_timer.stop()
+                self.geometry_changed.emit()
             self.dragging = False
             event.accept()
@@ -4,15 +4,22 @@
 Содержит базовый класс Tool и реализации различных инструментов
 """
 
+import sys
 from abc import ABC, abstractmethod
-from PyQt5.QtCore import QPoint, Qt
-from PyQt5.QtGui import QPainter, QPen, QColor
+from array import array
+from PyQt5.QtCore import QPoint, QRect, Qt
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygon
 import math
+import numpy as np
+from src import geometry
 
 
 class Tool(ABC):
     """Базовый класс для всех инструментов рисования"""
     
+    # Рисунков на холсте тысячи - __slots__ убирают __dict__ у каждого из них
+    __slots__ = ('color', 'width', 'start_point', 'end_point', 'points', 'order')
+    
     def __init__(self, color: QColor, width: int):
         """
         Инициализация инструмента
@@ -25,7 +32,11 @@ class Tool(ABC):
         self.width = width
         self.start_point = None
         self.end_point = None
-        self.points = []  # Для инструментов с множественными точками
+        # Для инструментов с множественными точками: плоский массив int32
+        # вида x0, y0, x1, y1, ... без Python-объекта на каждую точку
+        self.points = array('i')
+        # Ключ порядка в сцене (назначает Scene): возрастает вдоль списка рисунков
+        self.order = None
     
     @abstractmethod
     def draw(self, painter: QPainter):
@@ -41,31 +52,125 @@ class Tool(ABC):
         self.end_point = point
     
     def add_point(self, point: QPoint):
-        """Добавить точку в список (для свободного рисования)"""
-        self.points.append(point)
+        """Добавить точку в массив (для свободного рисования)"""
+        self.points.append(point.x())
+        self.points.append(point.y())
+    
+    def point_count(self) -> int:
+        """Количество точек в массиве"""
+        return len(self.points) // 2
+    
+    def memory_size(self) -> int:
+        """
+        Примерный объём памяти рисунка в байтах
+        
+        Учитывает сам объект, массив точек и обёртки начальной/конечной
+        точек. Цвет разделяется между рисунками и не учитывается.
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.points)
+        if self.start_point is not None:
+            size += sys.getsizeof(self.start_point)
+        if self.end_point is not None:
+            size += sys.getsizeof(self.end_point)
+        return size
+    
+    def bounding_rect(self) -> QRect:
+        """
+        Габариты рисунка с учётом толщины линии
+        
+        Returns:
+            QRect: Прямоугольник, покрывающий все пиксели рисунка
+                   (пустой, если рисовать нечего)
+        """
+        if self.points:
+            # Срезы массива выполняются на стороне C
+            xs = self.points[0::2]
+            ys = self.points[1::2]
+            rect = QRect(QPoint(min(xs), min(ys)), QPoint(max(xs), max(ys)))
+        elif self.start_point is not None and self.end_point is not None:
+            rect = QRect(self.start_point, self.end_point).normalized()
+        else:
+            return QRect()
+        return self._inflate_by_pen(rect)
+    
+    def outline_segments(self) -> np.ndarray:
+        """
+        Контур рисунка в виде отрезков для проверки попадания ластиком
+        
+        Returns:
+            np.ndarray: Массив формы (k, 4) из отрезков (x1, y1, x2, y2)
+        """
+        if self.start_point is None or self.end_point is None:
+            return geometry.polyline_segments(self.points)
+        return np.array([(self.start_point.x(), self.start_point.y(),
+                          self.end_point.x(), self.end_point.y())], dtype=np.float64)
+    
+    def _corners(self):
+        """Координаты начальной и конечной точек (x0, y0, x1, y1)"""
+        return (self.start_point.x(), self.start_point.y(),
+                self.end_point.x(), self.end_point.y())
+    
+    def _inflate_by_pen(self, rect: QRect) -> QRect:
+        """Расширить прямоугольник на половину толщины линии"""
+        half = self.width // 2 + 1
+        return rect.adjusted(-half, -half, half, half)
 
 
 class PenTool(Tool):
     """Инструмент карандаш - свободное рисование"""
     
+    __slots__ = ()
+    
     def draw(self, painter: QPainter):
         """Отрисовка линии по точкам"""
-        if len(self.points) < 2:
+        if self.point_count() < 2:
             return
         
         pen = QPen(self.color, self.width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
         painter.setPen(pen)
+        painter.drawPolyline(self.to_polygon())
+    
+    def draw_last_segment(self, painter: QPainter):
+        """Отрисовка только последнего сегмента (для инкрементального рисования)"""
+        if self.point_count() < 2:
+            return
+        
+        pen = QPen(self.color, self.width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
+        painter.setPen(pen)
+        x1, y1, x2, y2 = self.points[-4:]
+        painter.drawLine(x1, y1, x2, y2)
+    
+    def last_segment_rect(self) -> QRect:
+        """Габариты последнего добавленного сегмента с учётом толщины линии"""
+        if not self.points:
+            return QRect()
+        x1, y1 = self.points[-4:-2] if self.point_count() > 1 else self.points[-2:]
+        x2, y2 = self.points[-2:]
+        rect = QRect(QPoint(x1, y1), QPoint(x2, y2)).normalized()
+        return self._inflate_by_pen(rect)
+    
+    def to_polygon(self) -> QPolygon:
+        """
+        Построить QPolygon из массива точек без промежуточных объектов
         
-        for i in range(1, len(self.points)):
-            painter.drawLine(self.points[i - 1], self.points[i])
+        QPoint хранит два int32 подряд, поэтому буфер массива копируется
+        в память полигона напрямую.
+        """
+        polygon = QPolygon(self.point_count())
+        buffer = polygon.data()
+        buffer.setsize(len(self.points) * self.points.itemsize)
+        memoryview(buffer)[:] = memoryview(self.points).cast('B')
+        return polygon
 
 
 class LineTool(Tool):
     """Инструмент линия - прямая линия"""
     
+    __slots__ = ()
+    
     def draw(self, painter: QPainter):
         """Отрисовка прямой линии"""
-        if not self.start_point or not self.end_point:
+        if self.start_point is None or self.end_point is None:
             return
         
         pen = QPen(self.color, self.width, Qt.SolidLine, Qt.RoundCap)
@@ -76,9 +181,11 @@ class LineTool(Tool):
 class RectangleTool(Tool):
     """Инструмент прямоугольник"""
     
+    __slots__ = ()
+    
     def draw(self, painter: QPainter):
         """Отрисовка прямоугольника"""
-        if not self.start_point or not self.end_point:
+        if self.start_point is None or self.end_point is None:
             return
         
         pen = QPen(self.color, self.width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
@@ -92,14 +199,22 @@ class RectangleTool(Tool):
         height = abs(self.end_point.y() - self.start_point.y())
         
         painter.drawRect(x, y, width, height)
+    
+    def outline_segments(self) -> np.ndarray:
+        """Четыре стороны прямоугольника"""
+        if self.start_point is None or self.end_point is None:
+            return super().outline_segments()
+        return geometry.rectangle_outline_segments(*self._corners())
 
 
 class CircleTool(Tool):
     """Инструмент круг/эллипс"""
     
+    __slots__ = ()
+    
     def draw(self, painter: QPainter):
         """Отрисовка круга/эллипса"""
-        if not self.start_point or not self.end_point:
+        if self.start_point is None or self.end_point is None:
             return
         
         pen = QPen(self.color, self.width, Qt.SolidLine, Qt.RoundCap)
@@ -113,14 +228,22 @@ class CircleTool(Tool):
         height = abs(self.end_point.y() - self.start_point.y())
         
         painter.drawEllipse(x, y, width, height)
+    
+    def outline_segments(self) -> np.ndarray:
+        """Контур эллипса"""
+        if self.start_point is None or self.end_point is None:
+            return super().outline_segments()
+        return geometry.ellipse_outline_segments(*self._corners())
 
 
 class ArrowTool(Tool):
     """Инструмент стрелка"""
     
+    __slots__ = ()
+    
     def draw(self, painter: QPainter):
         """Отрисовка стрелки с наконечником"""
-        if not self.start_point or not self.end_point:
+        if self.start_point is None or self.end_point is None:
             return
         
         pen = QPen(self.color, self.width, Qt.SolidLine, Qt.RoundCap, Qt.RoundJoin)
@@ -129,6 +252,18 @@ class ArrowTool(Tool):
         # Рисуем основную линию
         painter.drawLine(self.start_point, self.end_point)
         
+        # Рисуем наконечник
+        point1, point2 = self.head_points()
+        painter.drawLine(self.end_point, point1)
+        painter.drawLine(self.end_point, point2)
+    
+    def head_points(self):
+        """
+        Вычислить концы наконечника стрелки
+        
+        Returns:
+            tuple: Две точки QPoint, соединяемые с конечной точкой стрелки
+        """
         # Вычисляем угол стрелки
         dx = self.end_point.x() - self.start_point.x()
         dy = self.end_point.y() - self.start_point.y()
@@ -147,15 +282,32 @@ class ArrowTool(Tool):
             int(self.end_point.x() - arrow_size * math.cos(angle + arrow_angle)),
             int(self.end_point.y() - arrow_size * math.sin(angle + arrow_angle))
         )
-        
-        # Рисуем наконечник
-        painter.drawLine(self.end_point, point1)
-        painter.drawLine(self.end_point, point2)
+        return point1, point2
+    
+    def outline_segments(self) -> np.ndarray:
+        """Древко стрелки и наконечник"""
+        if self.start_point is None or self.end_point is None:
+            return super().outline_segments()
+        point1, point2 = self.head_points()
+        return geometry.arrow_segments(*self._corners(),
+                                       (point1.x(), point1.y()), (point2.x(), point2.y()))
+    
+    def bounding_rect(self) -> QRect:
+        """Габариты стрелки вместе с наконечником"""
+        if self.start_point is None or self.end_point is None:
+            return QRect()
+        point1, point2 = self.head_points()
+        xs = (self.start_point.x(), self.end_point.x(), point1.x(), point2.x())
+        ys = (self.start_point.y(), self.end_point.y(), point1.y(), point2.y())
+        rect = QRect(QPoint(min(xs), min(ys)), QPoint(max(xs), max(ys)))
+        return self._inflate_by_pen(rect)
 
 
 class EraserTool(Tool):
     """Инструмент ластик - удаление рисунков"""
     
+    __slots__ = ()
+    
     def __init__(self, color: QColor, width: int):
         super().__init__(color, width * 3)  # Ластик в 3 раза толще
     
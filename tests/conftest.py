@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+Общие фикстуры тестов
+Тесты запускаются без экрана (платформа Qt offscreen) из корня проекта:
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope='session')
+def qapp():
+    """Единственный на все тесты экземпляр QApplication"""
+    from PyQt5.QtWidgets import QApplication
+    return QApplication.instance() or QApplication([])
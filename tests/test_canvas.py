@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Тесты холста"""
+
+from PyQt5.QtCore import QEvent, QPointF, Qt
+from PyQt5.QtGui import QMouseEvent
+
+
+def _mouse(kind, x, y):
+    buttons = Qt.NoButton if kind == QEvent.MouseButtonRelease else Qt.LeftButton
+    return QMouseEvent(kind, QPointF(x, y), Qt.LeftButton, buttons, Qt.NoModifier)
+
+
+def _pen_down(canvas, points):
+    """Начать штрих карандаша и провести его по точкам (без отпускания)"""
+    canvas.mousePressEvent(_mouse(QEvent.MouseButtonPress, *points[0]))
+    for point in points[1:]:
+        canvas.mouseMoveEvent(_mouse(QEvent.MouseMove, *point))
+
+
+def test_abandoned_pen_stroke_does_not_reappear(qapp):
+    from src.canvas import TransparentCanvas
+    from src.config import ToolType
+    
+    canvas = TransparentCanvas()
+    canvas.resize(300, 200)
+    canvas.enable_drawing()
+    canvas.set_tool(ToolType.PEN)
+    canvas.set_width(6)
+    canvas.renderer.committed_layer()
+    
+    # Штрих брошен переключением режима посреди рисования
+    _pen_down(canvas, [(20, 20), (60, 20), (100, 20)])
+    canvas.disable_drawing()
+    canvas.enable_drawing()
+    
+    # Новый штрих проходит через то же место
+    _pen_down(canvas, [(60, 100), (60, 60), (60, 10)])
+    assert canvas.renderer._active_layer.pixelColor(100, 20).alpha() == 0
+    canvas.mouseReleaseEvent(_mouse(QEvent.MouseButtonRelease, 60, 10))
+    
+    committed = canvas.renderer.committed_layer()
+    assert committed.pixelColor(100, 20).alpha() == 0
+    assert committed.pixelColor(60, 100).alpha() > 0
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Тесты фонового экспорта холста"""
+
+import time
+
+from PyQt5.QtCore import QThreadPool
+
+
+def _wait_for(qapp, results, timeout=5.0):
+    """Крутить цикл событий, пока не придёт результат задачи"""
+    deadline = time.perf_counter() + timeout
+    while not results and time.perf_counter() < deadline:
+        QThreadPool.globalInstance().waitForDone(10)
+        qapp.processEvents()
+
+
+def test_export_callbacks_connected_before_task_starts(qapp, tmp_path, monkeypatch):
+    from src import canvas as canvas_module
+    
+    canvas = canvas_module.TransparentCanvas()
+    canvas.resize(64, 48)
+    
+    # Задача, которая завершается прямо в start(): обработчик, подключённый
+    # после запуска, результат бы уже пропустил
+    def run_immediately(pool, task):
+        task.run()
+    monkeypatch.setattr(QThreadPool, 'start', run_immediately)
+    
+    results = []
+    for export, name in ((canvas.export_png, 'out.png'), (canvas.export_svg, 'out.svg')):
+        path = str(tmp_path / name)
+        results.clear()
+        export(path, on_finished=results.append, on_failed=results.append)
+        _wait_for(qapp, results)
+        assert results == [path]
+
+
+def test_screenshot_grabs_screen_after_canvas_is_hidden(qapp, tmp_path):
+    from src import canvas as canvas_module
+    
+    canvas = canvas_module.TransparentCanvas()
+    canvas.resize(64, 48)
+    canvas.show()
+    canvas.setWindowOpacity(0.5)
+    
+    grabbed = []
+    results = []
+    path = str(tmp_path / 'shot.png')
+    canvas.capture_screenshot(path, on_finished=results.append, on_failed=results.append,
+                              on_grabbed=lambda: grabbed.append(True))
+    # Захват откладывается, пока композитор не перерисует экран без холста
+    assert grabbed == []
+    assert canvas.windowOpacity() == 0.0
+    
+    _wait_for(qapp, results)
+    assert grabbed == [True]
+    assert results == [path]
+    assert abs(canvas.windowOpacity() - 0.5) < 0.01
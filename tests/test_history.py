@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Тесты истории отмены/повтора и её согласования с запеканием"""
+
+from PyQt5.QtCore import QEvent, QPointF, Qt
+from PyQt5.QtGui import QMouseEvent
+
+from src.history import History, HistoryEntry
+
+
+def _erase(position, drawing):
+    return HistoryEntry(HistoryEntry.ERASE, erased=[[(position, drawing)]])
+
+
+def test_on_baked_shifts_erase_positions():
+    history = History()
+    history.record(HistoryEntry(HistoryEntry.ADD, drawing='a'))
+    history.record(_erase(10, 'b'))
+    
+    history.on_baked(6, {'x'})
+    
+    entry = history.pop_undo()
+    assert entry.erased == [[(4, 'b')]]
+    assert history.pop_undo().drawing == 'a'
+
+
+def test_on_baked_drops_erase_below_baked_layer_and_older_entries():
+    history = History()
+    history.record(HistoryEntry(HistoryEntry.ADD, drawing='old'))
+    history.record(_erase(0, 'erased'))
+    history.record(HistoryEntry(HistoryEntry.ADD, drawing='new'))
+    
+    history.on_baked(6, {'x'})
+    
+    assert history.pop_undo().drawing == 'new'
+    assert history.pop_undo() is None
+
+
+def test_on_baked_keeps_entries_before_scene_replacement():
+    history = History()
+    history.record(_erase(0, 'before clear'))
+    history.record(HistoryEntry(HistoryEntry.CLEAR, checkpoint=([], None, 0, None)))
+    history.record(HistoryEntry(HistoryEntry.ADD, drawing='new'))
+    
+    history.on_baked(6, {'x'})
+    
+    assert history.pop_undo().drawing == 'new'
+    assert history.pop_undo().kind == HistoryEntry.CLEAR
+    assert history.pop_undo().erased == [[(0, 'before clear')]]
+
+
+def _mouse(kind, x, y):
+    buttons = Qt.NoButton if kind == QEvent.MouseButtonRelease else Qt.LeftButton
+    return QMouseEvent(kind, QPointF(x, y), Qt.LeftButton, buttons, Qt.NoModifier)
+
+
+def _draw_line(canvas, x, y):
+    canvas.mousePressEvent(_mouse(QEvent.MouseButtonPress, x, y))
+    canvas.mouseMoveEvent(_mouse(QEvent.MouseMove, x + 30, y))
+    canvas.mouseReleaseEvent(_mouse(QEvent.MouseButtonRelease, x + 30, y))
+
+
+def test_undo_erase_after_bake_does_not_resurrect_drawing_above_newer_ones(qapp, monkeypatch):
+    from src import canvas as canvas_module
+    from src.config import ToolType
+    monkeypatch.setattr(canvas_module, 'MAX_DRAWINGS', 20)
+    
+    canvas = canvas_module.TransparentCanvas()
+    canvas.setGeometry(0, 0, 800, 600)
+    canvas.set_tool(ToolType.LINE)
+    for i in range(20):
+        _draw_line(canvas, 20, 20 + i * 25)
+    first = canvas.drawings[0]
+    
+    canvas.set_tool(ToolType.ERASER)
+    canvas.erase_at_point(first.start_point)
+    assert first not in canvas.drawings
+    
+    canvas.set_tool(ToolType.LINE)
+    _draw_line(canvas, 400, 20)
+    _draw_line(canvas, 400, 60)
+    assert canvas.scene.baked_layer is not None
+    
+    drawings = list(canvas.drawings)
+    while canvas.history.can_undo():
+        canvas.undo()
+    assert first not in canvas.drawings
+    assert canvas.drawings == drawings[:len(canvas.drawings)]
+    canvas.close()
+
+
+def test_newest_entry_is_kept_even_over_memory_budget():
+    history = History(max_bytes=1000)
+    history.record(HistoryEntry(HistoryEntry.CLEAR, checkpoint='big', size=5000))
+    assert history.can_undo()
+    
+    history.record(HistoryEntry(HistoryEntry.CLEAR, checkpoint='bigger', size=6000))
+    assert history.pop_undo().checkpoint == 'bigger'
+    assert not history.can_undo()
+
+
+def test_clear_of_baked_5k_board_is_undoable(qapp, monkeypatch):
+    from src import canvas as canvas_module
+    from src.config import ToolType
+    monkeypatch.setattr(canvas_module, 'MAX_DRAWINGS', 20)
+    
+    canvas = canvas_module.TransparentCanvas()
+    canvas.setGeometry(0, 0, 5120, 2880)
+    canvas.show()
+    canvas.set_tool(ToolType.LINE)
+    for i in range(25):
+        _draw_line(canvas, 20, 20 + i * 25)
+    assert canvas.scene.baked_layer is not None
+    steps = len(canvas.history._undo)
+    drawings = list(canvas.drawings)
+    
+    canvas.clear_canvas()
+    assert canvas.history.can_undo()
+    assert len(canvas.history._undo) == steps + 1
+    canvas.undo()
+    assert canvas.drawings == drawings
+    assert canvas.scene.baked_layer is not None
+    canvas.close()
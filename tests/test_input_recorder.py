@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Тесты записи и воспроизведения ввода"""
+
+from PyQt5.QtCore import QEvent, QPointF, Qt
+from PyQt5.QtGui import QMouseEvent
+from PyQt5.QtWidgets import QApplication
+
+
+def _canvas():
+    from src.canvas import TransparentCanvas
+    
+    canvas = TransparentCanvas()
+    canvas.resize(400, 300)
+    return canvas
+
+
+def _drag(canvas, start, end):
+    """Провести мышью с зажатой левой кнопкой"""
+    for kind, point in ((QEvent.MouseButtonPress, start), (QEvent.MouseMove, end),
+                        (QEvent.MouseButtonRelease, end)):
+        buttons = Qt.NoButton if kind == QEvent.MouseButtonRelease else Qt.LeftButton
+        QApplication.sendEvent(canvas, QMouseEvent(kind, QPointF(*point), Qt.LeftButton,
+                                                   buttons, Qt.NoModifier))
+
+
+def test_replay_starts_from_board_saved_with_recording(qapp, tmp_path):
+    from src.config import ToolType
+    from src.input_recorder import InputRecorder, InputReplayer, load_recording
+    
+    canvas = _canvas()
+    canvas.enable_drawing()
+    canvas.set_tool(ToolType.RECTANGLE)
+    _drag(canvas, (10, 10), (50, 50))
+    _drag(canvas, (60, 60), (90, 90))
+    
+    path = str(tmp_path / 'input.skdi')
+    recorder = InputRecorder(canvas)
+    recorder.start(path)
+    _drag(canvas, (100, 100), (150, 150))
+    recorder.stop()
+    assert len(canvas.drawings) == 3
+    
+    recording = load_recording(path)
+    assert len(recording.scene.drawings) == 2
+    
+    # Воспроизведение на другой доске: начальные рисунки берутся из записи
+    other = _canvas()
+    other.set_tool(ToolType.LINE)
+    _drag(other, (0, 0), (20, 20))
+    InputReplayer(other).play(path, realtime=False)
+    assert [drawing.bounding_rect() for drawing in other.drawings] == \
+        [drawing.bounding_rect() for drawing in canvas.drawings]
+
+
+def test_realtime_replay_does_not_accumulate_handler_time(qapp, tmp_path, monkeypatch):
+    import time
+    from src import input_recorder
+    
+    # 20 смен толщины с паузой 10 мс; каждый обработчик занимает 5 мс
+    path = tmp_path / 'input.skdi'
+    with open(path, 'wb') as file:
+        file.write(input_recorder._HEADER_V2.pack(input_recorder.RECORDING_MAGIC, 1, 400, 300))
+        for width in range(1, 21):
+            file.write(input_recorder._RECORD.pack(10_000, input_recorder.EVENT_WIDTH, 0, width, 0))
+    
+    canvas = _canvas()
+    monkeypatch.setattr(canvas, 'set_width', lambda width: time.sleep(0.005))
+    replayer = input_recorder.InputReplayer(canvas)
+    results = []
+    replayer.finished.connect(results.append)
+    replayer.play(str(path), realtime=True)
+    
+    deadline = time.perf_counter() + 5
+    while not results and time.perf_counter() < deadline:
+        qapp.processEvents()
+        time.sleep(0.001)
+    
+    # Паузы от предыдущей записи дали бы 20 * (10 + 5) = 300 мс
+    assert results[0]['events'] == 20
+    assert results[0]['total_ms'] < 260
+
+
+def test_replay_restores_drawing_mode_and_loaded_boards(qapp, tmp_path):
+    from src.config import ToolType
+    from src.input_recorder import InputRecorder, InputReplayer
+    
+    # Доска, которую откроют посреди записи
+    board = _canvas()
+    board.set_tool(ToolType.CIRCLE)
+    _drag(board, (200, 200), (240, 240))
+    board_path = str(tmp_path / 'board.skd')
+    board.save_scene(board_path)
+    
+    canvas = _canvas()
+    canvas.enable_drawing()
+    canvas.set_tool(ToolType.RECTANGLE)
+    path = str(tmp_path / 'input.skdi')
+    recorder = InputRecorder(canvas)
+    recorder.start(path)
+    _drag(canvas, (10, 10), (50, 50))
+    canvas.load_scene(board_path)
+    recorder.record_scene_loaded()
+    _drag(canvas, (60, 60), (90, 90))
+    recorder.stop()
+    
+    # Приложение запускается с выключенным режимом рисования
+    other = _canvas()
+    other.show()
+    assert not other.drawing_enabled
+    modes = []
+    
+    def set_drawing_mode(enabled):
+        modes.append(enabled)
+        if enabled:
+            other.enable_drawing()
+        else:
+            other.disable_drawing()
+    
+    InputReplayer(other, set_drawing_mode=set_drawing_mode).play(path, realtime=False)
+    assert modes == [True]
+    assert other.drawing_enabled
+    assert [drawing.bounding_rect() for drawing in other.drawings] == \
+        [drawing.bounding_rect() for drawing in canvas.drawings]
+    assert len(other.drawings) == 2
+    assert other.history.can_undo()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Тесты журнала автосохранения"""
+
+import os
+import time
+
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QColor
+
+from src.journal import SceneJournal, _HEADER
+from src.tools import LineTool
+
+
+def _line(x):
+    drawing = LineTool(QColor(0, 0, 255), 3)
+    drawing.set_start_point(QPoint(x, 10))
+    drawing.set_end_point(QPoint(x + 20, 40))
+    return drawing
+
+
+def _start_points(drawings):
+    return [drawing.start_point.x() for drawing in drawings]
+
+
+def _write_journal(directory, snapshot, added):
+    journal = SceneJournal(str(directory), fsync_delay_ms=1)
+    journal.start(snapshot, None)
+    for drawing in added:
+        journal.add(drawing)
+    journal.close()
+    return journal.journal_path
+
+
+def test_recover_replays_journal_on_top_of_snapshot(qapp, tmp_path):
+    from src.canvas import TransparentCanvas
+    
+    journal = SceneJournal(str(tmp_path), fsync_delay_ms=1)
+    journal.start([_line(0), _line(100)], None)
+    journal.add(_line(200))
+    journal.erase([0])
+    journal.close()
+    
+    snapshot, operations = SceneJournal(str(tmp_path)).recover()
+    assert _start_points(snapshot.drawings) == [0, 100]
+    assert [operation[0] for operation in operations] == ['add', 'erase']
+    
+    canvas = TransparentCanvas()
+    canvas.restore_from_journal(snapshot, operations)
+    assert _start_points(canvas.drawings) == [100, 200]
+
+
+def test_recover_stops_at_torn_tail(qapp, tmp_path):
+    path = _write_journal(tmp_path, [], [_line(0), _line(100)])
+    with open(path, 'r+b') as file:
+        file.truncate(os.path.getsize(path) - 3)
+    
+    _, operations = SceneJournal(str(tmp_path)).recover()
+    assert [_start_points([drawing]) for _, drawing in operations] == [[0]]
+
+
+def test_recover_stops_at_corrupt_record(qapp, tmp_path):
+    path = _write_journal(tmp_path, [], [_line(0), _line(100), _line(200)])
+    with open(path, 'rb') as file:
+        data = bytearray(file.read())
+    
+    # Портим байт в середине второй записи (записи одного размера): третья
+    # запись цела, но после повреждения восстановление не продолжается
+    record_size = (len(data) - _HEADER.size) // 3
+    data[_HEADER.size + record_size + record_size // 2] ^= 0xFF
+    with open(path, 'wb') as file:
+        file.write(data)
+    
+    _, operations = SceneJournal(str(tmp_path)).recover()
+    assert [_start_points([drawing]) for _, drawing in operations] == [[0]]
+
+
+def test_continuous_records_are_written_without_waiting_for_a_pause(qapp, tmp_path):
+    journal = SceneJournal(str(tmp_path), fsync_delay_ms=50)
+    journal.start([], None)
+    while not os.path.exists(journal.journal_path):
+        time.sleep(0.005)
+    empty_size = os.path.getsize(journal.journal_path)
+    
+    # Записи идут чаще fsync_delay: пачка всё равно закрывается по времени
+    written_during_activity = False
+    end = time.monotonic() + 0.5
+    while time.monotonic() < end:
+        journal.clear()
+        time.sleep(0.01)
+        written_during_activity = written_during_activity or \
+            os.path.getsize(journal.journal_path) > empty_size
+    journal.close()
+    assert written_during_activity
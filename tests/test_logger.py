@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""Тесты журналирования"""
+
+import os
+import sys
+
+from src import logger
+
+
+def test_crash_report_contains_recent_log_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(sys, 'excepthook', sys.excepthook)
+    logger.setup_logging('INFO', log_dir=None)
+    try:
+        logger.get_logger('test').info('последний шаг перед сбоем')
+        logger.shutdown_logging()  # Дописывает очередь в кольцевой буфер
+        
+        logger.install_crash_handler(str(tmp_path))
+        try:
+            raise ValueError('сбой')
+        except ValueError:
+            sys.excepthook(*sys.exc_info())
+    finally:
+        logger.shutdown_logging()
+    
+    reports = [name for name in os.listdir(tmp_path) if name.startswith('crash-')]
+    assert len(reports) == 1
+    with open(tmp_path / reports[0], encoding='utf-8') as file:
+        report = file.read()
+    assert 'последний шаг перед сбоем' in report
+    assert 'ValueError: сбой' in report
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""Тесты планировщика перерисовки"""
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtWidgets import QWidget
+
+from src.render_scheduler import RenderScheduler
+
+
+def test_invalidation_from_frame_callback_joins_current_frame(qapp):
+    widget = QWidget()
+    scheduler = RenderScheduler(widget)
+    updated = []
+    widget.update = lambda *region: updated.append(region)
+    scheduler.add_frame_callback(lambda: scheduler.request_update(QRect(0, 0, 10, 10)))
+    
+    scheduler.request_frame()
+    scheduler.flush()
+    assert scheduler.frames == 1
+    assert len(updated) == 1
+    assert not scheduler._timer.isActive()
+    
+    # Следующего пустого кадра нет
+    scheduler.flush()
+    assert scheduler.frames == 1
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""Тесты модели сцены"""
+
+from PyQt5.QtCore import QPoint
+from PyQt5.QtGui import QColor
+
+from src.scene import Scene
+from src.tools import LineTool
+
+
+def _line(x, y):
+    drawing = LineTool(QColor(0, 0, 255), 2)
+    drawing.set_start_point(QPoint(x, y))
+    drawing.set_end_point(QPoint(x + 20, y))
+    return drawing
+
+
+def _scene(count):
+    scene = Scene()
+    for i in range(count):
+        scene.add(_line(10, 10 + i * 10))
+    return scene
+
+
+def test_hit_test_reports_list_positions():
+    scene = _scene(50)
+    scene.remove_at([(3, scene.drawings[3]), (7, scene.drawings[7])])
+    
+    hits = scene.hit_test([(15, 100), (15, 200)], 3)
+    
+    assert hits
+    assert all(scene.drawings[index] is drawing for index, drawing in hits)
+    assert [index for index, _ in hits] == sorted(index for index, _ in hits)
+
+
+def test_positions_survive_erase_and_undo():
+    scene = _scene(20)
+    erased = [(2, scene.drawings[2]), (5, scene.drawings[5])]
+    scene.remove_at(erased)
+    scene.insert_at(erased)
+    
+    for index, drawing in enumerate(scene.drawings):
+        assert scene.position(drawing) == index
+
+
+def test_inserting_new_objects_keeps_positions_consistent():
+    scene = _scene(10)
+    restored = [(0, _line(300, 10)), (4, _line(300, 50))]
+    scene.insert_at(restored)
+    
+    for index, drawing in enumerate(scene.drawings):
+        assert scene.position(drawing) == index
+    assert scene.position(restored[1][1]) == 4
+
+
+def test_loaded_state_leaves_excess_drawings_out_of_index(qapp):
+    from PyQt5.QtCore import QSize
+    scene = Scene(QSize(400, 400))
+    drawings = [_line(10, 10 + i * 3) for i in range(100)]
+    
+    state, to_bake = scene.build_loaded_state(
+        drawings, None, max_drawings=40, memory_budget=10 ** 9, target=0.5)
+    loaded, spatial_index, drawings_bytes, baked_layer = state
+    
+    assert to_bake == drawings[:80]
+    assert loaded == drawings[80:]
+    assert len(spatial_index) == 20
+    assert all(drawing not in spatial_index for drawing in to_bake)
+    assert drawings_bytes == sum(drawing.memory_size() for drawing in loaded)
+    assert baked_layer is None
+
+
+def test_background_bake_is_settled_before_scene_is_read_or_replaced(qapp):
+    from PyQt5.QtCore import QSize
+    scene = Scene(QSize(400, 400))
+    drawings = [_line(10, 10 + i * 3) for i in range(100)]
+    state, to_bake = scene.build_loaded_state(
+        drawings, None, max_drawings=40, memory_budget=10 ** 9, target=0.5)
+    scene.swap_state(state)
+    scene.bake_in_background(to_bake)
+    
+    # Снимок (экспорт, сохранение) уже содержит запечённые рисунки
+    _, baked_layer = scene.snapshot()
+    assert baked_layer is not None
+    assert baked_layer.pixelColor(12, 10).alpha() > 0
+    
+    # Замена сцены сохраняет в контрольной точке полный слой
+    scene.bake_in_background([_line(10, 300)])
+    checkpoint = scene.swap_state(Scene.empty_state())
+    assert checkpoint[3].pixelColor(12, 300).alpha() > 0
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""Тесты панели инструментов"""
+
+from functools import partial
+
+
+def test_icons_follow_device_pixel_ratio(qapp, tmp_path, monkeypatch):
+    from src import icon_cache, toolbar as toolbar_module
+    monkeypatch.setattr(toolbar_module, 'icon_pixmap',
+                        partial(icon_cache.icon_pixmap, cache_dir=str(tmp_path)))
+    
+    toolbar = toolbar_module.Toolbar()
+    button, _, size = toolbar._svg_icons[0]
+    ratio = toolbar.devicePixelRatioF()
+    assert button.icon().availableSizes()[0].width() == round(size * ratio)
+    
+    # Панель перенесли на экран с другой плотностью пикселей
+    monkeypatch.setattr(toolbar, 'devicePixelRatioF', lambda: ratio * 2)
+    toolbar._refresh_icons()
+    assert button.icon().availableSizes()[0].width() == round(size * ratio * 2)
+    toolbar.close()
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""Тесты инструментов рисования"""
+
+import pytest
+from PyQt5.QtCore import QPoint, Qt
+from PyQt5.QtGui import QColor, QImage, QPainter
+
+from src.tools import LineTool, RectangleTool, CircleTool, ArrowTool
+
+SHAPES = [LineTool, RectangleTool, CircleTool, ArrowTool]
+
+
+def _shape_at_origin(tool_class):
+    drawing = tool_class(QColor(255, 0, 0), 4)
+    drawing.set_start_point(QPoint(0, 0))
+    drawing.set_end_point(QPoint(40, 30))
+    return drawing
+
+
+@pytest.mark.parametrize('tool_class', SHAPES)
+def test_shape_anchored_at_origin_has_bounds_and_outline(tool_class):
+    drawing = _shape_at_origin(tool_class)
+    
+    assert not drawing.bounding_rect().isEmpty()
+    assert drawing.bounding_rect().contains(QPoint(0, 0))
+    assert len(drawing.outline_segments()) > 0
+
+
+@pytest.mark.parametrize('tool_class', SHAPES)
+def test_shape_anchored_at_origin_is_drawn(qapp, tool_class):
+    drawing = _shape_at_origin(tool_class)
+    image = QImage(64, 64, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+    
+    painter = QPainter(image)
+    drawing.draw(painter)
+    painter.end()
+    
+    assert any(image.pixelColor(x, y).alpha() for x in range(64) for y in range(64))
+
+
+def test_shape_anchored_at_origin_can_be_erased(qapp):
+    from src.scene import Scene
+    scene = Scene()
+    drawing = _shape_at_origin(LineTool)
+    scene.add(drawing)
+    
+    assert scene.hit_test([(0, 0)], 5) == [(0, drawing)]